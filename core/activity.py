@@ -0,0 +1,189 @@
+"""
+Per-quest daily activity, stored as packed arrays (one row per quest per year).
+
+Each `QuestActivity` row holds three fixed-length arrays indexed by day of
+year: sessions and completions as unsigned 32-bit counters, payout as signed
+32-bit sums, all saturating at their type's limits rather than overflowing.
+Log writes adjust the affected day in place (see signals.py), so a year
+heatmap is a handful of ~4 KB blob reads rather than a GROUP BY date over
+every log the quest ever had.
+"""
+import sys
+from array import array
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Logger, QuestActivity
+
+DAYS = 366
+LEVELS = 4  # heatmap shades above "nothing"
+
+_SWAP = sys.byteorder != "little"  # blobs are always little-endian
+
+COUNT_TYPE = "I"  # uint32
+COUNT_MAX = 2**32 - 1
+PAYOUT_MIN, PAYOUT_MAX = -(2**31), 2**31 - 1
+
+
+def _clamp(value: int, low: int, high: int) -> int:
+    return low if value < low else high if value > high else value
+
+
+def _unpack(typecode: str, blob) -> array:
+    values = array(typecode)
+    if blob:
+        values.frombytes(bytes(blob))
+        if _SWAP:
+            values.byteswap()
+    else:
+        values.extend([0] * DAYS)
+    return values
+
+
+def _pack(values: array) -> bytes:
+    if _SWAP:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class YearCounts:
+    """Unpacked arrays for one quest-year (or a sum of several)."""
+
+    def __init__(self, row: QuestActivity | None = None):
+        self.sessions = _unpack(COUNT_TYPE, row and row.sessions)
+        self.completed = _unpack(COUNT_TYPE, row and row.completed)
+        self.payout = _unpack("i", row and row.payout)
+
+    def add(self, day: int, sessions: int, completed: int, payout: int) -> None:
+        self.sessions[day] = _clamp(self.sessions[day] + sessions, 0, COUNT_MAX)
+        self.completed[day] = _clamp(self.completed[day] + completed, 0, COUNT_MAX)
+        self.payout[day] = _clamp(self.payout[day] + payout, PAYOUT_MIN, PAYOUT_MAX)
+
+    def store(self, row: QuestActivity) -> None:
+        row.sessions = _pack(self.sessions)
+        row.completed = _pack(self.completed)
+        row.payout = _pack(self.payout)
+
+
+def day_of(timestamp) -> date:
+    return timezone.localdate(timestamp)
+
+
+def _slot(day: date) -> int:
+    return day.timetuple().tm_yday - 1
+
+
+def _contribution(quest_id, timestamp, completed, payout):
+    day = day_of(timestamp)
+    return quest_id, day, (1, int(bool(completed)), payout or 0)
+
+
+def apply(entries, sign: int = 1) -> None:
+    """
+    Add (or with sign=-1, remove) log entries from the stored arrays.
+
+    `entries` is an iterable of (quest_id, timestamp, completed, payout).
+    Rows are locked while they are rewritten so concurrent log writes for
+    the same quest-year serialize instead of losing updates.
+    """
+    grouped = {}
+    for quest_id, timestamp, completed, payout in entries:
+        if timestamp is None:
+            continue
+        quest_id, day, values = _contribution(quest_id, timestamp, completed, payout)
+        grouped.setdefault((quest_id, day.year), []).append((_slot(day), values))
+
+    with transaction.atomic():
+        for (quest_id, year), days in grouped.items():
+            row, _ = QuestActivity.objects.select_for_update().get_or_create(
+                quest_id=quest_id, year=year
+            )
+            counts = YearCounts(row)
+            for slot, (sessions, completed, payout) in days:
+                counts.add(slot, sign * sessions, sign * completed, sign * payout)
+            counts.store(row)
+            row.save(update_fields=["sessions", "completed", "payout"])
+
+
+def rebuild(quest_ids=None) -> int:
+    """Recompute activity rows from the logs; returns the number of rows written."""
+    logs = Logger.objects.order_by()
+    existing = QuestActivity.objects.all()
+    if quest_ids is not None:
+        logs = logs.filter(quest_id__in=quest_ids)
+        existing = existing.filter(quest_id__in=quest_ids)
+
+    years: dict[tuple, YearCounts] = {}
+    rows = logs.values_list("quest_id", "timestamp", "completed", "payout")
+    for quest_id, timestamp, completed, payout in rows.iterator(chunk_size=5000):
+        quest_id, day, (sessions, done, paid) = _contribution(quest_id, timestamp, completed, payout)
+        counts = years.get((quest_id, day.year))
+        if counts is None:
+            counts = years[quest_id, day.year] = YearCounts()
+        counts.add(_slot(day), sessions, done, paid)
+
+    fresh = []
+    for (quest_id, year), counts in years.items():
+        row = QuestActivity(quest_id=quest_id, year=year)
+        counts.store(row)
+        fresh.append(row)
+
+    with transaction.atomic():
+        existing.delete()
+        QuestActivity.objects.bulk_create(fresh, batch_size=500)
+    return len(fresh)
+
+
+@dataclass
+class Day:
+    date: date
+    sessions: int = 0
+    completed: int = 0
+    payout: int = 0
+    level: int = 0
+
+
+def heatmap(quest_ids, end: date | None = None, days: int = 365) -> list[Day | None]:
+    """
+    The `days` days up to `end`, summed over `quest_ids`.
+
+    Padded at the front with None so the first cell falls on a Monday; laid
+    out column-wise seven rows high that gives one column per week.
+    """
+    end = end or timezone.localdate()
+    start = end - timedelta(days=days - 1)
+
+    years: dict[int, list[YearCounts]] = {}
+    rows = QuestActivity.objects.filter(
+        quest_id__in=quest_ids, year__gte=start.year, year__lte=end.year
+    )
+    for row in rows:
+        years.setdefault(row.year, []).append(YearCounts(row))
+
+    # Sum across quests one day at a time (zip/sum stay in C); the totals are
+    # plain ints, so nothing needs clamping
+    totals = {
+        year: [list(map(sum, zip(*(getattr(c, name) for c in counts))))
+               for name in ("sessions", "completed", "payout")]
+        for year, counts in years.items()
+    }
+
+    cells: list[Day | None] = [None] * start.weekday()
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        if day.year not in totals:
+            cells.append(Day(day))
+            continue
+        slot = _slot(day)
+        sessions, completed, payout = totals[day.year]
+        cells.append(Day(day, sessions[slot], completed[slot], payout[slot]))
+
+    busiest = max((c.sessions for c in cells if c), default=0)
+    for cell in cells:
+        if cell and cell.sessions:
+            cell.level = -(-cell.sessions * LEVELS // busiest)  # ceil
+    return cells
@@ -1,26 +1,120 @@
+from django import forms
 from django.contrib import admin
-from .models import Category, Quest, Logger
+from django.contrib.admin.utils import get_last_value_from_parameters
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+
+from .models import ApiToken, Category, Job, Quest, Logger
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses the planner's row estimate (pg_class.reltuples) for unfiltered lists
+    on Postgres, where an exact COUNT(*) means a scan of the whole table.
+    Filtered lists, small tables and other backends keep the exact count.
+    """
+
+    exact_below = 10_000
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if connection.vendor == "postgresql" and not qs.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [qs.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.exact_below:  # -1 until the first ANALYZE
+                return row[0]
+        return super().count
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    """
+    Related-field filter backed by the admin's autocomplete endpoint instead
+    of a sidebar link per related row. Only the selected row is ever loaded.
+    The related model's admin needs `search_fields`.
+    """
+
+    template = "admin/core/autocomplete_filter.html"
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.selected = get_last_value_from_parameters(self.used_parameters, self.lookup_kwarg)
+        self.form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model._default_manager.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+            required=False,  # lets select2 offer a "clear" button
+        )
+
+    def field_choices(self, field, request, model_admin):
+        return []
+
+    def has_output(self):
+        return True
+
+    @property
+    def media(self):
+        return self.form_field.widget.media + forms.Media(js=["js/admin_filters.js"])
+
+    def rendered_widget(self):
+        widget = self.form_field.widget
+        return widget.render(self.lookup_kwarg, self.selected, {"id": f"filter_{self.lookup_kwarg}"})
 
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ("name", "updated_at")
+    list_display = ("name", "owner", "updated_at")
+    list_select_related = ("owner",)
     search_fields = ("name", "notes")
+    autocomplete_fields = ("owner",)
     ordering = ("name",)
 
 
 @admin.register(Quest)
 class QuestAdmin(admin.ModelAdmin):
-    list_display = ("title", "category", "limited_mobility", "start_date", "end_date", "updated_at")
-    list_filter = ("limited_mobility", "category", "end_date")
+    list_display = ("title", "owner", "category", "limited_mobility", "start_date", "end_date", "updated_at")
+    list_filter = ("limited_mobility", ("category", AutocompleteFilter), "end_date")
+    list_select_related = ("owner", "category")
     search_fields = ("title", "notes")
+    autocomplete_fields = ("owner", "category")
     ordering = ("-updated_at",)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
 
 @admin.register(Logger)
 class LoggerAdmin(admin.ModelAdmin):
-    list_display = ("quest", "timestamp", "completed", "payout")
-    list_filter = ("completed", "quest")
+    list_display = ("quest", "owner", "timestamp", "completed", "payout")
+    list_filter = ("completed", ("quest", AutocompleteFilter))
+    list_select_related = ("owner", "quest")
     search_fields = ("quest__title", "notes")
+    autocomplete_fields = ("owner", "quest")
     ordering = ("-timestamp",)
     date_hierarchy = "timestamp"
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "status", "attempts", "run_at", "locked_by", "finished_at")
+    list_filter = ("status", "name")
+    readonly_fields = ("last_error",)
+    ordering = ("-id",)
+
+
+@admin.register(ApiToken)
+class ApiTokenAdmin(admin.ModelAdmin):
+    # Issued with `manage.py issue_api_token`; here they can only be revoked
+    list_display = ("owner", "name", "created_at")
+    list_select_related = ("owner",)
+    readonly_fields = ("owner", "name", "created_at")
+    ordering = ("-created_at",)
+
+    def has_add_permission(self, request):
+        return False
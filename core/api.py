@@ -0,0 +1,460 @@
+import base64
+import json
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from functools import wraps
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from . import ingest as ingestion, outbox
+from .models import ApiToken, Category, Change, Logger, Quest
+from .signals import TRACKED_MODELS
+
+try:  # optional: several times faster than the stdlib encoder
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+FEED_PAGE_SIZE = 500
+FEED_MAX_PAGE_SIZE = 1000
+
+INGEST_MAX_EVENTS = 1000
+# How far ahead of the server clock an event's own timestamp may be
+INGEST_CLOCK_SKEW = timedelta(minutes=5)
+
+LIST_PAGE_SIZE = 100
+LIST_MAX_PAGE_SIZE = 1000
+MAX_IDS = 500
+
+# Columns sent for each live object in the change feed.
+FEED_FIELDS = {
+    "category": ("id", "name", "notes", "created_at", "updated_at"),
+    "quest": (
+        "id", "title", "category_id", "start_date", "end_date",
+        "limited_mobility", "notes", "created_at", "updated_at",
+    ),
+    "logger": ("id", "quest_id", "timestamp", "completed", "payout", "notes"),
+}
+
+
+def _json(payload, status: int = 200) -> HttpResponse:
+    """A JSON response, encoded with orjson when it is installed."""
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return HttpResponse(body, content_type="application/json", status=status)
+
+
+def api_login_required(view):
+    """Like login_required, but answers 401 JSON instead of redirecting."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return _json({"error": "Authentication required."}, status=401)
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def api_token_required(view):
+    """
+    Authenticates by `Authorization: Bearer <token>` (an ApiToken) alone,
+    for scripts: no session, so no CSRF check either.
+    """
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        scheme, _, raw = request.headers.get("Authorization", "").partition(" ")
+        user = ApiToken.user_for(raw.strip()) if scheme == "Bearer" and raw.strip() else None
+        if user is None:
+            return _json({"error": "A valid API token is required."}, status=401)
+        request.user = user
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def _bad_request(message: str) -> HttpResponse:
+    return _json({"error": message}, status=400)
+
+
+def _parse_limit(request, default: int, maximum: int) -> int | None:
+    raw = request.GET.get("limit", "").strip()
+    if raw == "":
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        return None
+    return min(max(limit, 1), maximum)
+
+
+@require_GET
+@api_login_required
+def changes(request):
+    """
+    Delta feed: everything created, updated or deleted after `since`.
+
+    The token is the last `seq` the client has seen ("0" or missing means
+    from the beginning). Several changes to the same object inside one page
+    collapse into its latest state, and objects that no longer exist come
+    back as tombstones (`"deleted": true`).
+
+    Pages stop at outbox.committed_seq(), so once a client has read up to a
+    token no change with a lower seq can commit afterwards; resuming from
+    `next` never skips anything. A change can therefore show up a poll
+    late while an older transaction is still running.
+    """
+    raw_since = request.GET.get("since", "").strip() or "0"
+    try:
+        since = int(raw_since)
+    except ValueError:
+        return _bad_request("Invalid 'since' token.")
+    if since < 0:
+        return _bad_request("Invalid 'since' token.")
+
+    limit = _parse_limit(request, FEED_PAGE_SIZE, FEED_MAX_PAGE_SIZE)
+    if limit is None:
+        return _bad_request("'limit' must be an integer.")
+
+    pending = Change.objects.filter(owner=request.user, seq__gt=since)  # (owner, seq) index range
+    watermark = outbox.committed_seq()
+    if watermark is not None:
+        pending = pending.filter(seq__lte=watermark)
+    rows = list(pending.order_by("seq").values_list("seq", "model", "object_id", "op")[: limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # Last change per object wins inside this page
+    latest = {}
+    for seq, model, object_id, op in rows:
+        latest[(model, object_id)] = (seq, op)
+
+    # One query per model type for the objects that still exist
+    wanted = defaultdict(list)
+    for (model, object_id), (seq, op) in latest.items():
+        if op != Change.Op.DELETE:
+            wanted[model].append(object_id)
+
+    live = {}
+    for model, ids in wanted.items():
+        objects = (
+            TRACKED_MODELS[model].objects
+            .filter(owner=request.user, pk__in=ids)
+            .order_by()
+            .values(*FEED_FIELDS[model])
+        )
+        for row in objects:
+            live[(model, row["id"])] = row
+
+    items = []
+    for (model, object_id), (seq, op) in sorted(latest.items(), key=lambda kv: kv[1][0]):
+        row = live.get((model, object_id))
+        item = {"seq": seq, "type": model, "id": object_id, "deleted": row is None}
+        if row is not None:
+            item["data"] = row
+        items.append(item)
+
+    return _json({
+        "changes": items,
+        "next": str(rows[-1][0] if rows else since),
+        "has_more": has_more,
+    })
+
+
+class Resource:
+    """
+    A read-only list endpoint over one model.
+
+    `fields` maps public field names to ORM paths (joins only happen when a
+    joined field is asked for); `ordering` is a unique (key, "id") pair used
+    for keyset pagination.
+    """
+
+    def __init__(self, model, fields, default_fields, ordering):
+        self.model = model
+        self.fields = fields
+        self.default_fields = default_fields
+        self.ordering = ordering
+
+    def queryset(self, request):
+        return self.model.objects.for_user(request.user)
+
+
+class QuestResource(Resource):
+    def queryset(self, request):
+        qs = super().queryset(request)
+        status = request.GET.get("status", "")
+        if status == "active":
+            qs = qs.active()
+        elif status == "ended":
+            qs = qs.ended()
+        if request.GET.get("category"):
+            qs = qs.filter(category_id=request.GET["category"])
+        return qs
+
+
+class LogResource(Resource):
+    def queryset(self, request):
+        return super().queryset(request).matching(
+            request.GET.get("completed", "all"),
+            request.GET.get("range", ""),
+            request.GET.get("category", ""),
+        )
+
+
+RESOURCES = {
+    "categories": Resource(
+        Category,
+        fields={
+            "id": "id", "name": "name", "notes": "notes",
+            "created_at": "created_at", "updated_at": "updated_at",
+        },
+        default_fields=("id", "name", "updated_at"),
+        ordering=("name", "id"),
+    ),
+    "quests": QuestResource(
+        Quest,
+        fields={
+            "id": "id", "title": "title", "category_id": "category_id",
+            "category_name": "category__name", "start_date": "start_date",
+            "end_date": "end_date", "limited_mobility": "limited_mobility",
+            "notes": "notes", "created_at": "created_at", "updated_at": "updated_at",
+        },
+        default_fields=(
+            "id", "title", "category_id", "start_date", "end_date",
+            "limited_mobility", "updated_at",
+        ),
+        ordering=("-updated_at", "-id"),
+    ),
+    "logs": LogResource(
+        Logger,
+        fields={
+            "id": "id", "quest_id": "quest_id", "quest_title": "quest__title",
+            "category_id": "quest__category_id", "timestamp": "timestamp",
+            "completed": "completed", "payout": "payout", "notes": "notes",
+        },
+        default_fields=("id", "quest_id", "timestamp", "completed", "payout"),
+        ordering=("-timestamp", "-id"),
+    ),
+}
+
+
+def encode_cursor(key, pk) -> str:
+    # isoformat() keeps microseconds, which DjangoJSONEncoder would drop
+    if hasattr(key, "isoformat"):
+        key = key.isoformat()
+    raw = json.dumps([key, str(pk)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(resource: Resource, token: str):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        key, pk = json.loads(raw)
+        key_field = resource.model._meta.get_field(resource.ordering[0].lstrip("-"))
+        return key_field.to_python(key), resource.model._meta.pk.to_python(pk)
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def keyset_after(resource: Resource, key, pk) -> Q:
+    name = resource.ordering[0].lstrip("-")
+    op = "lt" if resource.ordering[0].startswith("-") else "gt"
+    return Q(**{f"{name}__{op}": key}) | Q(**{name: key, f"id__{op}": pk})
+
+
+def _list(request, name: str):
+    resource = RESOURCES[name]
+
+    # Sparse fieldset: ?fields=id,title
+    raw_fields = request.GET.get("fields", "").strip()
+    if raw_fields:
+        fields = [f.strip() for f in raw_fields.split(",") if f.strip()]
+        unknown = [f for f in fields if f not in resource.fields]
+        if unknown:
+            return _bad_request(f"Unknown field(s): {', '.join(unknown)}.")
+    else:
+        fields = list(resource.default_fields)
+
+    limit = _parse_limit(request, LIST_PAGE_SIZE, LIST_MAX_PAGE_SIZE)
+    if limit is None:
+        return _bad_request("'limit' must be an integer.")
+
+    try:
+        qs = resource.queryset(request)
+
+        # Batch lookup: ?ids=a,b,c is one IN query, no pagination
+        raw_ids = request.GET.get("ids", "").strip()
+        if raw_ids:
+            ids = [i.strip() for i in raw_ids.split(",") if i.strip()]
+            if len(ids) > MAX_IDS:
+                return _bad_request(f"At most {MAX_IDS} ids per request.")
+            qs = qs.filter(pk__in=ids)
+            limit = len(ids)
+
+        cursor = request.GET.get("cursor", "").strip()
+        if cursor:
+            position = decode_cursor(resource, cursor)
+            if position is None:
+                return _bad_request("Invalid cursor.")
+            qs = qs.filter(keyset_after(resource, *position))
+
+        # Plain columns by name, joined ones as F() aliases. The keyset
+        # columns ride along if not requested and are stripped below.
+        columns = [f for f in fields if resource.fields[f] == f]
+        aliases = {f: F(resource.fields[f]) for f in fields if resource.fields[f] != f}
+        key_name = resource.ordering[0].lstrip("-")
+        extra = [c for c in (key_name, "id") if c not in columns]
+
+        rows = list(
+            qs.order_by(*resource.ordering)
+            .values(*columns, *extra, **aliases)[: limit + 1]
+        )
+    except ValidationError:
+        return _bad_request("Invalid id or filter value.")
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][key_name], rows[-1]["id"])
+
+    for row in rows:
+        for column in extra:
+            del row[column]
+
+    return _json({"results": rows, "next": next_cursor})
+
+
+@require_GET
+@api_login_required
+def quests(request):
+    return _list(request, "quests")
+
+
+@require_GET
+@api_login_required
+def logs(request):
+    return _list(request, "logs")
+
+
+@require_GET
+@api_login_required
+def categories(request):
+    return _list(request, "categories")
+
+
+def _parse_event(raw) -> dict | str:
+    """The Logger fields for one ingested event, or an error message."""
+    if not isinstance(raw, dict):
+        return "must be an object"
+    try:
+        quest_id = uuid.UUID(str(raw.get("quest")))
+    except ValueError:
+        return "'quest' must be a quest id"
+    completed, payout = raw.get("completed", False), raw.get("payout")
+    notes, key = raw.get("notes", ""), raw.get("key") or None
+    if not isinstance(completed, bool):
+        return "'completed' must be true or false"
+    if payout is not None and (isinstance(payout, bool) or not isinstance(payout, int)):
+        return "'payout' must be an integer or null"
+    if not isinstance(notes, str):
+        return "'notes' must be a string"
+    if key is not None and not (isinstance(key, str) and len(key) <= 64):
+        return "'key' must be a string of at most 64 characters"
+    event = {"quest_id": quest_id, "completed": completed, "payout": payout, "notes": notes, "idempotency_key": key}
+    if raw.get("timestamp") is not None:
+        # Replayed from an offline queue: when it happened, not when it arrived
+        try:
+            at = parse_datetime(raw["timestamp"]) if isinstance(raw["timestamp"], str) else None
+        except ValueError:  # well-formed but out of range, e.g. month 13
+            at = None
+        if at is None or timezone.is_naive(at):
+            return "'timestamp' must be an ISO 8601 datetime with a UTC offset"
+        if at > timezone.now() + INGEST_CLOCK_SKEW:
+            return "'timestamp' is in the future"
+        event["timestamp"] = at
+    return event
+
+
+KEY_CONFLICT = "'key' was already used for another quest"
+
+
+def _key_conflicts(user, events) -> dict[str, str]:
+    """Events whose key the user already used (or an earlier event uses) for a different quest."""
+    keys = {event["idempotency_key"] for event in events if event["idempotency_key"]}
+    if not keys:
+        return {}
+    used = dict(
+        Logger.objects.filter(owner=user, idempotency_key__in=keys).values_list("idempotency_key", "quest_id")
+    )
+    return {
+        str(i): KEY_CONFLICT
+        for i, event in enumerate(events)
+        if event["idempotency_key"]
+        and used.setdefault(event["idempotency_key"], event["quest_id"]) != event["quest_id"]
+    }
+
+
+@require_POST
+@api_token_required
+def ingest(request):
+    """
+    Record sessions pushed by trackers: {"events": [{"quest", "completed",
+    "payout", "notes", "key", "timestamp"}, ...]}, only "quest" required;
+    "timestamp" (ISO 8601 with offset) defaults to the time of arrival.
+
+    Answers once the batch the events were grouped into has committed, with
+    one result per event in order. An event whose `key` was used before
+    returns the log stored under it (`"created": false`), so a request that
+    timed out can simply be sent again. Reusing a key for a different quest
+    is a 409, and then none of the request's events are stored.
+    """
+    try:
+        events = json.loads(request.body).get("events")
+    except (ValueError, AttributeError):
+        return _bad_request("Body must be a JSON object.")
+    if not isinstance(events, list) or not 1 <= len(events) <= INGEST_MAX_EVENTS:
+        return _bad_request(f"'events' must be a list of 1 to {INGEST_MAX_EVENTS} events.")
+
+    parsed = [_parse_event(raw) for raw in events]
+    errors = {str(i): error for i, error in enumerate(parsed) if isinstance(error, str)}
+    if errors:
+        return _json({"error": "Invalid events.", "events": errors}, status=400)
+
+    wanted = {event["quest_id"] for event in parsed}
+    active = set(Quest.objects.for_user(request.user).active().filter(pk__in=wanted).values_list("pk", flat=True))
+    unknown = {str(i): "no such active quest" for i, event in enumerate(parsed) if event["quest_id"] not in active}
+    if unknown:
+        return _json({"error": "Invalid events.", "events": unknown}, status=400)
+
+    conflicts = _key_conflicts(request.user, parsed)
+    if conflicts:
+        return _json({"error": "Conflicting keys.", "events": conflicts}, status=409)
+
+    logs = [Logger(owner=request.user, **event) for event in parsed]
+    try:
+        stored = ingestion.ingest(logs)
+    except TimeoutError:
+        response = _json({"error": "Not committed in time; retry with the same keys."}, status=503)
+        response["Retry-After"] = "1"
+        return response
+    except ingestion.KeyConflict as exc:
+        # A concurrent request took one of the keys for another quest after the check
+        return _json({"error": "Conflicting keys.", "events": {str(i): KEY_CONFLICT for i in exc.indexes}}, status=409)
+
+    return _json({"results": [
+        {"id": log.pk, "timestamp": log.timestamp, "created": log is submitted}
+        for log, submitted in zip(stored, logs)
+    ]}, status=201)
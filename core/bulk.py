@@ -0,0 +1,88 @@
+"""
+Bulk quest operations: end many quests, move quests between categories,
+merge categories.
+
+Each runs in one transaction as a single UPDATE over the affected quests.
+QuerySet.update() sends no post_save, so what the receivers in signals.py
+would have done per quest is done here in bulk: one Change row per quest
+(a single INSERT) and counter deltas summed per category before they are
+applied.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import counters
+from .models import Category, Change, Quest
+
+
+def _record(owner_id, quest_ids, fields) -> None:
+    Change.objects.bulk_create(
+        Change(owner_id=owner_id, model="quest", object_id=pk, op=Change.Op.UPDATE, fields=fields)
+        for pk in quest_ids
+    )
+
+
+def _state(category_id, end_date) -> dict:
+    return {"category_id": category_id, "active": end_date is None}
+
+
+def end_quests(owner, quests, end_date=None) -> int:
+    """
+    End the active quests among `quests` (an owner-scoped queryset); returns
+    how many. Quests starting after `end_date` are left as they are, as the
+    quest form would refuse to end them then.
+    """
+    end_date = end_date or timezone.localdate()
+    with transaction.atomic():
+        rows = list(
+            quests.filter(owner=owner).active()
+            .filter(Q(start_date__isnull=True) | Q(start_date__lte=end_date))
+            .select_for_update()
+            .order_by().values_list("id", "category_id")
+        )
+        if not rows:
+            return 0
+        ids = [pk for pk, _ in rows]
+        Quest.objects.filter(pk__in=ids).update(end_date=end_date, updated_at=timezone.now())
+        _record(owner.pk, ids, ["end_date", "updated_at"])
+        counters.quests_changed(owner.pk, [
+            (_state(category_id, None), _state(category_id, end_date)) for _, category_id in rows
+        ])
+    return len(rows)
+
+
+def move_quests(owner, quests, category: Category | None) -> int:
+    """Put `quests` in `category` (None = uncategorized); returns how many moved."""
+    if category is not None and category.owner_id != owner.pk:
+        raise ValueError("Category belongs to another user.")
+    target_id = category.pk if category else None
+    with transaction.atomic():
+        moving = quests.filter(owner=owner).select_for_update().order_by()
+        moving = moving.exclude(category_id=target_id) if target_id else moving.exclude(category__isnull=True)
+        rows = list(moving.values_list("id", "category_id", "end_date"))
+        if not rows:
+            return 0
+        ids = [pk for pk, _, _ in rows]
+        Quest.objects.filter(pk__in=ids).update(category_id=target_id, updated_at=timezone.now())
+        _record(owner.pk, ids, ["category_id", "updated_at"])
+        counters.quests_changed(owner.pk, [
+            (_state(category_id, end_date), _state(target_id, end_date)) for _, category_id, end_date in rows
+        ])
+    return len(rows)
+
+
+def merge_categories(owner, source: Category, target: Category | None) -> int:
+    """
+    Move every quest of `source` into `target`, keep `source`'s notes on
+    `target`, then delete `source`. Returns the number of quests moved.
+    """
+    if source.owner_id != owner.pk or (target is not None and target.pk == source.pk):
+        raise ValueError("Can't merge a category into itself or into another user's.")
+    with transaction.atomic():
+        moved = move_quests(owner, Quest.objects.filter(category=source), target)
+        if target is not None and source.notes.strip():
+            target.notes = f"{target.notes.rstrip()}\n\n{source.name}: {source.notes.strip()}".strip()
+            target.save(update_fields=["notes", "updated_at"])
+        source.delete()
+    return moved
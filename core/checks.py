@@ -0,0 +1,98 @@
+import re
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+# "https://...", or protocol-relative "//host/..."
+_EXTERNAL_URL = r"""\s*=\s*["']?\s*(?:[a-z][a-z0-9+.-]*:)?//"""
+
+# <script ... src="https://...">
+EXTERNAL_SCRIPT_RE = re.compile(rf"<script\b[^>]*\bsrc{_EXTERNAL_URL}", re.IGNORECASE)
+
+# <link rel="stylesheet" ... href="https://..."> (attributes in any order)
+LINK_RE = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+STYLESHEET_REL_RE = re.compile(r"""\brel\s*=\s*["']?[^"'>]*\bstylesheet\b""", re.IGNORECASE)
+EXTERNAL_HREF_RE = re.compile(rf"\bhref{_EXTERNAL_URL}", re.IGNORECASE)
+
+
+def template_dirs() -> list[Path]:
+    dirs = []
+    for engine in settings.TEMPLATES:
+        dirs += [Path(d) for d in engine.get("DIRS", [])]
+        if engine.get("APP_DIRS"):
+            dirs += [Path(app.path) / "templates" for app in apps.get_app_configs()]
+    return [d for d in dirs if d.is_dir()]
+
+
+def find_external_assets(dirs) -> list[tuple[Path, int]]:
+    """(template, line number) for every <script src> or stylesheet pointing at another origin."""
+    hits = []
+    for base in dirs:
+        for path in sorted(Path(base).rglob("*.html")):
+            text = path.read_text(encoding="utf-8")
+            starts = [match.start() for match in EXTERNAL_SCRIPT_RE.finditer(text)]
+            starts += [
+                match.start() for match in LINK_RE.finditer(text)
+                if STYLESHEET_REL_RE.search(match.group()) and EXTERNAL_HREF_RE.search(match.group())
+            ]
+            hits += [(path, text.count("\n", 0, start) + 1) for start in sorted(starts)]
+    return hits
+
+
+@register(Tags.templates)
+def check_no_external_assets(app_configs, **kwargs):
+    # Only our own templates: third-party apps (admin etc.) are not ours to fix.
+    base = Path(settings.BASE_DIR)
+    dirs = [d for d in template_dirs() if d.resolve().is_relative_to(base.resolve())]
+    return [
+        Error(
+            f"{path.relative_to(base)}:{line} loads a script or stylesheet from another origin.",
+            hint="Vendor the file into static/ and reference it with {% static %}.",
+            id="core.E001",
+        )
+        for path, line in find_external_assets(dirs)
+    ]
+
+
+# static/ path -> (pattern for the version banner, version the templates are written against);
+# tools/vendor_assets.py fetches them
+VENDORED_ASSETS = {
+    "js/htmx.min.js": (re.compile(r'version:\s*"(\d+\.\d+\.\d+)"'), "1.9"),
+    "css/pico.min.css": (re.compile(r"Pico CSS[^\n]*?v(\d+\.\d+\.\d+)"), "2"),
+}
+
+
+def vendored_version(path: Path, pattern) -> str | None:
+    """Version string found in the first 64 KB of a vendored file, or None if missing/unrecognised."""
+    try:
+        with path.open(encoding="utf-8", errors="replace") as handle:
+            head = handle.read(65536)
+    except OSError:
+        return None
+    match = pattern.search(head)
+    return match.group(1) if match else None
+
+
+@register(Tags.staticfiles)
+def check_vendored_asset_versions(app_configs, **kwargs):
+    messages = []
+    hint = "Run python tools/vendor_assets.py and commit the result."
+    for name, (pattern, expected) in VENDORED_ASSETS.items():
+        paths = [Path(base) / name for base in settings.STATICFILES_DIRS]
+        if not any(path.is_file() for path in paths):
+            # manifest storage (DEBUG off) fails every page that references a missing file
+            if "Manifest" in settings.STORAGES["staticfiles"]["BACKEND"]:
+                messages.append(Error(f"static/{name} is missing.", hint=hint, id="core.E002"))
+            else:
+                messages.append(Warning(f"static/{name} is missing.", hint=hint, id="core.W001"))
+            continue
+        found = next(filter(None, (vendored_version(path, pattern) for path in paths)), None)
+        if found is None or not f"{found}.".startswith(f"{expected}."):
+            messages.append(Warning(
+                f"static/{name} is version {found or 'unknown'}; the templates expect {expected}.x.",
+                hint=hint,
+                id="core.W001",
+            ))
+    return messages
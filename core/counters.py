@@ -0,0 +1,160 @@
+"""
+Maintained counters: per-category and per-user quest totals, logs per day.
+
+The signal receivers in signals.py call `quest_changed` / `log_changed`
+with the before and after state of a write; both run inside the write's
+transaction and only issue `UPDATE ... SET n = n + delta`, so concurrent
+writers never overwrite each other's increments. `reconcile()` recomputes
+everything from the base tables (`manage.py reconcile_counters`).
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from .models import Category, DailyLogCount, Logger, Quest, UserCounters
+
+
+def _bump(qs, **deltas) -> int:
+    # Clamped at 0 so a drifted counter can't fail the write it rides on
+    deltas = {name: Greatest(F(name) + delta, Value(0)) for name, delta in deltas.items() if delta}
+    return qs.update(**deltas) if deltas else 0
+
+
+def _bump_row(model, lookup: dict, **deltas) -> None:
+    if not any(deltas.values()):
+        return
+    if not _bump(model.objects.filter(**lookup), **deltas):
+        model.objects.get_or_create(**lookup)
+        _bump(model.objects.filter(**lookup), **deltas)
+
+
+def quest_changed(owner_id, before: dict | None, after: dict | None) -> None:
+    """
+    Adjust counters for a quest write.
+
+    `before` / `after` are {"category_id": ..., "active": bool}, or None for
+    a create / delete respectively.
+    """
+    quests_changed(owner_id, [(before, after)])
+
+
+def quests_changed(owner_id, changes) -> None:
+    """quest_changed() for many (before, after) pairs, one UPDATE per counter row."""
+    totals = Counter()
+    per_category: dict[object, Counter] = defaultdict(Counter)
+    for before, after in changes:
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            for name, value in (("quest_count", 1), ("active_quest_count", int(state["active"]))):
+                totals[name] += sign * value
+                if state["category_id"] is not None:
+                    per_category[state["category_id"]][name] += sign * value
+
+    with transaction.atomic():
+        _bump_row(UserCounters, {"owner_id": owner_id}, **totals)
+        for category_id, deltas in per_category.items():
+            _bump(Category.objects.filter(pk=category_id), **deltas)
+
+
+def log_changed(owner_id, before=None, after=None) -> None:
+    """Move a log's contribution from the `before` timestamp's day to `after`'s."""
+    old = timezone.localdate(before) if before else None
+    new = timezone.localdate(after) if after else None
+    if old == new:
+        return
+    with transaction.atomic():
+        if old:
+            _bump(DailyLogCount.objects.filter(owner_id=owner_id, day=old), count=-1)
+        if new:
+            _bump_row(DailyLogCount, {"owner_id": owner_id, "day": new}, count=1)
+
+
+def logs_created(entries) -> None:
+    """log_changed() for many new logs, `entries` being (owner_id, timestamp) pairs: one UPDATE per day."""
+    per_day = Counter((owner_id, timezone.localdate(timestamp)) for owner_id, timestamp in entries)
+    with transaction.atomic():
+        for (owner_id, day), count in per_day.items():
+            _bump_row(DailyLogCount, {"owner_id": owner_id, "day": day}, count=count)
+
+
+def dashboard(user) -> dict:
+    """Home page numbers from two single-row reads."""
+    totals = UserCounters.objects.filter(owner=user).first()
+    today = (
+        DailyLogCount.objects
+        .filter(owner=user, day=timezone.localdate())
+        .values_list("count", flat=True)
+        .first()
+    )
+    return {
+        "total_quests": totals.quest_count if totals else 0,
+        "active_quests": totals.active_quest_count if totals else 0,
+        "logs_today": today or 0,
+    }
+
+
+def reconcile() -> int:
+    """Recompute every counter from the base tables; returns rows corrected."""
+    fixed = 0
+    active = Q(quests__end_date__isnull=True)
+
+    with transaction.atomic():
+        categories = Category.objects.annotate(
+            actual=Count("quests"), actual_active=Count("quests", filter=active)
+        )
+        for category in categories:
+            if (category.quest_count, category.active_quest_count) != (category.actual, category.actual_active):
+                Category.objects.filter(pk=category.pk).update(
+                    quest_count=category.actual, active_quest_count=category.actual_active
+                )
+                fixed += 1
+
+        per_owner = (
+            Quest.objects.order_by().values("owner_id")
+            .annotate(total=Count("id"), active=Count("id", filter=Q(end_date__isnull=True)))
+        )
+        expected = {row["owner_id"]: (row["total"], row["active"]) for row in per_owner}
+        stored = {
+            row.owner_id: row
+            for row in UserCounters.objects.select_for_update()
+        }
+        for owner_id in expected.keys() | stored.keys():
+            total, active_total = expected.get(owner_id, (0, 0))
+            row = stored.get(owner_id)
+            if row and (row.quest_count, row.active_quest_count) == (total, active_total):
+                continue
+            UserCounters.objects.update_or_create(
+                owner_id=owner_id,
+                defaults={"quest_count": total, "active_quest_count": active_total},
+            )
+            fixed += 1
+
+        per_day = (
+            Logger.objects.order_by()
+            .annotate(day=TruncDate("timestamp", tzinfo=timezone.get_current_timezone()))
+            .values("owner_id", "day")
+            .annotate(n=Count("id"))
+        )
+        expected = {(row["owner_id"], row["day"]): row["n"] for row in per_day}
+        stored = {
+            (row.owner_id, row.day): row
+            for row in DailyLogCount.objects.select_for_update()
+        }
+        for key in expected.keys() | stored.keys():
+            count = expected.get(key, 0)
+            row = stored.get(key)
+            if row and row.count == count:
+                continue
+            if count:
+                DailyLogCount.objects.update_or_create(
+                    owner_id=key[0], day=key[1], defaults={"count": count}
+                )
+            else:
+                row.delete()
+            fixed += 1
+
+    return fixed
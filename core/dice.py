@@ -0,0 +1,405 @@
+"""
+Payout formulas: a small dice language compiled once into closures.
+
+    2d6        two six-sided dice, summed
+    d10!       exploding d10 (a 10 adds another roll, and so on)
+    d10!x2     ... times two (`x` and `*` both multiply)
+    2d6!+3     constants add and subtract
+    max(d8,d8) highest of the arguments (also min)
+
+`compile()` is cached, so a formula is parsed once per process; the
+returned `Plan` rolls with plain closures (no parsing or tree walking per
+roll) and carries the formula's exact outcome distribution, computed by
+convolution the first time it is asked for and kept with the plan.
+"""
+import bisect
+import random
+import re
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
+from django.core.exceptions import ValidationError
+
+DEFAULT_FORMULA = "d10!"
+
+MAX_LENGTH = 100
+MAX_DICE = 100
+MAX_SIDES = 1000
+MAX_MULTIPLIER = 1000
+
+# Explosions are unbounded in principle; rolls stop after this many (a
+# 1-in-10^30 event even for a d10). Distributions stop much earlier, once
+# a further level's probability is below float noise.
+MAX_EXPLOSIONS = 30
+
+_TOKEN_RE = re.compile(r"\s*(?:(\d+)|(max|min)|(d)|([!+\-*x(),]))", re.IGNORECASE)
+
+
+class DiceError(ValueError):
+    pass
+
+
+# --- Parsing -------------------------------------------------------------
+# Nodes are tuples: ("const", n) ("dice", count, sides, exploding)
+# ("add", [(sign, node), ...]) ("mul", node, k) ("max"|"min", [node, ...])
+
+def _tokenize(formula: str) -> list[str]:
+    tokens, pos = [], 0
+    formula = formula.strip()
+    while pos < len(formula):
+        match = _TOKEN_RE.match(formula, pos)
+        if not match or match.end() == pos:
+            raise DiceError(f"Unexpected {formula[pos:pos + 5]!r} in formula.")
+        tokens.append(match.group(match.lastindex).lower())
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self, expected=None):
+        token = self.peek()
+        if token is None or (expected and token != expected):
+            raise DiceError(f"Expected {expected or 'more'} in formula.")
+        self.pos += 1
+        return token
+
+    def integer(self) -> int:
+        token = self.take()
+        if not token.isdigit():
+            raise DiceError(f"Expected a number, got {token!r}.")
+        return int(token)
+
+    def expr(self):
+        terms = [(1, self.term())]
+        while self.peek() in ("+", "-"):
+            sign = 1 if self.take() == "+" else -1
+            terms.append((sign, self.term()))
+        return terms[0][1] if len(terms) == 1 else ("add", terms)
+
+    def term(self):
+        node = self.factor()
+        while self.peek() in ("*", "x"):
+            self.take()
+            k = self.integer()
+            if not 0 <= k <= MAX_MULTIPLIER:
+                raise DiceError(f"Multiplier must be at most {MAX_MULTIPLIER}.")
+            node = ("mul", node, k)
+        return node
+
+    def factor(self):
+        token = self.peek()
+        if token in ("max", "min"):
+            self.take()
+            self.take("(")
+            args = [self.expr()]
+            while self.peek() == ",":
+                self.take()
+                args.append(self.expr())
+            self.take(")")
+            return (token, args)
+        if token == "(":
+            self.take()
+            node = self.expr()
+            self.take(")")
+            return node
+        if token == "d" or (token and token.isdigit()):
+            count = 1 if token == "d" else self.integer()
+            if self.peek() != "d":
+                return ("const", count)
+            self.take("d")
+            sides = self.integer()
+            exploding = self.peek() == "!"
+            if exploding:
+                self.take()
+            if not 1 <= count <= MAX_DICE:
+                raise DiceError(f"Use between 1 and {MAX_DICE} dice.")
+            if not 2 <= sides <= MAX_SIDES:
+                raise DiceError(f"Dice need between 2 and {MAX_SIDES} sides.")
+            return ("dice", count, sides, exploding)
+        raise DiceError(f"Unexpected {token!r} in formula." if token else "Formula is incomplete.")
+
+
+def parse(formula: str):
+    if len(formula) > MAX_LENGTH:
+        raise DiceError(f"Formulas are limited to {MAX_LENGTH} characters.")
+    parser = _Parser(_tokenize(formula))
+    node = parser.expr()
+    if parser.peek() is not None:
+        raise DiceError(f"Unexpected {parser.peek()!r} in formula.")
+    return node
+
+
+# --- Rolling: each node becomes a closure (faces) -> total ---------------
+
+def _roller(node):
+    kind = node[0]
+    if kind == "const":
+        value = node[1]
+        return lambda faces: value
+
+    if kind == "dice":
+        _, count, sides, exploding = node
+        rand = random.random
+
+        if not exploding:
+            def roll(faces):
+                total = 0
+                for _ in range(count):
+                    face = int(rand() * sides) + 1
+                    faces.append(face)
+                    total += face
+                return total
+            return roll
+
+        def roll(faces):
+            total = 0
+            for _ in range(count):
+                for _ in range(MAX_EXPLOSIONS + 1):
+                    face = int(rand() * sides) + 1
+                    faces.append(face)
+                    total += face
+                    if face != sides:
+                        break
+            return total
+        return roll
+
+    if kind == "add":
+        parts = [(sign, _roller(child)) for sign, child in node[1]]
+        return lambda faces: sum(sign * part(faces) for sign, part in parts)
+
+    if kind == "mul":
+        inner, k = _roller(node[1]), node[2]
+        return lambda faces: inner(faces) * k
+
+    pick = max if kind == "max" else min
+    parts = [_roller(child) for child in node[1]]
+    return lambda faces: pick(part(faces) for part in parts)
+
+
+# --- Distributions: (offset, [p(offset), p(offset + 1), ...]) ------------
+
+# Work budget (multiply-adds) for computing one distribution. Formulas that
+# need more are rejected by validate_formula, so every saved formula can be
+# charted; it's generous for anything a payout would reasonably use.
+MAX_WORK = 2_000_000
+_EPSILON = 1e-15  # tail mass below this is dropped as it's produced
+
+
+class _Budget:
+    def __init__(self):
+        self.left = MAX_WORK
+
+    def spend(self, amount: int) -> None:
+        self.left -= amount
+        if self.left < 0:
+            raise DiceError("Formula is too complex to compute odds for.")
+
+
+def _trim(dist):
+    offset, probs = dist
+    start, end = 0, len(probs)
+    while end - start > 1 and probs[end - 1] < _EPSILON:
+        end -= 1
+    while end - start > 1 and probs[start] < _EPSILON:
+        start += 1
+    return offset + start, probs[start:end]
+
+
+def _convolve(a, b, budget):
+    (a_off, a_p), (b_off, b_p) = a, b
+    budget.spend(len(a_p) * len(b_p))
+    out = [0.0] * (len(a_p) + len(b_p) - 1)
+    for i, pa in enumerate(a_p):
+        if pa:
+            for j, pb in enumerate(b_p):
+                out[i + j] += pa * pb
+    return _trim((a_off + b_off, out))
+
+
+def _add_uniform(dist, sides, budget):
+    """Convolve with a fair 1..sides die: a sliding window sum, O(n + sides)."""
+    offset, probs = dist
+    budget.spend(len(probs) + sides)
+    out, window = [], 0.0
+    for i in range(len(probs) + sides - 1):
+        if i < len(probs):
+            window += probs[i]
+        if i >= sides:
+            window -= probs[i - sides]
+        out.append(window / sides)
+    return _trim((offset + 1, out))
+
+
+def _exploding_die(sides):
+    # Face f < sides ends the chain; each max face adds `sides` and rolls again
+    probs = []
+    reach = 1.0
+    for _ in range(MAX_EXPLOSIONS + 1):
+        if reach / sides < _EPSILON:
+            break
+        probs += [reach / sides] * (sides - 1) + [0.0]
+        reach /= sides
+    return _trim((1, probs))
+
+
+def _cdf(dist, lo, hi):
+    offset, probs = dist
+    out, running = [], 0.0
+    for value in range(lo, hi + 1):
+        index = value - offset
+        if 0 <= index < len(probs):
+            running += probs[index]
+        out.append(running)
+    return out
+
+
+def _distribution(node, budget):
+    kind = node[0]
+    if kind == "const":
+        return node[1], [1.0]
+
+    if kind == "dice":
+        _, count, sides, exploding = node
+        result = (0, [1.0])
+        if exploding:
+            die = _exploding_die(sides)
+            for _ in range(count):
+                result = _convolve(result, die, budget)
+        else:
+            for _ in range(count):
+                result = _add_uniform(result, sides, budget)
+        return result
+
+    if kind == "add":
+        result = (0, [1.0])
+        for sign, child in node[1]:
+            offset, probs = _distribution(child, budget)
+            if sign < 0:
+                offset, probs = -(offset + len(probs) - 1), probs[::-1]
+            result = _convolve(result, (offset, probs), budget)
+        return result
+
+    if kind == "mul":
+        offset, probs = _distribution(node[1], budget)
+        k = node[2]
+        if k == 0:
+            return 0, [1.0]
+        budget.spend(len(probs) * k)
+        scaled = [0.0] * ((len(probs) - 1) * k + 1)
+        for i, p in enumerate(probs):
+            scaled[i * k] = p
+        return offset * k, scaled
+
+    # max / min: combine CDFs over the common range
+    children = [_distribution(child, budget) for child in node[1]]
+    lo = min(offset for offset, _ in children)
+    hi = max(offset + len(probs) - 1 for offset, probs in children)
+    budget.spend((hi - lo + 1) * len(children))
+    cdfs = [_cdf(child, lo, hi) for child in children]
+    combined = []
+    for i in range(hi - lo + 1):
+        if kind == "max":
+            value = 1.0
+            for cdf in cdfs:
+                value *= cdf[i]
+        else:
+            above = 1.0
+            for cdf in cdfs:
+                above *= 1 - cdf[i]
+            value = 1 - above
+        combined.append(value)
+    probs = [combined[0]] + [b - a for a, b in zip(combined, combined[1:])]
+    return _trim((lo, probs))
+
+
+@dataclass(frozen=True)
+class Distribution:
+    offset: int
+    probs: tuple[float, ...]
+
+    @property
+    def min(self) -> int:
+        return self.offset
+
+    @property
+    def max(self) -> int:
+        return self.offset + len(self.probs) - 1
+
+    @cached_property
+    def mean(self) -> float:
+        return sum((self.offset + i) * p for i, p in enumerate(self.probs))
+
+    @cached_property
+    def _cumulative(self) -> list[float]:
+        out, running = [], 0.0
+        for p in self.probs:
+            running += p
+            out.append(running)
+        return out
+
+    def percentile(self, pct: float) -> int:
+        """Smallest outcome with P(X <= outcome) >= pct / 100."""
+        cumulative = self._cumulative
+        target = pct / 100 * cumulative[-1]
+        return self.offset + min(bisect.bisect_left(cumulative, target - 1e-12), len(cumulative) - 1)
+
+    def probability(self, value: int) -> float:
+        index = value - self.offset
+        return self.probs[index] if 0 <= index < len(self.probs) else 0.0
+
+
+class Plan:
+    """A compiled formula: `roll()` for outcomes, `distribution` for odds."""
+
+    def __init__(self, formula: str):
+        self.formula = formula
+        self._tree = parse(formula)
+        self._roll = _roller(self._tree)
+
+    def roll(self) -> tuple[int, list[int]]:
+        faces: list[int] = []
+        return self._roll(faces), faces
+
+    @cached_property
+    def distribution(self) -> Distribution:
+        """Raises DiceError if the formula is beyond the MAX_WORK budget."""
+        offset, probs = _distribution(self._tree, _Budget())
+        return Distribution(offset, tuple(probs))
+
+    def summary(self) -> dict:
+        dist = self.distribution
+        return {
+            "formula": self.formula,
+            "mean": dist.mean,
+            "min": dist.min,
+            "p10": dist.percentile(10),
+            "median": dist.percentile(50),
+            "p90": dist.percentile(90),
+        }
+
+
+@lru_cache(maxsize=512)
+def _compile(normalized: str) -> Plan:
+    return Plan(normalized)
+
+
+def compile(formula: str) -> Plan:  # noqa: A001  (mirrors re.compile)
+    """Parse `formula` once per process; raises DiceError if it is invalid."""
+    return _compile(re.sub(r"\s+", "", formula or DEFAULT_FORMULA).lower())
+
+
+def validate_formula(value: str) -> None:
+    """Model/form validator."""
+    if not value:
+        return
+    try:
+        compile(value).distribution
+    except DiceError as exc:
+        raise ValidationError(str(exc)) from exc
@@ -1,19 +1,29 @@
+import json
+
 from django import forms
+from django.urls import reverse
 from .models import Category, Quest, Logger
 from django.utils.timezone import now
 
 class CategoryForm(forms.ModelForm):
     class Meta:
         model = Category
-        fields = ["name", "notes"]
+        fields = ["name", "payout_formula", "notes"]
         widgets = {
             "name": forms.TextInput(attrs={"placeholder": "e.g., Reset, Errands, Crafting"}),
+            "payout_formula": forms.TextInput(attrs={"placeholder": "d10!"}),
             "notes": forms.Textarea(attrs={"rows": 4, "placeholder": "Optional notes…"}),
         }
 
+    def __init__(self, *args, owner=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.owner = owner
+        if owner is not None and self.instance.owner_id is None:
+            self.instance.owner = owner
+
     def clean_name(self):
         name = (self.cleaned_data.get("name") or "").strip()
-        qs = Category.objects.filter(name__iexact=name)
+        qs = Category.objects.for_user(self.owner).filter(name__iexact=name)
 
         # exclude self when editing
         if self.instance and self.instance.pk:
@@ -29,9 +39,10 @@ class CategoryForm(forms.ModelForm):
 class QuestForm(forms.ModelForm):
     class Meta:
         model = Quest
-        fields = ["title", "category", "start_date", "end_date", "limited_mobility", "notes"]
+        fields = ["title", "category", "start_date", "end_date", "limited_mobility", "payout_formula", "notes"]
         widgets = {
             "title": forms.TextInput(attrs={"placeholder": "Quest title"}),
+            "payout_formula": forms.TextInput(attrs={"placeholder": "Category default"}),
             "start_date": forms.DateInput(attrs={"type": "date"}),
             "end_date": forms.DateInput(attrs={"type": "date"}),
             "notes": forms.Textarea(attrs={"rows": 6, "placeholder": "Notes…"}),
@@ -40,15 +51,17 @@ class QuestForm(forms.ModelForm):
             "title": {"required": "Title is required."},
         }
 
-    def __init__(self, *args, allow_notes_only=False, **kwargs):
+    def __init__(self, *args, owner=None, allow_notes_only=False, **kwargs):
         super().__init__(*args, **kwargs)
+        if owner is not None and self.instance.owner_id is None:
+            self.instance.owner = owner
 
         # start_date defaults to today (new records)
         if not self.instance or not self.instance.pk:
             self.initial.setdefault("start_date", now().date())
 
-        # category dropdown sorted
-        self.fields["category"].queryset = Category.objects.order_by("name")
+        # category dropdown sorted (own categories only)
+        self.fields["category"].queryset = Category.objects.for_user(owner).order_by("name")
         self.fields["category"].required = False
         self.fields["limited_mobility"].label = "Limited mobility"
 
@@ -90,7 +103,28 @@ class LoggerForm(forms.ModelForm):
             }),
             "notes": forms.Textarea(attrs={"rows": 6, "placeholder": "Notes…"}),
         }
-        
+
+    # Field -> htmx trigger for autosave; typing is debounced client-side
+    AUTOSAVE_TRIGGERS = {
+        "completed": "change",
+        "payout": "input changed delay:800ms",
+        "notes": "input changed delay:800ms",
+    }
+
+    def __init__(self, *args, autosave=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        if autosave and self.instance.pk:
+            url = reverse("logger_autosave", args=[self.instance.pk])
+            for name, trigger in self.AUTOSAVE_TRIGGERS.items():
+                self.fields[name].widget.attrs.update({
+                    "hx-post": url,
+                    "hx-trigger": trigger,
+                    "hx-vals": json.dumps({"field": name}),
+                    "hx-target": "#autosave-status",
+                    # One request per field in flight; newer edits replace queued ones
+                    "hx-sync": "this:queue last",
+                })
+
     def clean_payout(self):
         payout = self.cleaned_data.get("payout")
         if payout in (None, ""):
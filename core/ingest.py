@@ -0,0 +1,179 @@
+"""
+Log ingestion with group commit (`POST /api/ingest`).
+
+Request threads hand their events to one flusher thread per process and
+wait. The flusher takes whatever has queued up, waiting at most
+INGEST_FLUSH_MS after the first event or until INGEST_MAX_BATCH events are
+pending, and writes it all in one transaction: a bulk INSERT of the logs,
+then what the post_save receivers would have done per log (change rows,
+activity arrays, daily counts) in bulk. Waiters are released only after
+that transaction commits, so an acknowledged event is durable; the cost of
+a commit (an fsync on SQLite) is paid once per batch instead of per log.
+
+Inside an atomic block (tests, ATOMIC_REQUESTS) or with INGEST_FLUSH_MS = 0
+events are written inline on the caller's connection instead: another
+thread could neither see the caller's uncommitted rows nor roll back with it.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+
+from . import activity, counters
+from .models import Change, IdempotencyKeyConflict, Logger
+
+
+class KeyConflict(IdempotencyKeyConflict):
+    """Some of a request's keys name logs of other quests; none of its logs were written."""
+
+    def __init__(self, indexes: list[int]):
+        super().__init__(f"keys of events {indexes} were already used for other quests")
+        self.indexes = indexes
+
+
+def write(groups: list[list[Logger]]) -> list[list[Logger] | KeyConflict]:
+    """
+    Insert each group (one request's unsaved logs) in one transaction; for
+    each group, the stored log for every log in order. A log whose
+    idempotency key the owner already used (earlier, or earlier in the
+    batch) comes back as that log. A group with a key already used for
+    another quest is written not at all and gets a KeyConflict instead.
+    """
+    try:
+        with transaction.atomic():
+            return _write_batch(groups)
+    except IntegrityError:
+        # A concurrent start took one of the keys between our check and the
+        # INSERT; settle the batch a group at a time
+        return [_write_group(group) for group in groups]
+
+
+def _write_batch(groups):
+    keys = {log.idempotency_key for group in groups for log in group if log.idempotency_key}
+    seen = {}
+    if keys:
+        seen = {
+            (log.owner_id, log.idempotency_key): log
+            for log in Logger.objects.filter(idempotency_key__in=keys)
+        }
+
+    out, new = [], []
+    for group in groups:
+        taken, results = {}, []
+        for log in group:
+            key = (log.owner_id, log.idempotency_key)
+            stored = (taken.get(key) or seen.get(key)) if log.idempotency_key else None
+            if stored is None and log.idempotency_key:
+                taken[key] = log
+            results.append(stored or log)
+        clashes = [i for i, (stored, log) in enumerate(zip(results, group)) if stored.quest_id != log.quest_id]
+        if clashes:
+            out.append(KeyConflict(clashes))
+            continue
+        seen.update(taken)
+        new += [log for stored, log in zip(results, group) if stored is log]
+        out.append(results)
+
+    if new:
+        for log in new:
+            log.derive_notes()
+        Logger.objects.bulk_create(new)
+        Change.objects.bulk_create(
+            Change(owner_id=log.owner_id, model="logger", object_id=log.pk, op=Change.Op.CREATE)
+            for log in new
+        )
+        activity.apply([(log.quest_id, log.timestamp, log.completed, log.payout) for log in new])
+        counters.logs_created([(log.owner_id, log.timestamp) for log in new])
+    return out
+
+
+def _write_group(group):
+    try:
+        with transaction.atomic():
+            return _write_batch([group])[0]
+    except IntegrityError:
+        if not any(log.idempotency_key for log in group):
+            raise
+    # The concurrent log is committed now, so this pass finds it
+    with transaction.atomic():
+        return _write_batch([group])[0]
+
+
+class GroupCommitter:
+    """The per-process queue and flusher thread."""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.pending: list[tuple[list[Logger], Future]] = []
+        self.count = 0
+        self.thread = None
+        self.pid = None
+
+    def submit(self, logs: list[Logger]) -> Future:
+        future = Future()
+        with self.cond:
+            if self.pid != os.getpid():  # first use, or forked with the app preloaded
+                self.pending, self.count, self.pid = [], 0, os.getpid()
+                self.thread = threading.Thread(target=self._run, name="ingest-flusher", daemon=True)
+                self.thread.start()
+            self.pending.append((logs, future))
+            self.count += len(logs)
+            self.cond.notify()
+        return future
+
+    def _take(self):
+        with self.cond:
+            while not self.pending:
+                self.cond.wait()
+            deadline = time.monotonic() + settings.INGEST_FLUSH_MS / 1000
+            while self.count < settings.INGEST_MAX_BATCH:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                self.cond.wait(left)
+
+            # Whole requests, up to the batch size (always at least one)
+            taken, size = [], 0
+            while self.pending and (not taken or size + len(self.pending[0][0]) <= settings.INGEST_MAX_BATCH):
+                logs, future = self.pending.pop(0)
+                taken.append((logs, future))
+                size += len(logs)
+            self.count -= size
+            return taken
+
+    def _run(self):
+        while True:
+            taken = self._take()
+            close_old_connections()
+            try:
+                stored = write([logs for logs, _ in taken])
+            except Exception as exc:
+                connection.close()
+                for _, future in taken:
+                    future.set_exception(exc)
+                continue
+            for (_, future), result in zip(taken, stored):
+                if isinstance(result, KeyConflict):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+committer = GroupCommitter()
+
+
+def ingest(logs: list[Logger]) -> list[Logger]:
+    """
+    Store `logs` (grouped with other requests' where possible) and return
+    once committed. Raises KeyConflict, having written none of them, if a
+    key was already used for another quest.
+    """
+    if settings.INGEST_FLUSH_MS <= 0 or connection.in_atomic_block:
+        [result] = write([logs])
+        if isinstance(result, KeyConflict):
+            raise result
+        return result
+    return committer.submit(logs).result(timeout=settings.INGEST_ACK_TIMEOUT)
@@ -0,0 +1,132 @@
+"""
+Background jobs on a plain database table (`Job`), no broker.
+
+Code registers a function with `@task`, views call `enqueue()` (inside their
+own transaction, so the job only becomes visible if the request commits),
+and `manage.py run_worker` processes rows on a thread pool. Claiming uses
+SELECT ... FOR UPDATE SKIP LOCKED where the backend has it; elsewhere
+(SQLite) a conditional UPDATE from queued to running picks the winner.
+"""
+import logging
+import random
+import traceback
+from datetime import timedelta
+from typing import Callable
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Job
+
+log = logging.getLogger(__name__)
+
+BACKOFF_BASE = timedelta(seconds=5)
+BACKOFF_MAX = timedelta(hours=1)
+
+# A job still "running" after this long belonged to a worker that died
+STALE_AFTER = timedelta(minutes=30)
+
+_tasks: dict[str, Callable] = {}
+
+
+def task(fn: Callable | None = None, *, name: str | None = None, atomic: bool = True):
+    """
+    Register `fn` as a job handler under `name` (default: module.function).
+    Handlers run in a transaction unless atomic=False (for read-mostly work
+    that opens connections of its own, which couldn't see inside it).
+    """
+    def register(fn):
+        _tasks[name or f"{fn.__module__}.{fn.__name__}"] = fn
+        fn.task_name = name or f"{fn.__module__}.{fn.__name__}"
+        fn.task_atomic = atomic
+        return fn
+
+    return register(fn) if fn else register
+
+
+def enqueue(fn_or_name, *, delay: timedelta | None = None, max_attempts: int = 5, **kwargs) -> Job:
+    """Queue a registered task; kwargs must be JSON-serializable."""
+    name = getattr(fn_or_name, "task_name", fn_or_name)
+    if name not in _tasks:
+        raise LookupError(f"No task registered as {name!r}")
+    return Job.objects.create(
+        name=name,
+        kwargs=kwargs,
+        run_at=timezone.now() + (delay or timedelta(0)),
+        max_attempts=max_attempts,
+    )
+
+
+def backoff(attempts: int) -> timedelta:
+    """Delay before retry number `attempts`: exponential, capped, with jitter."""
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def claim(worker: str, limit: int) -> list[Job]:
+    """Mark up to `limit` due jobs as running for `worker` and return them."""
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.Status.QUEUED, run_at__lte=now).order_by("run_at", "id")
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            jobs = list(due.select_for_update(skip_locked=True)[:limit])
+            Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                status=Job.Status.RUNNING, locked_by=worker, locked_at=now
+            )
+    else:
+        jobs = []
+        for job in due[: limit * 2]:
+            won = Job.objects.filter(pk=job.pk, status=Job.Status.QUEUED).update(
+                status=Job.Status.RUNNING, locked_by=worker, locked_at=now
+            )
+            if won:
+                jobs.append(job)
+            if len(jobs) == limit:
+                break
+
+    for job in jobs:
+        job.status, job.locked_by, job.locked_at = Job.Status.RUNNING, worker, now
+    return jobs
+
+
+def run(job: Job) -> bool:
+    """Execute one claimed job and record the outcome; True on success."""
+    job.attempts += 1
+    try:
+        handler = _tasks[job.name]
+        if handler.task_atomic:
+            with transaction.atomic():
+                handler(**job.kwargs)
+        else:
+            handler(**job.kwargs)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.Status.FAILED
+            job.finished_at = timezone.now()
+            log.error("Job %s failed for good after %d attempts", job, job.attempts)
+        else:
+            job.status = Job.Status.QUEUED
+            job.run_at = timezone.now() + backoff(job.attempts)
+            log.warning("Job %s failed (attempt %d), retrying at %s", job, job.attempts, job.run_at)
+        ok = False
+    else:
+        job.status = Job.Status.DONE
+        job.finished_at = timezone.now()
+        job.last_error = ""
+        ok = True
+
+    job.locked_by, job.locked_at = "", None
+    job.save(update_fields=[
+        "status", "attempts", "run_at", "last_error", "locked_by", "locked_at", "finished_at",
+    ])
+    return ok
+
+
+def requeue_stale(older_than: timedelta = STALE_AFTER) -> int:
+    """Hand jobs stuck in `running` (their worker died) back to the queue."""
+    return Job.objects.filter(
+        status=Job.Status.RUNNING,
+        locked_at__lt=timezone.now() - older_than,
+    ).update(status=Job.Status.QUEUED, locked_by="", locked_at=None)
@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import ApiToken
+
+
+class Command(BaseCommand):
+    help = "Create an API token for a user (for /api/ingest); the token is printed once."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("--name", default="", help="What the token is for, e.g. the tracker's name.")
+
+    def handle(self, *args, username, name="", **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(**{User.USERNAME_FIELD: username})
+        except User.DoesNotExist:
+            raise CommandError(f"No user {username!r}.")
+        _, raw = ApiToken.issue(user, name)
+        self.stdout.write(raw)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core import activity, jobs, tasks
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-quest daily activity arrays from the logs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--quest", action="append", dest="quests", metavar="UUID",
+                            help="Only rebuild this quest (repeatable).")
+        parser.add_argument("--background", action="store_true",
+                            help="Queue the rebuild for run_worker instead of running it here.")
+
+    def handle(self, *args, quests=None, background=False, **options):
+        if background:
+            job = jobs.enqueue(tasks.rebuild_activity, quest_ids=quests)
+            self.stdout.write(f"Queued job {job.id}.")
+            return
+        written = activity.rebuild(quests)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} quest-year rows."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core import counters
+
+
+class Command(BaseCommand):
+    help = "Recompute category, per-user and per-day counters from the base tables."
+
+    def handle(self, *args, **options):
+        fixed = counters.reconcile()
+        self.stdout.write(self.style.SUCCESS(f"Reconciled counters; {fixed} row(s) corrected."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core import markup
+from core.models import Category, Logger, Quest
+
+
+class Command(BaseCommand):
+    help = "Re-render stored notes HTML left behind by an older Markdown renderer version."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--all", action="store_true", dest="force",
+                            help="Re-render every row, not just the stale ones.")
+
+    def handle(self, *args, batch_size=500, force=False, **options):
+        for model in (Category, Quest, Logger):
+            count = markup.render_stale(model, batch_size=batch_size, force=force)
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {count} re-rendered")
+        self.stdout.write(self.style.SUCCESS(f"Notes are at renderer version {markup.RENDERER_VERSION}."))
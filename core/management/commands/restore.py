@@ -0,0 +1,34 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import snapshot
+
+
+class Command(BaseCommand):
+    help = "Load a snapshot written by `snapshot` into an empty database, then rebuild derived tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Snapshot file to read.")
+        parser.add_argument("--flush", action="store_true",
+                            help="Empty the whole database first (like `manage.py flush`).")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, path, flush, batch_size, **options):
+        started = time.monotonic()
+        try:
+            # One transaction: a load that fails leaves the flushed data in place
+            with open(path, "rb") as fp, transaction.atomic():
+                if flush:
+                    call_command("flush", interactive=False, verbosity=0)
+                elif not snapshot.is_empty():
+                    raise CommandError("The database already has data; pass --flush to replace it.")
+                counts = snapshot.load(fp, batch_size=batch_size)
+        except (OSError, snapshot.SnapshotError) as exc:
+            raise CommandError(str(exc)) from exc
+        summary = ", ".join(f"{rows} {label}" for label, rows in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Restored {summary} in {time.monotonic() - started:.1f} s."
+        ))
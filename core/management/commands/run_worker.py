@@ -0,0 +1,70 @@
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = "Process queued background jobs on a thread pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--poll", type=float, default=1.0, help="Seconds to sleep when idle.")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty.")
+
+    def handle(self, *args, threads, poll, once, **options):
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        stopping = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stopping.set())
+
+        slots = threading.Semaphore(threads)
+        self.stdout.write(f"Worker {worker} running with {threads} threads")
+
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="job") as pool:
+            last_sweep = 0.0
+            while not stopping.is_set():
+                if time.monotonic() - last_sweep > 60:
+                    jobs.requeue_stale()
+                    last_sweep = time.monotonic()
+
+                free = self._free(slots, threads)
+                claimed = jobs.claim(worker, free) if free else []
+                for _ in range(free - len(claimed)):
+                    slots.release()
+                for job in claimed:
+                    pool.submit(self._run, job, slots)
+
+                if not claimed:
+                    if once and self._free(slots, threads, release=True) == threads:
+                        break
+                    stopping.wait(poll)
+
+        connections.close_all()
+        self.stdout.write(f"Worker {worker} stopped")
+
+    @staticmethod
+    def _free(slots, threads, release=False) -> int:
+        """Take every free slot without blocking (or just count them)."""
+        taken = 0
+        while taken < threads and slots.acquire(blocking=False):
+            taken += 1
+        if release:
+            for _ in range(taken):
+                slots.release()
+        return taken
+
+    @staticmethod
+    def _run(job, slots):
+        try:
+            jobs.run(job)
+        finally:
+            connections.close_all()  # this thread's connections only
+            slots.release()
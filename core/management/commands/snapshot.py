@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import snapshot
+
+
+class Command(BaseCommand):
+    help = "Write users, categories, quests and logs to a compact columnar snapshot file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Snapshot file to write.")
+        parser.add_argument("--level", type=int, default=6, choices=range(0, 10), metavar="0-9",
+                            help="zlib compression level (default 6).")
+
+    def handle(self, *args, path, level, **options):
+        started = time.monotonic()
+        with open(path, "wb") as fp:
+            counts = snapshot.dump(fp, level=level)
+        summary = ", ".join(f"{rows} {label}" for label, rows in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {path} ({summary}) in {time.monotonic() - started:.1f} s."
+        ))
@@ -0,0 +1,136 @@
+"""
+Notes Markdown: a small, safe subset rendered to HTML once, on save.
+
+    # Heading (to ###)     - item / * item     1. item
+    > quote                ``` fenced code ```  blank line = new paragraph
+    **bold**  *italic*  _italic_  `code`  [text](https://…)
+
+The source is HTML-escaped before any markup is recognised, so the only
+tags in the output are the ones produced here, and links are limited to
+http(s) and mailto. Bump RENDERER_VERSION whenever the output for the same
+input changes; `manage.py render_notes` then re-renders the stored copies.
+"""
+import re
+
+from django.utils.html import escape
+
+RENDERER_VERSION = 1
+
+_HEADING_RE = re.compile(r"^(#{1,3})\s+(.*)$")
+_BULLET_RE = re.compile(r"^\s*[-*]\s+(.*)$")
+_NUMBERED_RE = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+_QUOTE_RE = re.compile(r"^&gt;\s?(.*)$")  # ">" is already escaped
+
+_CODE_RE = re.compile(r"`([^`\n]+)`")
+_LINK_RE = re.compile(r"\[([^\]\n]+)\]\(((?:https?://|mailto:)[^\s)]+)\)")
+_BOLD_RE = re.compile(r"\*\*(?=\S)(.+?)(?<=\S)\*\*")
+_ITALIC_RE = re.compile(r"(?<![\w*])([*_])(?=\S)(.+?)(?<=\S)\1(?![\w*])")
+
+
+def _inline(text: str) -> str:
+    # Code spans first, held aside so their contents stay literal
+    spans: list[str] = []
+
+    def hold(match):
+        spans.append(f"<code>{match.group(1)}</code>")
+        return f"\x00{len(spans) - 1}\x00"
+
+    text = _CODE_RE.sub(hold, text)
+    text = _LINK_RE.sub(r'<a href="\2" rel="nofollow noopener">\1</a>', text)
+    text = _BOLD_RE.sub(r"<strong>\1</strong>", text)
+    text = _ITALIC_RE.sub(r"<em>\2</em>", text)
+    return re.sub(r"\x00(\d+)\x00", lambda m: spans[int(m.group(1))], text)
+
+
+def render(source: str) -> str:
+    """HTML for `source` (notes text); "" for blank notes."""
+    if not source.strip():
+        return ""
+    return _blocks(escape(source.replace("\r\n", "\n")).split("\n"))
+
+
+def _blocks(lines: list[str]) -> str:
+    """Block structure of already-escaped lines."""
+    out: list[str] = []
+    paragraph: list[str] = []
+    i = 0
+
+    def flush():
+        if paragraph:
+            out.append("<p>" + "<br>".join(_inline(line) for line in paragraph) + "</p>")
+            paragraph.clear()
+
+    while i < len(lines):
+        line = lines[i]
+
+        if line.startswith("```"):
+            flush()
+            i += 1
+            code = []
+            while i < len(lines) and not lines[i].startswith("```"):
+                code.append(lines[i])
+                i += 1
+            out.append("<pre><code>" + "\n".join(code) + "</code></pre>")
+            i += 1
+            continue
+
+        if not line.strip():
+            flush()
+            i += 1
+            continue
+
+        if heading := _HEADING_RE.match(line):
+            flush()
+            level = len(heading.group(1)) + 2  # the page owns h1/h2
+            out.append(f"<h{level}>{_inline(heading.group(2))}</h{level}>")
+            i += 1
+            continue
+
+        for pattern, tag in ((_BULLET_RE, "ul"), (_NUMBERED_RE, "ol")):
+            if pattern.match(line):
+                flush()
+                items = []
+                while i < len(lines) and (item := pattern.match(lines[i])):
+                    items.append(f"<li>{_inline(item.group(1))}</li>")
+                    i += 1
+                out.append(f"<{tag}>{''.join(items)}</{tag}>")
+                break
+        else:
+            if _QUOTE_RE.match(line):
+                flush()
+                quoted = []
+                while i < len(lines) and (quote := _QUOTE_RE.match(lines[i])):
+                    quoted.append(quote.group(1))
+                    i += 1
+                out.append(f"<blockquote>{_blocks(quoted)}</blockquote>")
+            else:
+                paragraph.append(line)
+                i += 1
+
+    flush()
+    return "\n".join(out)
+
+
+def render_stale(model, batch_size: int = 500, force: bool = False) -> int:
+    """
+    Re-render `notes_html` for rows of `model` rendered by an older
+    RENDERER_VERSION (every row with force=True); returns how many.
+
+    Walks the table in primary-key batches and writes with bulk_update, so
+    no signals fire and updated_at is left alone.
+    """
+    rows = model._base_manager.order_by("pk")
+    if not force:
+        rows = rows.filter(notes_html_version__lt=RENDERER_VERSION)
+    total, last = 0, None
+    while True:
+        batch = rows.filter(pk__gt=last) if last is not None else rows
+        batch = list(batch.only("pk", "notes")[:batch_size])
+        if not batch:
+            return total
+        for obj in batch:
+            obj.notes_html = render(obj.notes)
+            obj.notes_html_version = RENDERER_VERSION
+        model._base_manager.bulk_update(batch, ["notes_html", "notes_html_version"])
+        total += len(batch)
+        last = batch[-1].pk
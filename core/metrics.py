@@ -0,0 +1,253 @@
+"""
+Prometheus metrics shared across gunicorn workers through files.
+
+Each process aggregates into memory and, at most once per
+`METRICS_FLUSH_INTERVAL` seconds, rewrites `<METRICS_DIR>/<pid>.json`
+(write to a temp file, then rename, so readers never see half a file).
+`/metrics` sums every file in the directory. Files left by workers that
+have exited are folded into `archive.json` so counters keep rising across
+worker restarts instead of dropping back.
+"""
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import suppress
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover  (Windows dev boxes)
+    fcntl = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# name -> (type, help)
+METRICS = {
+    "questlog_requests_total": ("counter", "Requests by view, method, status and HTMX vs full page."),
+    "questlog_request_duration_seconds": ("histogram", "Request latency by view."),
+    "questlog_db_queries_per_request": ("histogram", "Database queries per request by view."),
+    "questlog_db_query_seconds_total": ("counter", "Time spent in database queries by view."),
+    "questlog_db_connections_opened_total": ("counter", "Requests that had to open a new database connection."),
+}
+BUCKETS = {
+    "questlog_request_duration_seconds": LATENCY_BUCKETS,
+    "questlog_db_queries_per_request": QUERY_BUCKETS,
+}
+
+ARCHIVE = "archive"
+# <pid>.json, archive.json and the ".<name>.<thread>.tmp" files _write renames from
+_OWN_FILE_RE = re.compile(rf"^(\d+|{ARCHIVE})\.json$|^\.(\d+|{ARCHIVE})\.json\.\d+\.tmp$")
+
+
+class Registry:
+    """This process's samples: {metric: {labels-json: value or histogram}}."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = defaultdict(dict)
+        self.last_flush = 0.0
+
+    def inc(self, name: str, labels: dict, amount: float = 1) -> None:
+        key = json.dumps(labels, sort_keys=True)
+        with self.lock:
+            series = self.data[name]
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, labels: dict, value: float) -> None:
+        key = json.dumps(labels, sort_keys=True)
+        buckets = BUCKETS[name]
+        with self.lock:
+            hist = self.data[name].get(key)
+            if hist is None:
+                hist = self.data[name][key] = {"buckets": [0] * len(buckets), "sum": 0, "count": 0}
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    hist["buckets"][i] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def flush(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self.last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        with self.lock:
+            payload = json.dumps(self.data)
+            self.last_flush = now
+        _write(metrics_dir() / f"{os.getpid()}.json", payload)
+
+
+registry = Registry()
+atexit.register(lambda: registry.flush(force=True))
+
+
+def metrics_dir() -> Path:
+    path = Path(settings.METRICS_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def clear() -> None:
+    """Delete the files a previous run left in METRICS_DIR (and nothing else there)."""
+    directory = Path(settings.METRICS_DIR)
+    if not directory.is_dir():
+        return
+    for path in directory.iterdir():
+        if _OWN_FILE_RE.match(path.name) and path.is_file():
+            with suppress(FileNotFoundError):
+                path.unlink()
+
+
+def _write(path: Path, payload: str) -> None:
+    tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+    tmp.write_text(payload)
+    os.replace(tmp, path)
+
+
+def _merge(total: dict, data: dict) -> None:
+    for name, series in data.items():
+        merged = total.setdefault(name, {})
+        for key, value in series.items():
+            if isinstance(value, dict):
+                hist = merged.setdefault(key, {"buckets": [0] * len(value["buckets"]), "sum": 0, "count": 0})
+                hist["buckets"] = [a + b for a, b in zip(hist["buckets"], value["buckets"])]
+                hist["sum"] += value["sum"]
+                hist["count"] += value["count"]
+            else:
+                merged[key] = merged.get(key, 0) + value
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def collect() -> dict:
+    """Sum of every process's samples (folding dead workers into the archive)."""
+    directory = metrics_dir()
+    registry.flush(force=True)
+
+    with open(directory / ".lock", "w") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = _read(directory / f"{ARCHIVE}.json")
+        total: dict = {}
+        _merge(total, archive)
+
+        dead = []
+        for path in directory.glob("*.json"):
+            if path.stem == ARCHIVE or not path.stem.isdigit():
+                continue
+            data = _read(path)
+            if _alive(int(path.stem)):
+                _merge(total, data)
+            else:
+                _merge(archive, data)
+                _merge(total, data)
+                dead.append(path)
+
+        if dead:
+            _write(directory / f"{ARCHIVE}.json", json.dumps(archive))
+            for path in dead:
+                with suppress(FileNotFoundError):
+                    path.unlink()
+    return total
+
+
+def _labels(key: str, extra: dict | None = None) -> str:
+    labels = {**json.loads(key), **(extra or {})}
+    if not labels:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels.items()
+    )
+    return "{" + body + "}"
+
+
+def render(total: dict) -> str:
+    """Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for key, value in sorted(total.get(name, {}).items()):
+            if kind == "histogram":
+                for bound, count in zip(BUCKETS[name], value["buckets"]):
+                    lines.append(f"{name}_bucket{_labels(key, {'le': bound})} {count}")
+                lines.append(f"{name}_bucket{_labels(key, {'le': '+Inf'})} {value['count']}")
+                lines.append(f"{name}_sum{_labels(key)} {value['sum']}")
+                lines.append(f"{name}_count{_labels(key)} {value['count']}")
+            else:
+                lines.append(f"{name}{_labels(key)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Outermost-ish, so the timing covers the rest of the middleware stack."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = {"count": 0, "seconds": 0.0}
+
+        def count_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries["count"] += 1
+                queries["seconds"] += time.perf_counter() - started
+
+        had_connection = connection.connection is not None
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unmatched"
+        registry.inc("questlog_requests_total", {
+            "view": view,
+            "method": request.method,
+            "status": response.status_code,
+            "htmx": "true" if request.headers.get("HX-Request") else "false",
+        })
+        registry.observe("questlog_request_duration_seconds", {"view": view}, elapsed)
+        registry.observe("questlog_db_queries_per_request", {"view": view}, queries["count"])
+        if queries["count"]:
+            registry.inc("questlog_db_query_seconds_total", {"view": view}, queries["seconds"])
+        if not had_connection and connection.connection is not None:
+            registry.inc("questlog_db_connections_opened_total", {})
+        registry.flush()
+        return response
+
+
+@require_GET
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponse("Unauthorized", status=401, content_type="text/plain")
+    return HttpResponse(render(collect()), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,41 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+def backfill_changes(apps, schema_editor):
+    # Seed the feed with one "create" per existing row so a client syncing
+    # from token 0 sees the whole dataset.
+    Change = apps.get_model("core", "Change")
+    for model_name, label in (("Category", "category"), ("Quest", "quest"), ("Logger", "logger")):
+        Model = apps.get_model("core", model_name)
+        ids = Model.objects.order_by("pk").values_list("pk", flat=True).iterator()
+        Change.objects.bulk_create(
+            (Change(model=label, object_id=pk, op="create") for pk in ids),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_alter_quest_start_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=20)),
+                ('object_id', models.UUIDField()),
+                ('op', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], max_length=6)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ('seq',),
+                'indexes': [models.Index(fields=['model', 'object_id'], name='core_change_model_1bba02_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_changes, migrations.RunPython.noop),
+    ]
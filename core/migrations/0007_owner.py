@@ -0,0 +1,62 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def assign_existing_rows(apps, schema_editor):
+    # Everything created before multi-user support belongs to the first
+    # superuser (or the first user). If there is data but no user at all,
+    # park it on an inactive placeholder account an admin can reassign.
+    Category = apps.get_model("core", "Category")
+    Quest = apps.get_model("core", "Quest")
+    Logger = apps.get_model("core", "Logger")
+    Change = apps.get_model("core", "Change")
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+
+    models_with_rows = [m for m in (Category, Quest, Logger, Change) if m.objects.exists()]
+    if not models_with_rows:
+        return
+
+    owner = (
+        User.objects.filter(is_superuser=True).order_by("pk").first()
+        or User.objects.order_by("pk").first()
+    )
+    if owner is None:
+        owner = User.objects.create(username="questlog", is_active=False, password="!")
+
+    for model in models_with_rows:
+        model.objects.update(owner=owner)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_outbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='owner',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='categories', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='change',
+            name='owner',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='logger',
+            name='owner',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='logs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='quest',
+            name='owner',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='quests', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(assign_existing_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_owner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='quest',
+            name='core_quest_end_dat_3dc5d3_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='quest',
+            name='core_quest_limited_c712f1_idx',
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='categories', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='change',
+            name='owner',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='logger',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='logs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='quest',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quests', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='name',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['owner', 'seq'], name='core_change_owner_i_c0c15f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logger',
+            index=models.Index(fields=['owner', 'timestamp'], name='core_logger_owner_i_ac4ba2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quest',
+            index=models.Index(fields=['owner', 'end_date', 'updated_at'], name='core_quest_owner_i_d94e54_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quest',
+            index=models.Index(fields=['owner', 'limited_mobility', 'end_date'], name='core_quest_owner_i_c4312e_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='category',
+            constraint=models.UniqueConstraint(fields=('owner', 'name'), name='core_category_owner_name_uniq'),
+        ),
+    ]
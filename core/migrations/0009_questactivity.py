@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_activity(apps, schema_editor):
+    from core.activity import YearCounts, day_of
+
+    Logger = apps.get_model("core", "Logger")
+    QuestActivity = apps.get_model("core", "QuestActivity")
+
+    years = {}
+    logs = Logger.objects.order_by().values_list("quest_id", "timestamp", "completed", "payout")
+    for quest_id, timestamp, completed, payout in logs.iterator(chunk_size=5000):
+        day = day_of(timestamp)
+        counts = years.setdefault((quest_id, day.year), YearCounts())
+        counts.add(day.timetuple().tm_yday - 1, 1, int(completed), payout or 0)
+
+    rows = []
+    for (quest_id, year), counts in years.items():
+        row = QuestActivity(quest_id=quest_id, year=year)
+        counts.store(row)
+        rows.append(row)
+    QuestActivity.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_owner_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestActivity',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('year', models.PositiveSmallIntegerField()),
+                ('sessions', models.BinaryField(default=bytes)),
+                ('completed', models.BinaryField(default=bytes)),
+                ('payout', models.BinaryField(default=bytes)),
+                ('quest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='core.quest')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('quest', 'year'), name='core_questactivity_quest_year_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_activity, migrations.RunPython.noop),
+    ]
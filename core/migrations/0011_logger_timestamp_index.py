@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='logger',
+            index=models.Index(fields=['timestamp'], name='core_logger_timesta_c9e80e_idx'),
+        ),
+    ]
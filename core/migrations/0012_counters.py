@@ -0,0 +1,89 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def backfill_counters(apps, schema_editor):
+    Category = apps.get_model("core", "Category")
+    Quest = apps.get_model("core", "Quest")
+    Logger = apps.get_model("core", "Logger")
+    UserCounters = apps.get_model("core", "UserCounters")
+    DailyLogCount = apps.get_model("core", "DailyLogCount")
+    active = Q(end_date__isnull=True)
+
+    per_category = (
+        Quest.objects.order_by().filter(category__isnull=False).values("category_id")
+        .annotate(total=Count("id"), active=Count("id", filter=active))
+    )
+    for row in per_category:
+        Category.objects.filter(pk=row["category_id"]).update(
+            quest_count=row["total"], active_quest_count=row["active"]
+        )
+
+    per_owner = (
+        Quest.objects.order_by().values("owner_id")
+        .annotate(total=Count("id"), active=Count("id", filter=active))
+    )
+    UserCounters.objects.bulk_create(
+        UserCounters(owner_id=row["owner_id"], quest_count=row["total"], active_quest_count=row["active"])
+        for row in per_owner
+    )
+
+    per_day = (
+        Logger.objects.order_by()
+        .annotate(day=TruncDate("timestamp", tzinfo=timezone.get_current_timezone()))
+        .values("owner_id", "day")
+        .annotate(n=Count("id"))
+    )
+    DailyLogCount.objects.bulk_create(
+        (DailyLogCount(owner_id=row["owner_id"], day=row["day"], count=row["n"]) for row in per_day),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0011_logger_timestamp_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCounters',
+            fields=[
+                ('owner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('quest_count', models.PositiveIntegerField(default=0)),
+                ('active_quest_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='active_quest_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='quest_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='DailyLogCount',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('owner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('owner', 'day'), name='core_dailylogcount_owner_day_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:25
+
+import core.dice
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='payout_formula',
+            field=models.CharField(blank=True, help_text="Dice formula for rolled payouts of this category's quests, e.g. 2d6!+3.", max_length=100, validators=[core.dice.validate_formula]),
+        ),
+        migrations.AddField(
+            model_name='quest',
+            name='payout_formula',
+            field=models.CharField(blank=True, help_text="Dice formula for rolled payouts; blank uses the category's (or d10!).", max_length=100, validators=[core.dice.validate_formula]),
+        ),
+    ]
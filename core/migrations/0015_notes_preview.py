@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:41
+
+from django.db import migrations, models
+
+from core.models import notes_preview
+
+
+def backfill_previews(apps, schema_editor):
+    for name in ("Category", "Quest", "Logger"):
+        model = apps.get_model("core", name)
+        rows = model.objects.exclude(notes="").values_list("pk", "notes")
+        for pk, notes in rows.iterator(chunk_size=2000):
+            model.objects.filter(pk=pk).update(notes_preview=notes_preview(notes))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_logger_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='notes_preview',
+            field=models.CharField(blank=True, editable=False, max_length=140),
+        ),
+        migrations.AddField(
+            model_name='logger',
+            name='notes_preview',
+            field=models.CharField(blank=True, editable=False, max_length=140),
+        ),
+        migrations.AddField(
+            model_name='quest',
+            name='notes_preview',
+            field=models.CharField(blank=True, editable=False, max_length=140),
+        ),
+        migrations.RunPython(backfill_previews, migrations.RunPython.noop),
+    ]
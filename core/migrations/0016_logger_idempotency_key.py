@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_notes_preview'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='logger',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='logger',
+            constraint=models.UniqueConstraint(fields=('owner', 'idempotency_key'), name='logger_unique_idempotency_key'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_logger_idempotency_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quest',
+            name='is_ended',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(end_date__isnull=True, then=models.Value(False)), default=models.Value(True)), output_field=models.BooleanField()),
+        ),
+        migrations.AddIndex(
+            model_name='quest',
+            index=models.Index(fields=['owner', 'is_ended', '-updated_at', '-id'], name='quest_list_order'),
+        ),
+        migrations.AddIndex(
+            model_name='quest',
+            index=models.Index(fields=['category', 'is_ended', '-updated_at', '-id'], name='quest_category_order'),
+        ),
+    ]
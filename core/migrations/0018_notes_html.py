@@ -0,0 +1,51 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:20
+
+from django.db import migrations, models
+
+from core.markup import render_stale
+
+
+def render_notes(apps, schema_editor):
+    for name in ("Category", "Quest", "Logger"):
+        render_stale(apps.get_model("core", name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_quest_is_ended'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='notes_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='notes_html_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='logger',
+            name='notes_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='logger',
+            name='notes_html_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='quest',
+            name='notes_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='quest',
+            name='notes_html_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(render_notes, migrations.RunPython.noop),
+    ]
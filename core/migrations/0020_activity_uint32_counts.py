@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-19 19:30
+
+import struct
+
+from django.db import migrations
+
+
+def _widen(blob, old: str, new: str) -> bytes:
+    blob = bytes(blob)
+    if not blob:
+        return blob
+    values = struct.unpack(f"<{len(blob) // struct.calcsize(old)}{old}", blob)
+    if new == "H":  # going back down: saturate what no longer fits
+        values = [min(value, 0xFFFF) for value in values]
+    return struct.pack(f"<{len(values)}{new}", *values)
+
+
+def widen_counts(apps, schema_editor):
+    QuestActivity = apps.get_model("core", "QuestActivity")
+    for row in QuestActivity.objects.only("id", "sessions", "completed").iterator(chunk_size=1000):
+        row.sessions = _widen(row.sessions, "H", "I")
+        row.completed = _widen(row.completed, "H", "I")
+        row.save(update_fields=["sessions", "completed"])
+
+
+def narrow_counts(apps, schema_editor):
+    QuestActivity = apps.get_model("core", "QuestActivity")
+    for row in QuestActivity.objects.only("id", "sessions", "completed").iterator(chunk_size=1000):
+        row.sessions = _widen(row.sessions, "I", "H")
+        row.completed = _widen(row.completed, "I", "H")
+        row.save(update_fields=["sessions", "completed"])
+
+
+class Migration(migrations.Migration):
+    """Activity session/completion arrays go from uint16 to uint32 slots."""
+
+    dependencies = [
+        ('core', '0019_apitoken'),
+    ]
+
+    operations = [
+        migrations.RunPython(widen_counts, narrow_counts),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-19 19:45
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_activity_uint32_counts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('range', models.CharField(max_length=10)),
+                ('start', models.DateTimeField()),
+                ('computed_at', models.DateTimeField()),
+                ('quests', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('owner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('owner', 'range'), name='core_statssnapshot_owner_range_uniq')],
+            },
+        ),
+    ]
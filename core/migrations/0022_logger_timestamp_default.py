@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-19 20:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_statssnapshot'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='logger',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
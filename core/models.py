@@ -1,9 +1,123 @@
+import hashlib
+import secrets
 import uuid
-from django.db import models
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Q, Value, When
+from django.db.models.signals import post_save
 from django.utils.timezone import now
 
+from . import markup
+from .dice import DEFAULT_FORMULA, validate_formula
+
+
+class TrackedModel(models.Model):
+    """
+    Base for models that feed the outbox (`Change`).
+
+    Remembers the column values it was loaded with so the post_save receiver
+    can tell which fields a save actually changed, and runs save/delete in a
+    transaction so the outbox row commits (or rolls back) with the write.
+    """
+
+    # Bookkeeping columns left out of changed_fields() (and so the outbox)
+    untracked_fields: tuple[str, ...] = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def _column_values(self) -> dict:
+        deferred = self.get_deferred_fields()  # never trigger a lazy load here
+        return {
+            f.attname: getattr(self, f.attname)
+            for f in self._meta.concrete_fields
+            if f.attname not in deferred
+        }
+
+    def changed_fields(self) -> list[str]:
+        """Attnames that differ from the values loaded from the database."""
+        loaded = getattr(self, "_loaded_values", None)
+        current = self._column_values()
+        if loaded is None:
+            return list(current)
+        return [
+            name for name, value in current.items()
+            if loaded.get(name, value) != value and name not in self.untracked_fields
+        ]
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+        self._loaded_values = self._column_values()
 
-class QuestQuerySet(models.QuerySet):
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get("using")):
+            return super().delete(*args, **kwargs)
+
+
+NOTES_PREVIEW_LENGTH = 140
+
+
+def notes_preview(notes: str) -> str:
+    """Notes on one line, cut to NOTES_PREVIEW_LENGTH with an ellipsis."""
+    text = " ".join(notes.split())
+    if len(text) <= NOTES_PREVIEW_LENGTH:
+        return text
+    return text[:NOTES_PREVIEW_LENGTH - 1].rstrip() + "…"
+
+
+class NotesMixin:
+    """
+    Keeps the columns derived from `notes` (declared on the model) in step
+    with it: `notes_preview`, so lists can show a line without loading
+    notes that may be long, and `notes_html`, the Markdown rendered once
+    here instead of on every page view.
+    """
+
+    NOTES_DERIVED_FIELDS = ("notes_preview", "notes_html", "notes_html_version")
+    untracked_fields = NOTES_DERIVED_FIELDS
+
+    @property
+    def notes_truncated(self) -> bool:
+        return self.notes_preview.endswith("…") and len(self.notes_preview) >= NOTES_PREVIEW_LENGTH - 1
+
+    def derive_notes(self) -> None:
+        self.notes_preview = notes_preview(self.notes)
+        self.notes_html = markup.render(self.notes)
+        self.notes_html_version = markup.RENDERER_VERSION
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "notes" in update_fields:
+            self.derive_notes()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, *self.NOTES_DERIVED_FIELDS}
+        super().save(*args, **kwargs)
+
+
+class OwnedQuerySet(models.QuerySet):
+    def for_user(self, user):
+        return self.filter(owner=user)
+
+
+class CategoryManager(models.Manager):
+    def get_queryset(self):
+        return OwnedQuerySet(self.model, using=self._db)
+
+    def for_user(self, user):
+        return self.get_queryset().for_user(user)
+
+
+class QuestQuerySet(OwnedQuerySet):
     def active(self):
         return self.filter(end_date__isnull=True)
 
@@ -13,11 +127,33 @@ class QuestQuerySet(models.QuerySet):
     def by_mobility(self, limited: bool):
         return self.filter(limited_mobility=limited)
 
+    def listing(self):
+        """Just the columns the quest lists and cards show (no full notes)."""
+        return self.select_related("category").only(
+            "id", "owner_id", "title", "category_id", "category__name", "start_date", "end_date",
+            "limited_mobility", "notes_preview", "updated_at", "is_ended",
+        )
+
+    def in_list_order(self):
+        """Active first, then most recently updated; matches the list indexes."""
+        return self.order_by("is_ended", "-updated_at", "-id")
+
+    def after(self, is_ended: bool, updated_at, pk):
+        """Keyset filter: the quests that come after (is_ended, updated_at, pk) in list order."""
+        return self.filter(
+            Q(is_ended__gt=is_ended)
+            | Q(is_ended=is_ended, updated_at__lt=updated_at)
+            | Q(is_ended=is_ended, updated_at=updated_at, id__lt=pk)
+        )
+
 
 class QuestManager(models.Manager):
     def get_queryset(self):
         return QuestQuerySet(self.model, using=self._db)
 
+    def for_user(self, user):
+        return self.get_queryset().for_user(user)
+
     def active(self):
         return self.get_queryset().active()
 
@@ -28,23 +164,155 @@ class QuestManager(models.Manager):
         return self.get_queryset().by_mobility(limited)
 
 
-class Category(models.Model):
+class LoggerQuerySet(OwnedQuerySet):
+    def matching(self, completed: str = "all", date_range: str = "", category_id: str = ""):
+        """The log_list filters: completed (all|yes|no), range (""|today|7d), category uuid."""
+        qs = self
+        if completed == "yes":
+            qs = qs.filter(completed=True)
+        elif completed == "no":
+            qs = qs.filter(completed=False)
+
+        if date_range == "today":
+            qs = qs.filter(timestamp__date=now().date())
+        elif date_range == "7d":
+            qs = qs.filter(timestamp__gte=now() - timedelta(days=7))
+
+        if category_id:
+            qs = qs.filter(quest__category_id=category_id)
+        return qs
+
+    def listing(self):
+        """Just the columns the log lists show (no full notes)."""
+        return self.select_related("quest", "quest__category").only(
+            "id", "owner_id", "quest_id", "timestamp", "completed", "payout", "notes_preview",
+            "quest__title", "quest__category_id", "quest__category__name",
+        )
+
+
+class InvalidIdempotencyKey(ValueError):
+    pass
+
+
+class IdempotencyKeyConflict(ValueError):
+    """The key already names a log of a different quest."""
+
+
+IDEMPOTENCY_KEY_LENGTH = 64
+
+
+class LoggerManager(models.Manager):
+    def get_queryset(self):
+        return LoggerQuerySet(self.model, using=self._db)
+
+    def for_user(self, user):
+        return self.get_queryset().for_user(user)
+
+    def matching(self, completed: str = "all", date_range: str = "", category_id: str = ""):
+        return self.get_queryset().matching(completed, date_range, category_id)
+
+    def start(self, quest, key: str = "") -> tuple["Logger", bool]:
+        """
+        Start a log of `quest`, or return the one this request already
+        started: the log recorded under the client's idempotency `key`, else
+        an open log of the same quest younger than LOG_START_REUSE_SECONDS.
+        Returns (log, created).
+
+        Raises InvalidIdempotencyKey for a key longer than
+        IDEMPOTENCY_KEY_LENGTH, and IdempotencyKeyConflict when the key
+        already belongs to a log of another quest.
+        """
+        if len(key) > IDEMPOTENCY_KEY_LENGTH:
+            raise InvalidIdempotencyKey(f"Idempotency keys are at most {IDEMPOTENCY_KEY_LENGTH} characters.")
+        key = key or None
+        if key:
+            # One probe of the (owner, idempotency_key) unique index
+            log = self.filter(owner_id=quest.owner_id, idempotency_key=key).first()
+            if log is not None:
+                return self._same_quest(log, quest), False
+
+        window = settings.LOG_START_REUSE_SECONDS
+        if window:
+            log = (
+                self.filter(quest=quest, completed=False, timestamp__gte=now() - timedelta(seconds=window))
+                .order_by("-timestamp").first()
+            )
+            if log is not None:
+                return log, False
+
+        try:
+            with transaction.atomic():
+                return self.create(quest=quest, owner_id=quest.owner_id, idempotency_key=key), True
+        except IntegrityError:
+            if key is None:
+                raise
+            # A concurrent retry with the same key won the insert
+            return self._same_quest(self.get(owner_id=quest.owner_id, idempotency_key=key), quest), False
+
+    @staticmethod
+    def _same_quest(log, quest):
+        if log.quest_id != quest.pk:
+            raise IdempotencyKeyConflict("This idempotency key was already used for another quest.")
+        return log
+
+
+class Category(NotesMixin, TrackedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    name = models.CharField(max_length=100, unique=True)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="categories",
+    )
+    name = models.CharField(max_length=100)
     notes = models.TextField(blank=True)
+    notes_preview = models.CharField(max_length=NOTES_PREVIEW_LENGTH, blank=True, editable=False)
+    notes_html = models.TextField(blank=True, editable=False)
+    notes_html_version = models.PositiveSmallIntegerField(default=0, editable=False)
+    payout_formula = models.CharField(
+        max_length=100,
+        blank=True,
+        validators=[validate_formula],
+        help_text="Dice formula for rolled payouts of this category's quests, e.g. 2d6!+3.",
+    )
+
+    # Maintained by core/counters.py; never written by a normal save()
+    quest_count = models.PositiveIntegerField(default=0, editable=False)
+    active_quest_count = models.PositiveIntegerField(default=0, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    objects = CategoryManager()
+
+    COUNTER_FIELDS = ("quest_count", "active_quest_count")
 
     class Meta:
         ordering = ("name",)
+        constraints = [
+            # Also serves (owner, name) lookups and the name-ordered list
+            models.UniqueConstraint(fields=["owner", "name"], name="core_category_owner_name_uniq"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # A full save would write back whatever counts this instance loaded,
+        # clobbering increments made since; leave them to the counter updates.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return self.name
 
 
-class Quest(models.Model):
+class Quest(NotesMixin, TrackedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="quests",
+    )
 
     title = models.CharField(max_length=200)
     category = models.ForeignKey(
@@ -60,16 +328,37 @@ class Quest(models.Model):
     end_date = models.DateField(null=True, blank=True)
     limited_mobility = models.BooleanField(default=False)
     notes = models.TextField(blank=True)
+    notes_preview = models.CharField(max_length=NOTES_PREVIEW_LENGTH, blank=True, editable=False)
+    notes_html = models.TextField(blank=True, editable=False)
+    notes_html_version = models.PositiveSmallIntegerField(default=0, editable=False)
+    payout_formula = models.CharField(
+        max_length=100,
+        blank=True,
+        validators=[validate_formula],
+        help_text="Dice formula for rolled payouts; blank uses the category's (or d10!).",
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Leading sort key of the quest lists (active first), kept by the
+    # database so list order can come straight off an index
+    is_ended = models.GeneratedField(
+        expression=Case(When(end_date__isnull=True, then=Value(False)), default=Value(True)),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
     objects = QuestManager()
 
+    untracked_fields = (*NotesMixin.NOTES_DERIVED_FIELDS, "is_ended")
 
     class Meta:
+        # Owner leads every index so a user's pages never touch other users' rows
         indexes = [
-            models.Index(fields=["end_date"]),
-            models.Index(fields=["limited_mobility", "end_date"]),
+            models.Index(fields=["owner", "end_date", "updated_at"]),
+            models.Index(fields=["owner", "limited_mobility", "end_date"]),
+            # List order (in_list_order) for all of a user's quests and per category
+            models.Index(fields=["owner", "is_ended", "-updated_at", "-id"], name="quest_list_order"),
+            models.Index(fields=["category", "is_ended", "-updated_at", "-id"], name="quest_category_order"),
         ]
         ordering = ("-updated_at",)
     @property
@@ -80,29 +369,315 @@ class Quest(models.Model):
     def is_active(self) -> bool:
         return self.end_date is None
 
+    @property
+    def effective_payout_formula(self) -> str:
+        category = self.category if self.category_id else None
+        return self.payout_formula or (category and category.payout_formula) or DEFAULT_FORMULA
+
 
     def __str__(self) -> str:
         return self.title
 
 
-class Logger(models.Model):
+class Logger(NotesMixin, TrackedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="logs",
+    )
     quest = models.ForeignKey(Quest, on_delete=models.CASCADE, related_name="logs")
 
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # A default rather than auto_now_add so ingested events can carry when they happened
+    timestamp = models.DateTimeField(default=now, editable=False)
     completed = models.BooleanField(default=False)
     payout = models.IntegerField(null=True, blank=True)
     notes = models.TextField(blank=True)
+    notes_preview = models.CharField(max_length=NOTES_PREVIEW_LENGTH, blank=True, editable=False)
+    notes_html = models.TextField(blank=True, editable=False)
+    notes_html_version = models.PositiveSmallIntegerField(default=0, editable=False)
+    # Bumped on every save; autosave writes only if it still matches what
+    # the editor loaded (see save_if_current)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # Client-chosen key of the start request that created this log, so a
+    # retried start finds it instead of inserting a duplicate
+    idempotency_key = models.CharField(max_length=IDEMPOTENCY_KEY_LENGTH, null=True, blank=True, editable=False)
+    objects = LoggerManager()
+
+    untracked_fields = (*NotesMixin.NOTES_DERIVED_FIELDS, "version", "idempotency_key")
 
     @property
     def is_completed(self) -> bool:
         return bool(self.completed)
 
     class Meta:
-        indexes = [models.Index(fields=["quest", "timestamp"])]
+        indexes = [
+            models.Index(fields=["quest", "timestamp"]),
+            models.Index(fields=["owner", "timestamp"]),
+            # Cross-user newest-first scans (the admin changelist, date_hierarchy)
+            models.Index(fields=["timestamp"]),
+        ]
+        constraints = [
+            # NULL keys (starts without one) never collide
+            models.UniqueConstraint(fields=["owner", "idempotency_key"], name="logger_unique_idempotency_key"),
+        ]
         ordering = ("-timestamp",)
 
+    def save(self, *args, **kwargs):
+        # A log always belongs to whoever owns its quest
+        if self.owner_id is None and self.quest_id is not None:
+            self.owner_id = self.quest.owner_id
+        if not self._state.adding:
+            self.version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+        super().save(*args, **kwargs)
+
+    def save_if_current(self, version: int, update_fields) -> bool:
+        """
+        Write `update_fields` only if the row is still at `version`; returns
+        False, writing nothing, if another save got there first.
+
+        A conditional UPDATE rather than a row lock, so editors never wait
+        on each other; post_save is sent by hand since QuerySet.update()
+        doesn't.
+        """
+        update_fields = [*update_fields, "version"]
+        if "notes" in update_fields:
+            self.derive_notes()
+            update_fields += self.NOTES_DERIVED_FIELDS
+        loaded_version = self.version
+        with transaction.atomic():
+            self.version = version + 1
+            values = {name: getattr(self, self._meta.get_field(name).attname) for name in update_fields}
+            if not type(self).objects.filter(pk=self.pk, version=version).update(**values):
+                self.version = loaded_version
+                return False
+            post_save.send(
+                sender=type(self), instance=self, created=False,
+                update_fields=frozenset(update_fields), raw=False, using=self._state.db,
+            )
+        self._loaded_values = self._column_values()
+        return True
+
     def __str__(self) -> str:
         return f"{self.quest.title} @ {self.timestamp:%Y-%m-%d %H:%M}"
 
 
+class QuestActivity(models.Model):
+    """
+    One quest's per-day activity for one calendar year (see core/activity.py).
+
+    Each field is a packed little-endian array of 366 slots indexed by day
+    of year: sessions and completed are uint32 counts, payout is int32 sums.
+    Derived from the logs; `rebuild_activity` regenerates it.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    quest = models.ForeignKey(Quest, on_delete=models.CASCADE, related_name="activity")
+    year = models.PositiveSmallIntegerField()
+    sessions = models.BinaryField(default=bytes)
+    completed = models.BinaryField(default=bytes)
+    payout = models.BinaryField(default=bytes)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["quest", "year"], name="core_questactivity_quest_year_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.quest_id} {self.year}"
+
+
+class UserCounters(models.Model):
+    """Per-user dashboard totals, maintained by core/counters.py."""
+
+    owner = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="counters",
+    )
+    quest_count = models.PositiveIntegerField(default=0)
+    active_quest_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.owner_id}: {self.quest_count} quests"
+
+
+class DailyLogCount(models.Model):
+    """Logs started per user per (local) day, maintained by core/counters.py."""
+
+    id = models.BigAutoField(primary_key=True)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,  # covered by (owner, day)
+    )
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["owner", "day"], name="core_dailylogcount_owner_day_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.owner_id} {self.day}: {self.count}"
+
+
+class Change(models.Model):
+    """
+    Append-only change sequence (the outbox) for quests, logs and categories.
+
+    `seq` is the primary key, so "everything after token N" is a range scan
+    on the pk index no matter how large the base tables get. `fields` lists
+    the attnames an update touched; it is empty for creates and deletes.
+    """
+
+    class Op(models.TextChoices):
+        CREATE = "create", "Create"
+        UPDATE = "update", "Update"
+        DELETE = "delete", "Delete"
+
+    seq = models.BigAutoField(primary_key=True)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,  # covered by (owner, seq)
+    )
+    model = models.CharField(max_length=20)  # "quest" | "logger" | "category"
+    object_id = models.UUIDField()
+    op = models.CharField(max_length=6, choices=Op.choices)
+    fields = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("seq",)
+        indexes = [
+            models.Index(fields=["model", "object_id"]),
+            models.Index(fields=["owner", "seq"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"#{self.seq} {self.op} {self.model}:{self.object_id}"
+
+
+class OutboxCheckpoint(models.Model):
+    """How far a named outbox consumer has got (last processed `Change.seq`)."""
+
+    name = models.CharField(max_length=100, primary_key=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.name} @ {self.position}"
+
+
+class Job(models.Model):
+    """
+    A unit of background work for `manage.py run_worker` (see core/jobs.py).
+
+    Workers claim `queued` rows whose `run_at` has passed; a failed attempt
+    goes back to `queued` with a later `run_at` until `max_attempts` is used up.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    id = models.BigAutoField(primary_key=True)
+    name = models.CharField(max_length=100)  # registered task name
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=7, choices=Status.choices, default=Status.QUEUED)
+    run_at = models.DateTimeField(default=now)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    last_error = models.TextField(blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("run_at", "id")
+        indexes = [
+            # The claim query: status = 'queued' AND run_at <= now ORDER BY run_at
+            models.Index(fields=["status", "run_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"#{self.id} {self.name} ({self.status})"
+
+
+class StatsSnapshot(models.Model):
+    """
+    One user's per-quest stats rows for a long range (see stats.QUEUED_RANGES).
+
+    Written by the `refresh_stats` job so /stats/ doesn't scan a year of
+    logs inside the request; `computed_at` is the window's end.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,  # covered by (owner, range)
+    )
+    range = models.CharField(max_length=10)
+    start = models.DateTimeField()
+    computed_at = models.DateTimeField()
+    quests = models.JSONField(default=list, encoder=DjangoJSONEncoder)  # stats.QuestStats fields
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["owner", "range"], name="core_statssnapshot_owner_range_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.owner_id} {self.range} @ {self.computed_at}"
+
+
+class ApiToken(models.Model):
+    """
+    A bearer token for scripts and trackers (`manage.py issue_api_token`).
+
+    Only a SHA-256 digest is stored; the token itself is shown once, when
+    it is issued.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="api_tokens",
+    )
+    name = models.CharField(max_length=100, blank=True)
+    digest = models.CharField(max_length=64, unique=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @staticmethod
+    def _digest(raw: str) -> str:
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    @classmethod
+    def issue(cls, owner, name: str = "") -> tuple["ApiToken", str]:
+        """Create a token for `owner`; returns it and the raw token to hand over."""
+        raw = secrets.token_urlsafe(32)
+        return cls.objects.create(owner=owner, name=name, digest=cls._digest(raw)), raw
+
+    @classmethod
+    def user_for(cls, raw: str):
+        """The active user `raw` belongs to, or None."""
+        token = cls.objects.select_related("owner").filter(digest=cls._digest(raw)).first()
+        return token.owner if token and token.owner.is_active else None
+
+    def __str__(self) -> str:
+        return f"{self.owner_id}: {self.name or self.id}"
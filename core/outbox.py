@@ -0,0 +1,140 @@
+"""
+Consumer side of the outbox (`Change`).
+
+Derived data (caches, rollups, exports, search indexes) registers nothing up
+front; it just calls `consume()` with a stable name and a handler. Each batch
+is handed over in `seq` order and the checkpoint only moves once the handler
+returns, inside the same transaction, so a crash or deploy resumes from the
+last finished batch instead of rebuilding from the base tables.
+"""
+import threading
+from typing import Callable
+
+from django.db import connection, transaction
+
+from .models import Change, OutboxCheckpoint
+
+DEFAULT_BATCH_SIZE = 500
+
+
+# --- Commit-safe watermark -----------------------------------------------
+# On Postgres seqs are handed out when rows are inserted, not when they
+# commit, so seq 11 can be visible while seq 10 is still in flight; a reader
+# that moved past 11 would never see 10. Reads are therefore capped at a
+# watermark: a max(seq) is only trusted once every transaction that was
+# running when it was read has finished (the snapshot's xmin has passed the
+# xmax recorded with it). Whatever those transactions inserted got its seq
+# before that read, so nothing at or below the watermark can still appear.
+# This only holds if the writing transaction already has an xid when the
+# seq is drawn. Postgres assigns one at the first write, and nextval() is not
+# a write. Change rows written after the row they describe (post_save,
+# post_delete) are covered. Rows written before any other write, such as
+# pre_delete, have to call claim_xid() first. SQLite runs one writer at a
+# time, so seq order is commit order there and no cap is needed.
+
+_WATERMARK_SQL = """
+    SELECT pg_snapshot_xmin(s)::text::bigint, pg_snapshot_xmax(s)::text::bigint,
+           (SELECT COALESCE(MAX(seq), 0) FROM {table})
+    FROM pg_current_snapshot() AS s
+"""
+
+
+class _Watermark:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.safe = 0
+        self.pending = None  # (max seq, xmax) read while transactions were running
+
+    def advance(self, xmin: int, xmax: int, max_seq: int) -> int:
+        with self.lock:
+            if self.pending and xmin >= self.pending[1]:
+                self.safe = max(self.safe, self.pending[0])
+                self.pending = None
+            if xmin == xmax:  # nothing in flight: everything visible is final
+                self.safe, self.pending = max(self.safe, max_seq), None
+            elif self.pending is None:
+                self.pending = (max_seq, xmax)
+            return self.safe
+
+
+_watermark = _Watermark()
+
+
+def claim_xid() -> None:
+    """Make the current transaction take its xid now, before it draws a seq."""
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT txid_current()")
+
+
+def committed_seq() -> int | None:
+    """
+    Highest seq below which no row can still appear, or None where seq
+    order is commit order anyway. Readers of the outbox stay at or below it.
+    """
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(_WATERMARK_SQL.format(table=connection.ops.quote_name(Change._meta.db_table)))
+        return _watermark.advance(*cursor.fetchone())
+
+
+def position(name: str) -> int:
+    """Last `seq` the consumer has processed (0 if it never ran)."""
+    return (
+        OutboxCheckpoint.objects
+        .filter(name=name)
+        .values_list("position", flat=True)
+        .first()
+    ) or 0
+
+
+def reset(name: str, to: int = 0) -> None:
+    """Rewind (or fast-forward) a consumer, e.g. to force a full replay."""
+    OutboxCheckpoint.objects.update_or_create(name=name, defaults={"position": to})
+
+
+def consume(
+    name: str,
+    handler: Callable[[list[Change]], None],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_batches: int | None = None,
+) -> int:
+    """
+    Feed unseen outbox rows to `handler` in batches; return how many were processed.
+
+    The handler's own database writes share the checkpoint's transaction, so
+    they are applied exactly once. Side effects outside the database should
+    be idempotent (they are at-least-once).
+    """
+    processed = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        watermark = committed_seq()
+
+        with transaction.atomic():
+            checkpoint, _ = (
+                OutboxCheckpoint.objects
+                .select_for_update()
+                .get_or_create(name=name)
+            )
+            pending = Change.objects.filter(seq__gt=checkpoint.position)
+            if watermark is not None:
+                pending = pending.filter(seq__lte=watermark)
+            batch = list(pending.order_by("seq")[:batch_size])
+            if not batch:
+                break
+
+            handler(batch)
+
+            checkpoint.position = batch[-1].seq
+            checkpoint.save(update_fields=["position", "updated_at"])
+
+        processed += len(batch)
+        batches += 1
+        if len(batch) < batch_size:
+            break
+
+    return processed
+
@@ -0,0 +1,202 @@
+"""
+Request profiling: on demand for staff (`?__profile=1`) or for a random
+sample of all requests (`PROFILING_SAMPLE_RATE`).
+
+Each profile is a pstats dump (`<id>.prof`, loadable with `python -m pstats`
+or snakeviz) plus a small JSON sidecar with the request details and, for
+on-demand profiles, the top allocation sites from tracemalloc. Files go to
+`PROFILING_DIR`; only the newest `PROFILING_KEEP` are kept. Staff browse
+them at /profiles/.
+"""
+import cProfile
+import io
+import json
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404
+from django.shortcuts import render
+from django.utils import timezone
+from django.utils.text import slugify
+
+PROFILE_PARAM = "__profile"
+PROFILE_ID_RE = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{6}-[a-z0-9-]{0,60}$")
+TOP_ALLOCATORS = 25
+
+# cProfile (on 3.12+) and tracemalloc are process-wide: one of each at a time
+_profile_lock = threading.Lock()
+_trace_lock = threading.Lock()
+
+
+def profile_dir() -> Path:
+    return Path(settings.PROFILING_DIR)
+
+
+def _wants_profile(request) -> str | None:
+    if request.GET.get(PROFILE_PARAM) == "1":
+        user = getattr(request, "user", None)
+        if user is not None and user.is_staff:
+            return "manual"
+    rate = settings.PROFILING_SAMPLE_RATE
+    if rate and random.random() < rate:
+        return "sampled"
+    return None
+
+
+class ProfilingMiddleware:
+    """Must come after AuthenticationMiddleware (it checks request.user.is_staff)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = _wants_profile(request)
+        if mode is None:
+            return self.get_response(request)
+
+        # Python 3.12+ allows one active cProfile per process; a request that
+        # would be the second one is served unprofiled
+        if not _profile_lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self._profiled(request, mode)
+        finally:
+            _profile_lock.release()
+
+    def _profiled(self, request, mode):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # a profiler started outside this middleware
+            return self.get_response(request)
+
+        # Allocation tracing slows everything down a lot; only on request
+        trace_memory = mode == "manual" and _trace_lock.acquire(blocking=False)
+        if trace_memory:
+            tracemalloc.start(10)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            snapshot = None
+            if trace_memory:
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                _trace_lock.release()
+
+        profile_id = save(
+            profiler,
+            request=request,
+            status=response.status_code,
+            elapsed=elapsed,
+            mode=mode,
+            snapshot=snapshot,
+            peak=peak if snapshot else None,
+        )
+        response["X-Profile-Id"] = profile_id
+        return response
+
+
+def _allocators(snapshot) -> list[dict]:
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    return [
+        {
+            "where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size": stat.size,
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATORS]
+    ]
+
+
+def save(profiler, *, request, status, elapsed, mode, snapshot=None, peak=None) -> str:
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    now = timezone.now()
+    profile_id = f"{now:%Y%m%dT%H%M%S}-{random.getrandbits(24):06x}-{slugify(request.path)[:60]}"
+    profiler.dump_stats(directory / f"{profile_id}.prof")
+    meta = {
+        "id": profile_id,
+        "at": now.isoformat(),
+        "method": request.method,
+        "path": request.path,  # query strings can carry tokens, searches, ?next= targets
+        "status": status,
+        "ms": round(elapsed * 1000, 1),
+        "mode": mode,
+        "user": getattr(getattr(request, "user", None), "pk", None),
+        "peak_bytes": peak,
+        "allocators": _allocators(snapshot) if snapshot else [],
+    }
+    (directory / f"{profile_id}.json").write_text(json.dumps(meta))
+    _prune(directory)
+    return profile_id
+
+
+def _prune(directory: Path) -> None:
+    keep = settings.PROFILING_KEEP
+    stale = sorted(directory.glob("*.prof"), reverse=True)[keep:]
+    for path in stale:
+        path.unlink(missing_ok=True)
+        path.with_suffix(".json").unlink(missing_ok=True)
+
+
+def _path(profile_id: str, suffix: str) -> Path:
+    if not PROFILE_ID_RE.match(profile_id):
+        raise Http404
+    path = profile_dir() / f"{profile_id}{suffix}"
+    if not path.is_file():
+        raise Http404
+    return path
+
+
+def _meta(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {"id": path.stem}
+
+
+# --- Staff views ---
+
+@staff_member_required
+def profile_list(request):
+    directory = profile_dir()
+    paths = sorted(directory.glob("*.json"), reverse=True) if directory.is_dir() else []
+    return render(request, "core/profile_list.html", {"profiles": [_meta(p) for p in paths]})
+
+
+@staff_member_required
+def profile_detail(request, profile_id):
+    meta = _meta(_path(profile_id, ".json"))
+    sort = request.GET.get("sort", "cumulative")
+    if sort not in ("cumulative", "tottime", "ncalls"):
+        sort = "cumulative"
+
+    out = io.StringIO()
+    stats = pstats.Stats(str(_path(profile_id, ".prof")), stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(40)
+    return render(
+        request,
+        "core/profile_detail.html",
+        {"meta": meta, "summary": out.getvalue(), "sort": sort},
+    )
+
+
+@staff_member_required
+def profile_download(request, profile_id):
+    path = _path(profile_id, ".prof")
+    return FileResponse(path.open("rb"), as_attachment=True, filename=path.name)
@@ -0,0 +1,186 @@
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import activity, counters, outbox
+from .models import Category, Change, Logger, Quest
+
+# Models that feed the change sequence, keyed by the name clients see.
+TRACKED_MODELS = {
+    "category": Category,
+    "quest": Quest,
+    "logger": Logger,
+}
+_MODEL_NAMES = {model: name for name, model in TRACKED_MODELS.items()}
+
+
+def record_change(instance, op: str, fields=()) -> Change:
+    return Change.objects.create(
+        owner_id=instance.owner_id,
+        model=_MODEL_NAMES[type(instance)],
+        object_id=instance.pk,
+        op=op,
+        fields=list(fields),
+    )
+
+
+def _updated_attnames(instance, update_fields) -> list[str]:
+    changed = instance.changed_fields()
+    if update_fields:
+        meta = instance._meta
+        written = {meta.get_field(name).attname for name in update_fields}
+        return sorted(name for name in changed if name in written)
+    return changed
+
+
+def _origin_model(origin):
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def _is_account_deletion(origin) -> bool:
+    # Deleting a user cascades through all their rows; the feed goes with them.
+    return _origin_model(origin) is get_user_model()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Quest)
+@receiver(post_save, sender=Logger)
+def _record_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:  # loaddata: the fixture owns the history
+        return
+    if created:
+        record_change(instance, Change.Op.CREATE)
+    else:
+        record_change(instance, Change.Op.UPDATE, _updated_attnames(instance, update_fields))
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Quest)
+@receiver(post_delete, sender=Logger)
+def _record_delete(sender, instance, origin=None, **kwargs):
+    if _is_account_deletion(origin):
+        return
+    record_change(instance, Change.Op.DELETE)
+
+
+@receiver(pre_delete, sender=Category)
+def _record_category_detach(sender, instance, origin=None, **kwargs):
+    if _is_account_deletion(origin):
+        return
+    # on_delete=SET_NULL is a plain UPDATE with no post_save, so the quests
+    # losing their category would never show up in the feed otherwise.
+    quest_ids = list(Quest.objects.filter(category=instance).values_list("id", flat=True))
+    if not quest_ids:
+        return
+    # Nothing has been written yet in this transaction: without an xid these
+    # seqs would not hold the outbox watermark back until it commits.
+    outbox.claim_xid()
+    Change.objects.bulk_create(
+        Change(
+            owner_id=instance.owner_id,
+            model="quest",
+            object_id=pk,
+            op=Change.Op.UPDATE,
+            fields=["category_id"],
+        )
+        for pk in quest_ids
+    )
+
+
+def _values(instance, names) -> dict:
+    return {name: getattr(instance, name) for name in names}
+
+
+def _before_after(instance, names, update_fields) -> tuple[dict, dict]:
+    """
+    Values of `names` before and after a save. `_loaded_values` is still
+    the pre-save snapshot here; fields outside update_fields were not
+    written, so they keep their loaded value.
+    """
+    current = _values(instance, names)
+    loaded = getattr(instance, "_loaded_values", None) or current
+    before = {name: loaded.get(name, current[name]) for name in names}
+    written = {instance._meta.get_field(f).attname for f in update_fields or ()}
+    after = {
+        name: current[name] if not written or name in written else before[name]
+        for name in names
+    }
+    return before, after
+
+
+# --- Activity arrays (core/activity.py) ---
+
+_ACTIVITY_FIELDS = ("quest_id", "timestamp", "completed", "payout")
+
+
+def _activity_entry(values) -> tuple:
+    return tuple(values[name] for name in _ACTIVITY_FIELDS)
+
+
+@receiver(post_save, sender=Logger)
+def _update_activity(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if created:
+        activity.apply([_activity_entry(_values(instance, _ACTIVITY_FIELDS))])
+        return
+    before, after = _before_after(instance, _ACTIVITY_FIELDS, update_fields)
+    if before != after:
+        activity.apply([_activity_entry(before)], sign=-1)
+        activity.apply([_activity_entry(after)])
+
+
+@receiver(post_delete, sender=Logger)
+def _remove_activity(sender, instance, origin=None, **kwargs):
+    # A deleted quest (or account) takes its activity rows with it
+    if _origin_model(origin) in (Quest, get_user_model()):
+        return
+    activity.apply([_activity_entry(_values(instance, _ACTIVITY_FIELDS))], sign=-1)
+
+
+# --- Counters (core/counters.py) ---
+
+_QUEST_COUNTER_FIELDS = ("category_id", "end_date")
+
+
+def _quest_state(values) -> dict:
+    return {"category_id": values["category_id"], "active": values["end_date"] is None}
+
+
+@receiver(post_save, sender=Quest)
+def _count_quest_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if created:
+        counters.quest_changed(instance.owner_id, None, _quest_state(_values(instance, _QUEST_COUNTER_FIELDS)))
+        return
+    before, after = _before_after(instance, _QUEST_COUNTER_FIELDS, update_fields)
+    before, after = _quest_state(before), _quest_state(after)
+    if before != after:
+        counters.quest_changed(instance.owner_id, before, after)
+
+
+@receiver(post_delete, sender=Quest)
+def _count_quest_delete(sender, instance, origin=None, **kwargs):
+    if _is_account_deletion(origin):
+        return
+    counters.quest_changed(instance.owner_id, _quest_state(_values(instance, _QUEST_COUNTER_FIELDS)), None)
+
+
+@receiver(post_save, sender=Logger)
+def _count_log_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if created:
+        counters.log_changed(instance.owner_id, after=instance.timestamp)
+        return
+    before, after = _before_after(instance, ("timestamp",), update_fields)
+    counters.log_changed(instance.owner_id, before["timestamp"], after["timestamp"])
+
+
+@receiver(post_delete, sender=Logger)
+def _count_log_delete(sender, instance, origin=None, **kwargs):
+    if _is_account_deletion(origin):
+        return
+    counters.log_changed(instance.owner_id, before=instance.timestamp)
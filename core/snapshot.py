@@ -0,0 +1,352 @@
+"""
+Compact binary snapshots of the user data (`manage.py snapshot` / `restore`).
+
+A snapshot stores each model column by column rather than row by row:
+UUIDs as 16 raw bytes, integers and timestamps (microseconds since the
+epoch) as little-endian int64 arrays, dates as int32 day numbers, booleans
+and NULL flags as bitsets, text as a length array plus one UTF-8 blob. Each
+column of each block of rows is zlib-compressed on its own, which is where
+columnar pays off: similar values sit next to each other.
+
+Layout: MAGIC, then length-prefixed records. Per model, a JSON header
+({"model", "columns"}), then blocks of up to BLOCK_ROWS rows, each a JSON
+{"rows": n} followed by one record per column (preceded by its NULL bitset
+for nullable columns), and finally {"rows": 0}.
+
+Derived tables (activity arrays, counters) are not stored; `restore`
+rebuilds them. The change feed, jobs and sessions are not part of a
+snapshot either. Groups and the users' group and permission links are;
+permissions themselves are created by `migrate` with ids of each
+database's own, so links name them by (app label, codename) in the header
+and are mapped to local ids on restore.
+"""
+import json
+import struct
+import sys
+import uuid
+import zlib
+from array import array
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+
+MAGIC = b"QLSNAP1\n"
+FORMAT = 1
+
+# Parents before children, so restore never trips a foreign key. The
+# "<model>_<field>" labels are the auto-created many-to-many tables.
+MODELS = (
+    settings.AUTH_USER_MODEL, "auth.Group", "auth.Group_permissions",
+    f"{settings.AUTH_USER_MODEL}_groups", f"{settings.AUTH_USER_MODEL}_user_permissions",
+    "core.ApiToken", "core.Category", "core.Quest", "core.Logger",
+)
+BLOCK_ROWS = 65_536
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+EPOCH_DAY = date(1970, 1, 1).toordinal()
+MICROSECOND = timedelta(microseconds=1)
+
+_KINDS = {
+    "UUIDField": "uuid",
+    "AutoField": "int",
+    "BigAutoField": "int",
+    "SmallAutoField": "int",
+    "IntegerField": "int",
+    "BigIntegerField": "int",
+    "SmallIntegerField": "int",
+    "PositiveIntegerField": "int",
+    "PositiveBigIntegerField": "int",
+    "PositiveSmallIntegerField": "int",
+    "BooleanField": "bool",
+    "DateTimeField": "datetime",
+    "DateField": "date",
+    "CharField": "text",
+    "TextField": "text",
+    "EmailField": "text",
+    "SlugField": "text",
+    "URLField": "text",
+    "BinaryField": "bytes",
+}
+_EMPTY = {"uuid": uuid.UUID(int=0), "int": 0, "bool": False, "datetime": EPOCH, "date": date(1970, 1, 1),
+          "text": "", "bytes": b""}
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _columns(model) -> list[tuple[str, str, bool]]:
+    """(attname, kind, nullable) for every stored column the database doesn't compute."""
+    columns = []
+    for field in model._meta.concrete_fields:
+        if field.generated:
+            continue
+        target = field.target_field if field.is_relation else field
+        kind = _KINDS.get(target.get_internal_type())
+        if kind is None:
+            raise SnapshotError(f"Don't know how to store {model._meta.label}.{field.name}.")
+        columns.append((field.attname, kind, field.null))
+    return columns
+
+
+# --- Encoding ------------------------------------------------------------
+
+def _array_bytes(typecode: str, values) -> bytes:
+    arr = array(typecode, values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _array(typecode: str, data: bytes) -> array:
+    arr = array(typecode)
+    arr.frombytes(data)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def _bits(flags) -> bytes:
+    out = bytearray((len(flags) + 7) // 8)
+    for i, flag in enumerate(flags):
+        if flag:
+            out[i >> 3] |= 1 << (i & 7)
+    return bytes(out)
+
+
+def _unbits(data: bytes, count: int) -> list[bool]:
+    return [bool(data[i >> 3] >> (i & 7) & 1) for i in range(count)]
+
+
+def _micros(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_timezone.utc)
+    return (value - EPOCH) // MICROSECOND
+
+
+def _encode(kind: str, values: list) -> bytes:
+    if kind == "uuid":
+        return b"".join(value.bytes for value in values)
+    if kind == "int":
+        return _array_bytes("q", values)
+    if kind == "bool":
+        return _bits(values)
+    if kind == "datetime":
+        return _array_bytes("q", [_micros(value) for value in values])
+    if kind == "date":
+        return _array_bytes("i", [value.toordinal() - EPOCH_DAY for value in values])
+    blobs = [value.encode() for value in values] if kind == "text" else [bytes(value) for value in values]
+    return _array_bytes("I", [len(blob) for blob in blobs]) + b"".join(blobs)
+
+
+def _decode(kind: str, data: bytes, count: int) -> list:
+    if kind == "uuid":
+        return [uuid.UUID(bytes=data[i:i + 16]) for i in range(0, 16 * count, 16)]
+    if kind == "int":
+        return _array("q", data).tolist()
+    if kind == "bool":
+        return _unbits(data, count)
+    if kind == "datetime":
+        aware = settings.USE_TZ
+        out = []
+        for micros in _array("q", data):
+            value = EPOCH + timedelta(microseconds=micros)
+            out.append(value if aware else value.replace(tzinfo=None))
+        return out
+    if kind == "date":
+        return [date.fromordinal(day + EPOCH_DAY) for day in _array("i", data)]
+
+    lengths = _array("I", data[:4 * count])
+    out, pos = [], 4 * count
+    for length in lengths:
+        blob = data[pos:pos + length]
+        out.append(blob.decode() if kind == "text" else blob)
+        pos += length
+    return out
+
+
+# --- Records -------------------------------------------------------------
+
+def _write_record(fp, payload: bytes) -> None:
+    fp.write(struct.pack("<I", len(payload)))
+    fp.write(payload)
+
+
+def _read_record(fp) -> bytes:
+    head = fp.read(4)
+    if len(head) != 4:
+        raise SnapshotError("Snapshot is truncated.")
+    (length,) = struct.unpack("<I", head)
+    payload = fp.read(length)
+    if len(payload) != length:
+        raise SnapshotError("Snapshot is truncated.")
+    return payload
+
+
+def _write_json(fp, data: dict) -> None:
+    _write_record(fp, json.dumps(data).encode())
+
+
+def _read_json(fp) -> dict:
+    return json.loads(_read_record(fp))
+
+
+# --- Snapshot ------------------------------------------------------------
+
+def dump(fp, level: int = 6) -> dict[str, int]:
+    """
+    Write every model in MODELS to the binary file `fp`; returns row counts.
+
+    All models are read in one transaction, so rows written while the dump
+    runs are either all in it or all left out: a log is never stored without
+    the quest it points to. Postgres needs REPEATABLE READ for that (READ
+    COMMITTED takes a fresh snapshot per statement); a SQLite read
+    transaction already sees one snapshot throughout.
+    """
+    outermost = not connection.in_atomic_block
+    with transaction.atomic():
+        if connection.vendor == "postgresql" and outermost:
+            with connection.cursor() as cursor:  # must come before any query
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        return _dump(fp, level)
+
+
+def _permission_keys() -> dict[str, list[str]]:
+    """{id: [app label, codename]} for every permission in this database."""
+    rows = apps.get_model("auth.Permission").objects.values_list("pk", "content_type__app_label", "codename")
+    return {str(pk): [app_label, codename] for pk, app_label, codename in rows}
+
+
+def _dump(fp, level: int) -> dict[str, int]:
+    fp.write(MAGIC)
+    _write_json(fp, {"format": FORMAT, "models": list(MODELS), "permissions": _permission_keys()})
+    counts = {}
+    for label in MODELS:
+        model = apps.get_model(label)
+        columns = _columns(model)
+        _write_json(fp, {"model": label, "columns": columns})
+
+        rows = model._base_manager.order_by("pk").values_list(*(name for name, _, _ in columns))
+        block, total = [], 0
+        for row in rows.iterator(chunk_size=5000):
+            block.append(row)
+            if len(block) == BLOCK_ROWS:
+                _write_block(fp, columns, block, level)
+                total += len(block)
+                block = []
+        if block:
+            _write_block(fp, columns, block, level)
+            total += len(block)
+        _write_json(fp, {"rows": 0})
+        counts[label] = total
+    return counts
+
+
+def _write_block(fp, columns, rows, level) -> None:
+    _write_json(fp, {"rows": len(rows)})
+    for values, (_, kind, nullable) in zip(zip(*rows), columns):
+        if nullable:
+            _write_record(fp, zlib.compress(_bits([value is None for value in values]), level))
+            values = [_EMPTY[kind] if value is None else value for value in values]
+        _write_record(fp, zlib.compress(_encode(kind, values), level))
+
+
+# --- Restore -------------------------------------------------------------
+
+def is_empty() -> bool:
+    return not any(apps.get_model(label)._base_manager.exists() for label in MODELS)
+
+
+def load(fp, batch_size: int = 5000) -> dict[str, int]:
+    """
+    Insert a snapshot into empty tables (one transaction); returns row counts.
+
+    Uses COPY on Postgres and batched executemany elsewhere. No signals
+    fire, so the derived tables are rebuilt once at the end instead.
+    """
+    from . import activity, counters
+
+    if fp.read(len(MAGIC)) != MAGIC:
+        raise SnapshotError("Not a questlog snapshot.")
+    header = _read_json(fp)
+    if header.get("format") != FORMAT:
+        raise SnapshotError(f"Unsupported snapshot format {header.get('format')!r}.")
+
+    counts = {}
+    with transaction.atomic():
+        remap = {"permission_id": _local_permission_ids(header.get("permissions", {}))}
+        for _ in header["models"]:
+            meta = _read_json(fp)
+            model = apps.get_model(meta["model"])
+            columns = [tuple(column) for column in meta["columns"]]
+            if columns != _columns(model):
+                raise SnapshotError(f"{meta['model']} columns differ from this schema; migrate first.")
+            counts[meta["model"]] = _load_model(fp, model, columns, batch_size, remap)
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [apps.get_model(m) for m in MODELS]):
+                cursor.execute(sql)
+        activity.rebuild()
+        counters.reconcile()
+    return counts
+
+
+def _local_permission_ids(stored: dict[str, list[str]]) -> dict[int, int]:
+    """Snapshot permission id -> this database's id for the same (app label, codename)."""
+    rows = apps.get_model("auth.Permission").objects.values_list("content_type__app_label", "codename", "pk")
+    local = {(app_label, codename): pk for app_label, codename, pk in rows}
+    return {int(pk): local[tuple(key)] for pk, key in stored.items() if tuple(key) in local}
+
+
+def _load_model(fp, model, columns, batch_size, remap) -> int:
+    fields = {f.attname: f for f in model._meta.concrete_fields}
+    fields = [fields[name] for name, _, _ in columns]
+    total = 0
+    while rows := _read_json(fp)["rows"]:
+        values = []
+        for field, (name, kind, nullable) in zip(fields, columns):
+            nulls = _unbits(zlib.decompress(_read_record(fp)), rows) if nullable else None
+            column = _decode(kind, zlib.decompress(_read_record(fp)), rows)
+            if nulls:
+                column = [None if null else value for value, null in zip(column, nulls)]
+            if name in remap:
+                try:
+                    column = [remap[name][value] for value in column]
+                except KeyError as exc:
+                    raise SnapshotError(
+                        f"{model._meta.label} refers to a permission this database doesn't have; migrate first."
+                    ) from exc
+            values.append(column)
+        _insert(model, fields, [kind for _, kind, _ in columns], values, batch_size)
+        total += rows
+    return total
+
+
+def _insert(model, fields, kinds, values, batch_size) -> None:
+    db = connections[DEFAULT_DB_ALIAS]  # the wrapper itself, not the thread-local proxy
+    quote = db.ops.quote_name
+    table = quote(model._meta.db_table)
+    names = ", ".join(quote(field.column) for field in fields)
+
+    with db.cursor() as cursor:
+        if db.vendor == "postgresql":
+            with cursor.copy(f"COPY {table} ({names}) FROM STDIN") as copy:
+                for row in zip(*values):
+                    copy.write_row(row)
+            return
+
+        # Adapt column by column (only the types the driver can't take as
+        # they are), then a plain executemany: no model instances, and no
+        # auto_now stamping over the stored timestamps as bulk_create would.
+        prepared = [
+            [field.get_db_prep_save(value, db) for value in column]
+            if kind in ("uuid", "datetime", "date") else column
+            for field, kind, column in zip(fields, kinds, values)
+        ]
+        sql = f"INSERT INTO {table} ({names}) VALUES ({', '.join(['%s'] * len(fields))})"
+        rows = list(zip(*prepared))
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(sql, rows[start:start + batch_size])
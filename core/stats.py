@@ -0,0 +1,236 @@
+"""
+Session/payout rollups computed in a single pass over the logs.
+
+One GROUP BY quest query does all the scanning; everything coarser (per
+category, overall) is folded from those per-quest rows in Python, so the
+overall numbers, both "top quests" tables and the category breakdown cost
+one trip over the filtered logs instead of four. Any filtered Logger
+queryset works as input, so pages other than /stats/ can reuse it.
+
+Long windows on SQLite are cut into calendar months and each month is
+aggregated on its own connection in a thread pool (sqlite releases the GIL
+while it scans, and WAL lets the readers run side by side); the per-quest
+rows are then summed, which is exact since every number here is a count or
+a sum. Postgres parallelizes the single query itself, so it isn't split.
+
+The QUEUED_RANGES aren't computed in the request at all: the
+`refresh_stats` job stores their per-quest rows in a StatsSnapshot and the
+page folds those instead.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+
+from .models import Logger, StatsSnapshot
+
+# /stats/?range= -> (label, days back; None = since the first log)
+RANGES = {
+    "7d": ("Last 7 days", 7),
+    "30d": ("Last 30 days", 30),
+    "year": ("Last 12 months", 365),
+    "all": ("All time", None),
+}
+QUEUED_RANGES = {"year", "all"}  # served from StatsSnapshot, refreshed by a job
+
+
+@dataclass(kw_only=True)
+class Bucket:
+    sessions: int = 0
+    completed: int = 0
+    payout: int | None = None  # stays None until some session has a payout
+    payout_count: int = 0      # sessions with a payout (for the average)
+
+    def add(self, other: "Bucket") -> None:
+        self.sessions += other.sessions
+        self.completed += other.completed
+        if other.payout is not None:
+            self.payout = (self.payout or 0) + other.payout
+        self.payout_count += other.payout_count
+
+    @property
+    def avg_payout(self) -> float | None:
+        return self.payout / self.payout_count if self.payout_count else None
+
+    @property
+    def completion_rate(self) -> float:
+        return self.completed / self.sessions if self.sessions else 0
+
+
+@dataclass(kw_only=True)
+class QuestStats(Bucket):
+    quest_id: object
+    title: str
+    category_id: object = None
+    category_name: str | None = None
+
+
+@dataclass(kw_only=True)
+class CategoryStats(Bucket):
+    category_id: object = None
+    category_name: str | None = None
+
+
+@dataclass
+class StatsReport:
+    overall: Bucket = field(default_factory=Bucket)
+    quests: list[QuestStats] = field(default_factory=list)
+    categories: list[CategoryStats] = field(default_factory=list)
+
+    def top_quests(self, by: str = "payout", limit: int = 5) -> list[QuestStats]:
+        if by == "payout":
+            key = lambda q: (q.payout is not None, q.payout or 0, q.sessions)
+        else:
+            key = lambda q: (q.sessions, q.payout is not None, q.payout or 0)
+        return sorted(self.quests, key=key, reverse=True)[:limit]
+
+
+def quest_rows(logs) -> list[QuestStats]:
+    """The one database pass: per-quest sums over `logs`."""
+    rows = (
+        logs.order_by()
+        .values("quest_id", "quest__title", "quest__category_id", "quest__category__name")
+        .annotate(
+            n_sessions=Count("id"),
+            n_completed=Count("id", filter=Q(completed=True)),
+            payout_sum=Sum("payout"),
+            n_payouts=Count("payout"),
+        )
+    )
+    return [
+        QuestStats(
+            quest_id=row["quest_id"],
+            title=row["quest__title"],
+            category_id=row["quest__category_id"],
+            category_name=row["quest__category__name"],
+            sessions=row["n_sessions"],
+            completed=row["n_completed"],
+            payout=row["payout_sum"],
+            payout_count=row["n_payouts"],
+        )
+        for row in rows
+    ]
+
+
+def build_report(quests: list[QuestStats]) -> StatsReport:
+    """Fold per-quest rows into category and overall totals."""
+    report = StatsReport(quests=quests)
+    by_category: dict[object, CategoryStats] = {}
+
+    for quest in quests:
+        report.overall.add(quest)
+        bucket = by_category.get(quest.category_id)
+        if bucket is None:
+            bucket = by_category[quest.category_id] = CategoryStats(
+                category_id=quest.category_id,
+                category_name=quest.category_name,
+            )
+        bucket.add(quest)
+
+    report.categories = sorted(
+        by_category.values(),
+        key=lambda c: (c.payout is not None, c.payout or 0, c.sessions),
+        reverse=True,
+    )
+    return report
+
+
+def merge_rows(parts) -> list[QuestStats]:
+    """Sum per-quest rows from several chunks of the same window."""
+    merged: dict[object, QuestStats] = {}
+    for rows in parts:
+        for row in rows:
+            existing = merged.get(row.quest_id)
+            if existing is None:
+                merged[row.quest_id] = row
+            else:
+                existing.add(row)
+    return list(merged.values())
+
+
+def month_chunks(start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    """[start, end] cut at local month starts; all but the last chunk exclude their end."""
+    local = timezone.localtime(start)
+    year, month = local.year, local.month
+    bounds = [start]
+    while True:
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        boundary = timezone.make_aware(datetime(year, month, 1))
+        if boundary > end:
+            break
+        bounds.append(boundary)
+    return list(zip(bounds, bounds[1:] + [end]))
+
+
+def _chunk_rows(logs, start, end, last) -> list[QuestStats]:
+    try:
+        upper = {"timestamp__lte": end} if last else {"timestamp__lt": end}
+        return quest_rows(logs.filter(timestamp__gte=start, **upper))
+    finally:
+        connections.close_all()  # this worker thread's own connection
+
+
+def _split(start: datetime, end: datetime) -> bool:
+    return (
+        connection.vendor == "sqlite"
+        and settings.STATS_WORKERS > 1
+        and end - start >= timedelta(days=settings.STATS_PARALLEL_MIN_DAYS)
+        # Other connections can't see rows this one hasn't committed
+        and not connection.in_atomic_block
+    )
+
+
+def window_rows(logs, start: datetime, end: datetime) -> list[QuestStats]:
+    """quest_rows() for start <= timestamp <= end, month chunks in parallel if worth it."""
+    if not _split(start, end):
+        return quest_rows(logs.filter(timestamp__gte=start, timestamp__lte=end))
+
+    chunks = month_chunks(start, end)
+    with ThreadPoolExecutor(max_workers=min(settings.STATS_WORKERS, len(chunks))) as pool:
+        parts = pool.map(
+            lambda i: _chunk_rows(logs, *chunks[i], last=i == len(chunks) - 1),
+            range(len(chunks)),
+        )
+        return merge_rows(parts)
+
+
+def compute(logs) -> StatsReport:
+    return build_report(quest_rows(logs))
+
+
+def for_window(user, start: datetime, end: datetime) -> StatsReport:
+    """A user's stats for logs with start <= timestamp <= end."""
+    return build_report(window_rows(Logger.objects.for_user(user), start, end))
+
+
+def first_log_at(user) -> datetime | None:
+    return Logger.objects.for_user(user).aggregate(first=Min("timestamp"))["first"]
+
+
+def window_start(user, window: str, end: datetime) -> datetime:
+    """Start of the RANGES entry `window` ending at `end`."""
+    days = RANGES[window][1]
+    if days is None:
+        return first_log_at(user) or end
+    return end - timedelta(days=days)
+
+
+def refresh(user, window: str) -> StatsSnapshot:
+    """Recompute and store the snapshot for `window` (the `refresh_stats` job)."""
+    end = timezone.now()
+    start = window_start(user, window, end)
+    rows = window_rows(Logger.objects.for_user(user), start, end)
+    snapshot, _ = StatsSnapshot.objects.update_or_create(
+        owner=user,
+        range=window,
+        defaults={"start": start, "computed_at": end, "quests": [asdict(row) for row in rows]},
+    )
+    return snapshot
+
+
+def from_snapshot(snapshot: StatsSnapshot) -> StatsReport:
+    return build_report([QuestStats(**row) for row in snapshot.quests])
@@ -0,0 +1,17 @@
+"""Job handlers (see core/jobs.py); imported at startup so they are registered."""
+from django.contrib.auth import get_user_model
+
+from . import activity, stats
+from .jobs import task
+
+
+@task(name="rebuild_activity")
+def rebuild_activity(quest_ids=None):
+    activity.rebuild(quest_ids)
+
+
+@task(name="refresh_stats", atomic=False)  # month chunks run on their own connections
+def refresh_stats(user_id, range):
+    user = get_user_model().objects.filter(pk=user_id).first()
+    if user is not None:  # deleted since the job was queued
+        stats.refresh(user, range)
@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core import activity
+from core.models import Logger, Quest, QuestActivity
+
+
+class ActivityTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("heat", password="pw")
+        self.quest = Quest.objects.create(owner=self.user, title="Walk")
+
+    def today(self):
+        return activity.heatmap([self.quest.id])[-1]
+
+    def test_log_writes_adjust_today(self):
+        log = Logger.objects.create(quest=self.quest, completed=False)
+        Logger.objects.create(quest=self.quest, completed=True, payout=4)
+        self.assertEqual((self.today().sessions, self.today().completed, self.today().payout), (2, 1, 4))
+
+        log = Logger.objects.get(pk=log.pk)
+        log.completed, log.payout = True, 6
+        log.save()
+        self.assertEqual((self.today().sessions, self.today().completed, self.today().payout), (2, 2, 10))
+
+        log.delete()
+        self.assertEqual((self.today().sessions, self.today().completed, self.today().payout), (1, 1, 4))
+
+    def test_counts_pass_the_old_uint16_limit_and_saturate(self):
+        now = timezone.now()
+        activity.apply([(self.quest.id, now, True, 2**31 - 10)] * 70_000)
+        self.assertEqual((self.today().sessions, self.today().completed), (70_000, 70_000))
+        self.assertEqual(self.today().payout, 2**31 - 1)
+
+        counts = activity.YearCounts()
+        counts.add(0, activity.COUNT_MAX, 0, 0)
+        counts.add(0, 5, -3, 0)
+        self.assertEqual((counts.sessions[0], counts.completed[0]), (activity.COUNT_MAX, 0))
+
+    def test_heatmap_sums_quests(self):
+        other = Quest.objects.create(owner=self.user, title="Run")
+        Logger.objects.create(quest=self.quest, completed=True, payout=-2)
+        Logger.objects.create(quest=other, payout=5)
+        Logger.objects.create(quest=other, completed=True)
+
+        day = activity.heatmap([self.quest.id, other.id])[-1]
+        self.assertEqual((day.sessions, day.completed, day.payout), (3, 2, 3))
+        self.assertEqual(day.level, activity.LEVELS)
+
+    def test_rows_are_one_small_blob_per_year(self):
+        Logger.objects.create(quest=self.quest, payout=3)
+        row = QuestActivity.objects.get(quest=self.quest)
+        self.assertEqual(row.year, timezone.localdate().year)
+        self.assertEqual(len(row.sessions) + len(row.completed) + len(row.payout), 366 * 12)
+
+    def test_rebuild_matches_incremental(self):
+        for payout in (1, 2, None):
+            Logger.objects.create(quest=self.quest, completed=payout is not None, payout=payout)
+        before = self.today()
+        activity.rebuild()
+        self.assertEqual(self.today(), before)
+
+    def test_deleting_quest_drops_activity(self):
+        Logger.objects.create(quest=self.quest)
+        self.quest.delete()
+        self.assertFalse(QuestActivity.objects.exists())
+
+    def test_quest_rollups_render_heatmap(self):
+        Logger.objects.create(quest=self.quest, completed=True)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("quest_rollups", args=[self.quest.pk]))
+        self.assertContains(response, "heatmap-cell level-4")
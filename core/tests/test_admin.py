@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Logger, Quest
+
+
+class AdminChangelistTests(TestCase):
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser("root", password="pw")
+        self.client.force_login(self.admin)
+        self.quests = [Quest.objects.create(owner=self.admin, title=f"Quest {i}") for i in range(30)]
+        for quest in self.quests:
+            Logger.objects.create(quest=quest)
+
+    def test_log_changelist_does_not_list_every_quest(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("admin:core_logger_changelist"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'class="autocomplete-filter"')
+        counts = [q["sql"] for q in queries if "COUNT(" in q["sql"].upper()]
+        self.assertEqual(len(counts), 1)  # no second "full result" count
+        self.assertFalse([q for q in queries if 'FROM "core_quest"' in q["sql"]])
+
+    def test_autocomplete_filter_applies(self):
+        quest = self.quests[0]
+        response = self.client.get(
+            reverse("admin:core_logger_changelist"), {"quest__id__exact": str(quest.id)}
+        )
+        self.assertEqual(list(response.context["cl"].result_list), list(quest.logs.all()))
+        self.assertContains(response, f'<option value="{quest.id}" selected>Quest 0</option>', html=True)
@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Category, Logger, Quest
+
+
+class ReadApiTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("api", password="pw")
+        self.client.force_login(self.user)
+        self.category = Category.objects.create(owner=self.user, name="Errands")
+        self.quests = [
+            Quest.objects.create(owner=self.user, title=f"Q{i}", category=self.category, notes="x" * 1000)
+            for i in range(5)
+        ]
+
+    def test_default_fields_leave_out_notes(self):
+        rows = self.client.get(reverse("api_quests")).json()["results"]
+        self.assertEqual(len(rows), 5)
+        self.assertNotIn("notes", rows[0])
+
+    def test_sparse_fieldset(self):
+        rows = self.client.get(reverse("api_quests"), {"fields": "title,category_name"}).json()["results"]
+        self.assertEqual(set(rows[0]), {"title", "category_name"})
+        self.assertEqual(rows[0]["category_name"], "Errands")
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse("api_quests"), {"fields": "title,password"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_ids_batch_lookup(self):
+        wanted = [str(q.id) for q in self.quests[:2]]
+        rows = self.client.get(reverse("api_quests"), {"ids": ",".join(wanted), "fields": "id"}).json()["results"]
+        self.assertEqual(sorted(r["id"] for r in rows), sorted(wanted))
+
+    def test_cursor_walks_every_row_once(self):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, "fields": "id"}
+            if cursor:
+                params["cursor"] = cursor
+            data = self.client.get(reverse("api_quests"), params).json()
+            seen += [r["id"] for r in data["results"]]
+            cursor = data["next"]
+            if not cursor:
+                break
+        self.assertEqual(sorted(seen), sorted(str(q.id) for q in self.quests))
+
+    def test_logs_use_log_list_filters(self):
+        Logger.objects.create(quest=self.quests[0], completed=True)
+        Logger.objects.create(quest=self.quests[0], completed=False)
+
+        rows = self.client.get(reverse("api_logs"), {"completed": "yes"}).json()["results"]
+        self.assertEqual([r["completed"] for r in rows], [True])
+
+    def test_bad_category_filter_is_a_400(self):
+        response = self.client.get(reverse("api_logs"), {"category": "nope"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_other_users_rows_are_invisible(self):
+        other = get_user_model().objects.create_user("other", password="pw")
+        theirs = Quest.objects.create(owner=other, title="Theirs")
+
+        rows = self.client.get(reverse("api_quests"), {"ids": str(theirs.id)}).json()["results"]
+        self.assertEqual(rows, [])
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core import counters
+from core.models import Category, Change, Quest, UserCounters
+
+
+class BulkQuestTests(TestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user("bulk", password="pw")
+        self.client.force_login(self.user)
+        self.home = Category.objects.create(owner=self.user, name="Home", notes="Chores")
+        self.work = Category.objects.create(owner=self.user, name="Work")
+        self.quests = [
+            Quest.objects.create(owner=self.user, title=f"Home {i}", category=self.home) for i in range(5)
+        ] + [Quest.objects.create(owner=self.user, title="Loose")]
+
+        other = User.objects.create_user("other", password="pw")
+        self.foreign = Quest.objects.create(owner=other, title="Not mine")
+
+    def assertCountersExact(self):
+        # reconcile() would fix any drift; nothing to fix means the deltas were right
+        self.assertEqual(counters.reconcile(), 0)
+
+    def test_end_selected_quests(self):
+        before = Change.objects.count()
+        # Same count for 3 or 300: select, update, one insert, one bump per counter row
+        with self.assertNumQueries(11):
+            response = self.client.post(reverse("quest_bulk"), {
+                "action": "end",
+                "quest": [self.quests[0].pk, self.quests[1].pk, self.foreign.pk],
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Quest.objects.for_user(self.user).ended().count(), 2)
+        self.assertIsNone(Quest.objects.get(pk=self.foreign.pk).end_date)
+        self.assertEqual(Change.objects.count() - before, 2)
+        self.home.refresh_from_db()
+        self.assertEqual((self.home.quest_count, self.home.active_quest_count), (5, 3))
+        self.assertCountersExact()
+
+    def test_end_everything_matching_the_filter(self):
+        self.client.post(reverse("quest_bulk"), {"action": "end", "all": "1", "category": "none"})
+        self.assertEqual(list(Quest.objects.for_user(self.user).ended()), [self.quests[-1]])
+        self.assertEqual(UserCounters.objects.get(owner=self.user).active_quest_count, 5)
+        self.assertCountersExact()
+
+    def test_end_skips_quests_that_have_not_started(self):
+        later = self.quests[0]
+        later.start_date = timezone.localdate() + timedelta(days=3)
+        later.save()
+        self.client.post(reverse("quest_bulk"), {"action": "end", "quest": [later.pk, self.quests[1].pk]})
+        later.refresh_from_db()
+        self.assertIsNone(later.end_date)
+        self.assertEqual(list(Quest.objects.for_user(self.user).ended()), [self.quests[1]])
+        self.assertCountersExact()
+
+    def test_malformed_category_ids_are_rejected(self):
+        response = self.client.post(reverse("quest_bulk"), {
+            "action": "move", "to": "not-a-uuid", "quest": [self.quests[0].pk],
+        })
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(reverse("category_merge", args=[self.home.pk]), {"into": "42"})
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Category.objects.filter(pk=self.home.pk).exists())
+
+    def test_move_quests(self):
+        self.client.post(reverse("quest_bulk"), {
+            "action": "move", "to": self.work.pk, "all": "1", "category": self.home.pk,
+        })
+        self.assertEqual(Quest.objects.filter(category=self.work).count(), 5)
+        self.work.refresh_from_db()
+        self.assertEqual(self.work.quest_count, 5)
+        self.assertCountersExact()
+
+    def test_merge_categories(self):
+        self.quests[0].end_date = self.quests[0].start_date
+        self.quests[0].save()
+        response = self.client.post(reverse("category_merge", args=[self.home.pk]), {"into": self.work.pk})
+        self.assertRedirects(response, reverse("category_list"))
+        self.assertFalse(Category.objects.filter(pk=self.home.pk).exists())
+        self.work.refresh_from_db()
+        self.assertEqual((self.work.quest_count, self.work.active_quest_count), (5, 4))
+        self.assertIn("Home: Chores", self.work.notes)
+        self.assertCountersExact()
+
+    def test_delete_page_offers_merge_when_quests_remain(self):
+        response = self.client.get(reverse("category_delete", args=[self.home.pk]))
+        self.assertContains(response, reverse("category_merge", args=[self.home.pk]))
+        self.client.post(reverse("category_delete", args=[self.home.pk]))
+        self.assertTrue(Category.objects.filter(pk=self.home.pk).exists())
@@ -0,0 +1,164 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from core import outbox
+from core.models import Category, Change, Logger, Quest
+
+
+class ChangeFeedTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("feed", password="pw")
+        self.client.force_login(self.user)
+        self.url = reverse("api_changes")
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_returns_live_rows_and_tombstones(self):
+        quest = Quest.objects.create(owner=self.user, title="Walk")
+        log = Logger.objects.create(quest=quest)
+        log_id = log.id
+        log.delete()
+
+        data = self.client.get(self.url).json()
+        by_id = {item["id"]: item for item in data["changes"]}
+
+        self.assertEqual(by_id[str(quest.id)]["data"]["title"], "Walk")
+        self.assertTrue(by_id[str(log_id)]["deleted"])
+        self.assertFalse(data["has_more"])
+
+    def test_since_token_only_returns_later_changes(self):
+        Quest.objects.create(owner=self.user, title="Old")
+        token = self.client.get(self.url).json()["next"]
+
+        category = Category.objects.create(owner=self.user, name="Errands")
+        data = self.client.get(self.url, {"since": token}).json()
+
+        self.assertEqual([item["id"] for item in data["changes"]], [str(category.id)])
+
+    def test_paginates_with_limit(self):
+        for i in range(3):
+            Quest.objects.create(owner=self.user, title=f"Q{i}")
+
+        first = self.client.get(self.url, {"limit": 2}).json()
+        second = self.client.get(self.url, {"limit": 2, "since": first["next"]}).json()
+
+        self.assertTrue(first["has_more"])
+        self.assertEqual(len(first["changes"]) + len(second["changes"]), 3)
+        self.assertFalse(second["has_more"])
+
+    def test_pages_stop_at_the_commit_safe_watermark(self):
+        quests = [Quest.objects.create(owner=self.user, title=f"Q{i}") for i in range(2)]
+        first = Change.objects.order_by("seq").first().seq
+        with mock.patch("core.outbox.committed_seq", return_value=first):
+            data = self.client.get(self.url).json()
+        self.assertEqual([item["id"] for item in data["changes"]], [str(quests[0].id)])
+        self.assertEqual(data["next"], str(first))
+
+    def test_rejects_bad_token(self):
+        response = self.client.get(self.url, {"since": "abc"})
+        self.assertEqual(response.status_code, 400)
+
+
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("outbox", password="pw")
+
+    def test_update_records_only_changed_fields(self):
+        quest = Quest.objects.create(owner=self.user, title="Walk")
+        quest = Quest.objects.get(pk=quest.pk)
+        quest.limited_mobility = True
+        quest.save()
+
+        change = Change.objects.filter(object_id=quest.pk).last()
+        self.assertEqual(change.op, Change.Op.UPDATE)
+        self.assertIn("limited_mobility", change.fields)
+        self.assertNotIn("title", change.fields)
+
+    def test_update_fields_are_recorded_as_attnames(self):
+        log = Logger.objects.create(quest=Quest.objects.create(owner=self.user, title="Walk"))
+        log.payout = 4
+        log.save(update_fields=["payout"])
+
+        self.assertEqual(Change.objects.last().fields, ["payout"])
+
+    def test_consume_advances_checkpoint_in_batches(self):
+        for i in range(5):
+            Quest.objects.create(owner=self.user, title=f"Q{i}")
+
+        seen = []
+        processed = outbox.consume("test", lambda batch: seen.extend(batch), batch_size=2)
+
+        self.assertEqual(processed, 5)
+        self.assertEqual(outbox.position("test"), seen[-1].seq)
+        self.assertEqual(outbox.consume("test", seen.extend), 0)
+
+    def test_failed_handler_does_not_move_checkpoint(self):
+        Quest.objects.create(owner=self.user, title="Q")
+
+        def boom(batch):
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            outbox.consume("test", boom)
+        self.assertEqual(outbox.position("test"), 0)
+
+    def test_feed_only_shows_own_changes(self):
+        other = get_user_model().objects.create_user("other", password="pw")
+        Quest.objects.create(owner=other, title="Theirs")
+        mine = Quest.objects.create(owner=self.user, title="Mine")
+        self.client.force_login(self.user)
+
+        data = self.client.get(reverse("api_changes")).json()
+        self.assertEqual([item["id"] for item in data["changes"]], [str(mine.id)])
+
+    def test_deleting_a_user_takes_their_rows_and_feed_along(self):
+        Logger.objects.create(quest=Quest.objects.create(owner=self.user, title="Walk"))
+        self.user.delete()
+
+        self.assertFalse(Change.objects.exists())
+
+
+class WatermarkTests(TestCase):
+
+    def test_category_detach_takes_an_xid_before_its_seqs(self):
+        user = get_user_model().objects.create_user("detach", password="pw")
+        category = Category.objects.create(owner=user, name="Errands")
+        quest = Quest.objects.create(owner=user, title="Walk", category=category)
+        before = Change.objects.count()
+        claimed_at = []
+
+        with mock.patch("core.outbox.claim_xid", side_effect=lambda: claimed_at.append(Change.objects.count())):
+            category.delete()
+
+        self.assertEqual(claimed_at, [before])
+        detach = Change.objects.filter(model="quest", object_id=quest.pk).last()
+        self.assertEqual(detach.fields, ["category_id"])
+
+    def test_seq_read_mid_transaction_waits_for_those_transactions(self):
+        mark = outbox._Watermark()
+        self.assertEqual(mark.advance(xmin=100, xmax=100, max_seq=7), 7)  # idle: final
+        # Seq 12 is visible while xid 101 (maybe holding seq 10) still runs
+        self.assertEqual(mark.advance(xmin=101, xmax=105, max_seq=12), 7)
+        self.assertEqual(mark.advance(xmin=103, xmax=108, max_seq=15), 7)
+        # Everything running at the seq-12 read has finished
+        self.assertEqual(mark.advance(xmin=105, xmax=109, max_seq=16), 12)
+
+    def test_consume_stops_at_the_watermark(self):
+        user = get_user_model().objects.create_user("mark", password="pw")
+        for i in range(3):
+            Quest.objects.create(owner=user, title=f"Q{i}")
+        first_two = Change.objects.order_by("seq")[1].seq
+
+        seen = []
+        with mock.patch("core.outbox.committed_seq", return_value=first_two):
+            outbox.consume("test", seen.extend)
+        self.assertEqual(len(seen), 2)
+        self.assertEqual(outbox.position("test"), first_two)
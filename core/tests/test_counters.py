@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core import counters
+from core.models import Category, DailyLogCount, Logger, Quest, UserCounters
+
+
+class CounterTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("count", password="pw")
+        self.errands = Category.objects.create(owner=self.user, name="Errands")
+        self.chores = Category.objects.create(owner=self.user, name="Chores")
+
+    def counts(self, category):
+        category.refresh_from_db()
+        return category.quest_count, category.active_quest_count
+
+    def test_quest_writes_move_category_counts(self):
+        quest = Quest.objects.create(owner=self.user, title="Walk", category=self.errands)
+        Quest.objects.create(owner=self.user, title="Shop", category=self.errands)
+        self.assertEqual(self.counts(self.errands), (2, 2))
+
+        quest.end_date = timezone.localdate()
+        quest.save()
+        self.assertEqual(self.counts(self.errands), (2, 1))
+
+        quest.category = self.chores
+        quest.save()
+        self.assertEqual(self.counts(self.errands), (1, 1))
+        self.assertEqual(self.counts(self.chores), (1, 0))
+
+        quest.delete()
+        self.assertEqual(self.counts(self.chores), (0, 0))
+        self.assertEqual(counters.dashboard(self.user)["total_quests"], 1)
+
+    def test_editing_a_category_keeps_its_counts(self):
+        stale = Category.objects.get(pk=self.errands.pk)
+        Quest.objects.create(owner=self.user, title="Walk", category=self.errands)
+
+        stale.name = "Outside"
+        stale.save()
+        self.assertEqual(self.counts(self.errands), (1, 1))
+
+    def test_logs_today_and_home_reads(self):
+        quest = Quest.objects.create(owner=self.user, title="Walk")
+        Logger.objects.create(quest=quest)
+        log = Logger.objects.create(quest=quest)
+        log.delete()
+
+        self.assertEqual(
+            counters.dashboard(self.user),
+            {"total_quests": 1, "active_quests": 1, "logs_today": 1},
+        )
+
+        self.client.force_login(self.user)
+        with self.assertNumQueries(5):  # session, user, two counter rows, week stats
+            self.client.get(reverse("home"))
+
+    def test_reconcile_repairs_drift(self):
+        quest = Quest.objects.create(owner=self.user, title="Walk", category=self.errands)
+        Logger.objects.create(quest=quest)
+        Category.objects.filter(pk=self.errands.pk).update(quest_count=7)
+        UserCounters.objects.all().delete()
+        DailyLogCount.objects.update(count=9)
+
+        self.assertEqual(counters.reconcile(), 3)
+        self.assertEqual(self.counts(self.errands), (1, 1))
+        self.assertEqual(counters.dashboard(self.user)["logs_today"], 1)
+        self.assertEqual(counters.reconcile(), 0)
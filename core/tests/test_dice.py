@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from core import dice
+from core.forms import QuestForm
+from core.models import Category, Logger, Quest
+
+
+class DiceFormulaTests(TestCase):
+
+    def test_distribution_of_two_d6(self):
+        dist = dice.compile("2d6").distribution
+        self.assertEqual((dist.min, dist.max), (2, 12))
+        self.assertAlmostEqual(sum(dist.probs), 1.0)
+        self.assertAlmostEqual(dist.mean, 7.0)
+        self.assertAlmostEqual(dist.probability(7), 6 / 36)
+        self.assertEqual(dist.percentile(50), 7)
+
+    def test_exploding_d10_mean(self):
+        # E = 5.5 * (1 + 1/10 + 1/100 + ...) = 5.5 * 10/9
+        self.assertAlmostEqual(dice.compile("d10!").distribution.mean, 55 / 9, places=9)
+        self.assertEqual(dice.compile("d10!").distribution.probability(10), 0.0)
+
+    def test_arithmetic_and_max(self):
+        self.assertAlmostEqual(dice.compile("d6 x 2 + 3").distribution.mean, 10.0)
+        self.assertAlmostEqual(dice.compile("d4 - 1").distribution.mean, 1.5)
+        best = dice.compile("max(d2, d2)").distribution
+        self.assertAlmostEqual(best.probability(2), 0.75)
+
+    def test_compile_is_cached_and_normalized(self):
+        self.assertIs(dice.compile("2D6 + 1"), dice.compile("2d6+1"))
+        self.assertEqual(dice.compile("").formula, dice.DEFAULT_FORMULA)
+
+    def test_rolls_stay_inside_the_distribution(self):
+        plan = dice.compile("2d6!+1")
+        dist = plan.distribution
+        for _ in range(200):
+            total, faces = plan.roll()
+            self.assertGreaterEqual(total, dist.min)
+            self.assertEqual(total, sum(faces) + 1)
+
+    def test_invalid_formulas(self):
+        for formula in ["d", "2d1", "d6+", "3d6)", "max(d6", "d6 / 2", "1000d1000"]:
+            with self.subTest(formula=formula), self.assertRaises(dice.DiceError):
+                dice.compile(formula).distribution
+
+
+class PayoutFormulaViewTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("dice", password="pw")
+        self.client.login(username="dice", password="pw")
+        self.category = Category.objects.create(owner=self.user, name="Chores", payout_formula="2d6")
+        self.quest = Quest.objects.create(owner=self.user, title="Dishes", category=self.category)
+
+    def roll(self):
+        log = Logger.objects.create(quest=self.quest)
+        response = self.client.post(reverse("logger_roll_payout", args=[log.pk]), HTTP_HX_REQUEST="true")
+        self.assertEqual(response.status_code, 200)
+        log.refresh_from_db()
+        return log
+
+    def test_roll_uses_category_formula(self):
+        log = self.roll()
+        self.assertTrue(2 <= log.payout <= 12)
+        self.assertIn("Roll 2d6:", log.notes)
+
+    def test_quest_formula_overrides_category(self):
+        self.quest.payout_formula = "5"
+        self.quest.save()
+        self.assertEqual(self.roll().payout, 5)
+
+    def test_form_rejects_bad_formula(self):
+        form = QuestForm(data={"title": "Bad", "start_date": "2026-01-01", "payout_formula": "2d"}, owner=self.user)
+        self.assertFalse(form.is_valid())
+        self.assertIn("payout_formula", form.errors)
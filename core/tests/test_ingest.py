@@ -0,0 +1,157 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core import ingest
+from core.models import ApiToken, Change, DailyLogCount, Logger, Quest, QuestActivity
+
+
+class IngestApiTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("tracker", password="pw")
+        self.quest = Quest.objects.create(owner=self.user, title="Timer")
+        _, self.token = ApiToken.issue(self.user, "timer")
+
+    def post(self, events, token=None):
+        return self.client.post(
+            reverse("api_ingest"), json.dumps({"events": events}), content_type="application/json",
+            headers={"Authorization": f"Bearer {token or self.token}"},
+        )
+
+    def test_requires_a_token(self):
+        self.assertEqual(self.post([{"quest": str(self.quest.pk)}], token="nope").status_code, 401)
+        self.client.force_login(self.user)  # a session is not enough
+        response = self.client.post(reverse("api_ingest"), "{}", content_type="application/json")
+        self.assertEqual(response.status_code, 401)
+
+    def test_events_are_stored_with_their_side_effects(self):
+        events = [{"quest": str(self.quest.pk), "completed": i % 2 == 0, "payout": i, "notes": "**x**"}
+                  for i in range(5)]
+        response = self.post(events)
+        self.assertEqual(response.status_code, 201)
+        results = response.json()["results"]
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(row["created"] for row in results))
+
+        logs = Logger.objects.filter(quest=self.quest)
+        self.assertEqual(logs.count(), 5)
+        self.assertEqual(logs.first().notes_html, "<p><strong>x</strong></p>")
+        self.assertEqual(Change.objects.filter(model="logger", op="create").count(), 5)
+        self.assertEqual(DailyLogCount.objects.get(owner=self.user).count, 5)
+        self.assertTrue(QuestActivity.objects.filter(quest=self.quest).exists())
+
+    def test_keys_make_retries_safe(self):
+        event = {"quest": str(self.quest.pk), "key": "evt-1"}
+        first = self.post([event, event]).json()["results"]
+        self.assertEqual(first[0]["id"], first[1]["id"])
+        again = self.post([event]).json()["results"]
+        self.assertEqual((again[0]["id"], again[0]["created"]), (first[0]["id"], False))
+        self.assertEqual(Logger.objects.count(), 1)
+
+    def test_a_key_reused_for_another_quest_is_a_conflict(self):
+        other = Quest.objects.create(owner=self.user, title="Other")
+        self.post([{"quest": str(self.quest.pk), "key": "evt-1"}])
+
+        response = self.post([{"quest": str(other.pk), "key": "fresh"}, {"quest": str(other.pk), "key": "evt-1"}])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(list(response.json()["events"]), ["1"])
+        response = self.post([{"quest": str(self.quest.pk), "key": "k"}, {"quest": str(other.pk), "key": "k"}])
+        self.assertEqual(list(response.json()["events"]), ["1"])
+        self.assertEqual(Logger.objects.count(), 1)  # nothing else written
+
+        # Taken by a concurrent request between the check and the write:
+        # still nothing of the request is stored
+        with mock.patch("core.api._key_conflicts", return_value={}):
+            response = self.post([{"quest": str(other.pk), "key": "fresh"}, {"quest": str(other.pk), "key": "evt-1"}])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(list(response.json()["events"]), ["1"])
+        self.assertEqual(Logger.objects.filter(quest=other).count(), 0)
+
+    def test_a_conflicting_request_does_not_hold_back_its_batch(self):
+        other = Quest.objects.create(owner=self.user, title="Other")
+        ingest.write([[Logger(owner=self.user, quest=self.quest, idempotency_key="evt-1")]])
+
+        ok, clash = ingest.write([
+            [Logger(owner=self.user, quest=other, idempotency_key="a")],
+            [Logger(owner=self.user, quest=other), Logger(owner=self.user, quest=other, idempotency_key="evt-1")],
+        ])
+        self.assertEqual(ok[0].idempotency_key, "a")
+        self.assertIsInstance(clash, ingest.KeyConflict)
+        self.assertEqual(clash.indexes, [1])
+        self.assertEqual(Logger.objects.filter(quest=other).count(), 1)
+
+    def test_events_can_carry_their_own_timestamp(self):
+        when = "2026-03-01T07:30:00+01:00"
+        response = self.post([{"quest": str(self.quest.pk), "timestamp": when}, {"quest": str(self.quest.pk)}])
+        self.assertEqual(response.status_code, 201)
+        first, second = (Logger.objects.get(pk=row["id"]) for row in response.json()["results"])
+        self.assertEqual(first.timestamp.isoformat(), "2026-03-01T06:30:00+00:00")
+        self.assertGreater(second.timestamp, first.timestamp)
+        self.assertEqual(DailyLogCount.objects.filter(owner=self.user).count(), 2)
+
+        errors = self.post([
+            {"quest": str(self.quest.pk), "timestamp": "2026-03-01T07:30:00"},
+            {"quest": str(self.quest.pk), "timestamp": "2026-13-01T07:30:00Z"},
+            {"quest": str(self.quest.pk), "timestamp": "2999-01-01T00:00:00Z"},
+            {"quest": str(self.quest.pk), "timestamp": 1772350200},
+        ]).json()["events"]
+        self.assertEqual(list(errors), ["0", "1", "2", "3"])
+        self.assertEqual(errors["2"], "'timestamp' is in the future")
+
+    def test_invalid_or_foreign_events_reject_the_request(self):
+        other = get_user_model().objects.create_user("other", password="pw")
+        theirs = Quest.objects.create(owner=other, title="Theirs")
+        ended = Quest.objects.create(owner=self.user, title="Done", end_date="2026-01-01")
+
+        response = self.post([{"quest": str(self.quest.pk), "payout": "lots"}, {"quest": str(theirs.pk)}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()["events"]), ["0"])
+        self.assertEqual(self.post([{"quest": str(theirs.pk)}, {"quest": str(ended.pk)}]).json()["events"],
+                         {"0": "no such active quest", "1": "no such active quest"})
+        self.assertFalse(Logger.objects.exists())
+
+
+@override_settings(INGEST_FLUSH_MS=200, INGEST_MAX_BATCH=4)
+class GroupCommitTests(SimpleTestCase):
+    """The queue and flusher alone; `write` is replaced, so no database."""
+
+    def test_requests_share_a_commit_and_get_their_own_results(self):
+        batches = []
+
+        def fake_write(groups):
+            batches.append([log for group in groups for log in group])
+            return [[f"stored {log}" for log in group] for group in groups]
+
+        committer = ingest.GroupCommitter()
+        with mock.patch("core.ingest.write", side_effect=fake_write):
+            futures = [committer.submit([f"r{i}a", f"r{i}b"][: 1 + i % 2]) for i in range(4)]
+            results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(results[1], ["stored r1a", "stored r1b"])
+        self.assertEqual(results[2], ["stored r2a"])
+        # 6 events, at most 4 per batch, whole requests only
+        self.assertEqual([len(batch) for batch in batches], [4, 2])
+
+    def test_a_key_conflict_fails_only_its_own_request(self):
+        def fake_write(groups):
+            return [ingest.KeyConflict([0]) if group == ["b"] else [f"stored {log}" for log in group]
+                    for group in groups]
+
+        committer = ingest.GroupCommitter()
+        with mock.patch("core.ingest.write", side_effect=fake_write):
+            futures = [committer.submit(["a"]), committer.submit(["b"])]
+            self.assertEqual(futures[0].result(timeout=5), ["stored a"])
+            with self.assertRaises(ingest.KeyConflict):
+                futures[1].result(timeout=5)
+
+    def test_a_failed_flush_fails_its_waiters(self):
+        committer = ingest.GroupCommitter()
+        with mock.patch("core.ingest.write", side_effect=RuntimeError("disk full")), \
+                mock.patch("core.ingest.connection"):
+            future = committer.submit(["a"])
+            with self.assertRaisesMessage(RuntimeError, "disk full"):
+                future.result(timeout=5)
@@ -0,0 +1,81 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from core import jobs
+from core.models import Job
+
+calls = []
+
+
+@jobs.task(name="test.record")
+def record(value):
+    calls.append(value)
+
+
+@jobs.task(name="test.boom")
+def boom():
+    raise RuntimeError("boom")
+
+
+class JobTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_unknown_task_is_rejected(self):
+        with self.assertRaises(LookupError):
+            jobs.enqueue("nope")
+
+    def test_claim_and_run(self):
+        job = jobs.enqueue(record, value=3)
+
+        claimed = jobs.claim("w1", 10)
+        self.assertEqual([j.pk for j in claimed], [job.pk])
+        self.assertEqual(jobs.claim("w2", 10), [])  # already running
+
+        self.assertTrue(jobs.run(claimed[0]))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.DONE)
+        self.assertEqual(calls, [3])
+
+    def test_delayed_job_is_not_due(self):
+        jobs.enqueue(record, value=1, delay=timedelta(minutes=5))
+        self.assertEqual(jobs.claim("w1", 10), [])
+
+    def test_failures_back_off_then_give_up(self):
+        job = jobs.enqueue(boom, max_attempts=2)
+
+        jobs.run(jobs.claim("w1", 1)[0])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertIn("boom", job.last_error)
+        self.assertGreater(job.run_at, job.created_at)
+
+        Job.objects.update(run_at=job.created_at)
+        jobs.run(jobs.claim("w1", 1)[0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = jobs.enqueue(record, value=1)
+        jobs.claim("dead", 1)
+        self.assertEqual(jobs.requeue_stale(older_than=timedelta(0)), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+
+
+class WorkerTests(TransactionTestCase):
+    # Job threads use their own connections, so rows must really be committed
+
+    def setUp(self):
+        calls.clear()
+
+    def test_run_worker_once_drains_queue(self):
+        for value in range(3):
+            jobs.enqueue(record, value=value)
+        call_command("run_worker", "--once", "--threads=2", "--poll=0.05", stdout=StringIO())
+        self.assertEqual(sorted(calls), [0, 1, 2])
+        self.assertFalse(Job.objects.exclude(status=Job.Status.DONE).exists())
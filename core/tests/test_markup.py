@@ -0,0 +1,54 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from core import markup
+from core.models import Change, Quest
+
+
+class RenderTests(SimpleTestCase):
+
+    def test_markup_subset(self):
+        html = markup.render("# Plan\n**Walk** *slowly*, `a*b`\n\n- one\n- two\n\n> careful")
+        self.assertHTMLEqual(html, (
+            "<h3>Plan</h3><p><strong>Walk</strong> <em>slowly</em>, <code>a*b</code></p>"
+            "<ul><li>one</li><li>two</li></ul><blockquote><p>careful</p></blockquote>"
+        ))
+
+    def test_html_is_escaped_and_links_are_limited(self):
+        html = markup.render('<img src=x onerror="alert(1)"> [ok](https://example.com) [no](javascript:alert(1))')
+        self.assertNotIn("<img", html)
+        self.assertIn('<a href="https://example.com" rel="nofollow noopener">ok</a>', html)
+        self.assertNotIn('href="javascript', html)
+
+    def test_blank_notes_render_empty(self):
+        self.assertEqual(markup.render("  \n "), "")
+
+
+class StoredHtmlTests(TestCase):
+
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user("me", password="pw")
+        self.quest = Quest.objects.create(owner=self.owner, title="Walk", notes="**far**")
+
+    def test_rendered_on_save_and_kept_out_of_the_feed(self):
+        self.assertEqual(self.quest.notes_html, "<p><strong>far</strong></p>")
+        self.quest.notes = "*near*"
+        self.quest.save(update_fields=["notes"])
+        self.quest.refresh_from_db()
+        self.assertEqual(self.quest.notes_html, "<p><em>near</em></p>")
+        self.assertEqual(Change.objects.last().fields, ["notes"])
+
+    def test_command_rerenders_after_a_version_bump(self):
+        with mock.patch.object(markup, "RENDERER_VERSION", markup.RENDERER_VERSION + 1), \
+                mock.patch.object(markup, "render", return_value="<p>v2</p>"):
+            call_command("render_notes", batch_size=1, stdout=StringIO())
+            self.quest.refresh_from_db()
+            self.assertEqual(self.quest.notes_html, "<p>v2</p>")
+            self.assertEqual(self.quest.notes_html_version, markup.RENDERER_VERSION)
+
+            # Already current: nothing to do
+            self.assertEqual(markup.render_stale(Quest), 0)
@@ -0,0 +1,68 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+
+
+class MetricsTests(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        settings = override_settings(METRICS_DIR=self.tmp.name, METRICS_TOKEN="")
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        # A fresh registry so samples from earlier tests don't leak in
+        self.addCleanup(setattr, metrics, "registry", metrics.registry)
+        metrics.registry = metrics.Registry()
+
+        self.user = get_user_model().objects.create_user("metrics", password="pw")
+        self.client.force_login(self.user)
+
+    def scrape(self, **headers):
+        return self.client.get(reverse("metrics"), **headers)
+
+    def test_records_view_latency_queries_and_htmx_split(self):
+        self.client.get(reverse("home"))
+        self.client.get(reverse("active_quests_partial"), HTTP_HX_REQUEST="true")
+
+        body = self.scrape().content.decode()
+        self.assertIn('questlog_requests_total{htmx="false",method="GET",status="200",view="home"} 1', body)
+        self.assertIn('questlog_requests_total{htmx="true",method="GET",status="200",view="active_quests_partial"} 1', body)
+        self.assertIn('questlog_request_duration_seconds_bucket{view="home",le="+Inf"} 1', body)
+        self.assertIn('questlog_db_queries_per_request_count{view="home"} 1', body)
+        self.assertIn("# TYPE questlog_request_duration_seconds histogram", body)
+
+    def test_sums_other_workers_and_archives_dead_ones(self):
+        other = metrics.Registry()
+        other.inc("questlog_requests_total", {"view": "home"}, 5)
+        dead_pid = "999999999"
+        (Path(self.tmp.name) / f"{dead_pid}.json").write_text(json.dumps(other.data))
+
+        body = self.scrape().content.decode()
+        self.assertIn('questlog_requests_total{view="home"} 5', body)
+        self.assertFalse((Path(self.tmp.name) / f"{dead_pid}.json").exists())
+
+        body = self.scrape().content.decode()  # still counted from the archive
+        self.assertIn('questlog_requests_total{view="home"} 5', body)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token_is_required_when_configured(self):
+        self.assertEqual(self.scrape().status_code, 401)
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION="Bearer s3cret").status_code, 200)
+
+    def test_clear_removes_only_the_registry_files(self):
+        directory = Path(self.tmp.name)
+        own = ["123.json", "archive.json", ".123.json.140.tmp"]
+        others = ["notes.txt", "123.db", "x.json"]
+        for name in own + others:
+            (directory / name).write_text("{}")
+
+        metrics.clear()
+        self.assertEqual(sorted(path.name for path in directory.iterdir()), sorted(others))
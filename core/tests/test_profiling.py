@@ -0,0 +1,82 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import profiling
+
+
+class ProfilingTests(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        settings = override_settings(PROFILING_DIR=self.tmp.name, PROFILING_SAMPLE_RATE=0, PROFILING_KEEP=3)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        User = get_user_model()
+        self.staff = User.objects.create_user("staff", password="pw", is_staff=True)
+        self.user = User.objects.create_user("plain", password="pw")
+
+    def files(self, pattern="*.prof"):
+        return list(Path(self.tmp.name).glob(pattern))
+
+    def test_staff_can_profile_a_request(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("stats"), {"__profile": "1", "next": "/secret/"})
+
+        profile_id = response["X-Profile-Id"]
+        self.assertEqual(len(self.files()), 1)
+
+        detail = self.client.get(reverse("profile_detail", args=[profile_id]))
+        self.assertContains(detail, "function calls")
+        self.assertTrue(detail.context["meta"]["allocators"])
+        self.assertEqual(detail.context["meta"]["path"], reverse("stats"))  # no query string kept
+
+        download = self.client.get(reverse("profile_download", args=[profile_id]))
+        self.assertEqual(download["Content-Disposition"], f'attachment; filename="{profile_id}.prof"')
+
+    def test_param_is_ignored_for_other_users(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("stats"), {"__profile": "1"})
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(self.files(), [])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_requests_skip_memory_tracing_and_are_pruned(self):
+        self.client.force_login(self.user)
+        for _ in range(5):
+            self.client.get(reverse("home"))
+        self.assertEqual(len(self.files()), 3)
+        meta = json.loads(self.files("*.json")[0].read_text())
+        self.assertEqual((meta["mode"], meta["allocators"]), ("sampled", []))
+
+    def test_request_is_served_unprofiled_while_another_profile_runs(self):
+        self.client.force_login(self.staff)
+        with profiling._profile_lock:  # another thread's request
+            response = self.client.get(reverse("stats"), {"__profile": "1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profile-Id", response)
+
+        # A profiler started outside the middleware (3.12+ refuses a second one)
+        with mock.patch("core.profiling.cProfile.Profile") as profile:
+            profile.return_value.enable.side_effect = ValueError("Another profiling tool is already active")
+            response = self.client.get(reverse("stats"), {"__profile": "1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(self.files(), [])
+
+    def test_views_are_staff_only(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("profile_list"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_unknown_profile_is_a_404(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("profile_detail", args=["..%2Fsettings"]))
+        self.assertEqual(response.status_code, 404)
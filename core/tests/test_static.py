@@ -0,0 +1,72 @@
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import check_no_external_assets, check_vendored_asset_versions, find_external_assets
+
+
+class ExternalAssetCheckTests(SimpleTestCase):
+
+    def test_project_templates_are_self_hosted(self):
+        self.assertEqual(check_no_external_assets(None), [])
+
+    def test_flags_cdn_and_protocol_relative_scripts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            page = Path(tmp) / "page.html"
+            page.write_text(
+                '<script src="{% static \'js/app.js\' %}"></script>\n'
+                '<script src="https://unpkg.com/htmx.org"></script>\n'
+                "<script defer src='//cdn.example.com/x.js'></script>\n"
+            )
+            hits = find_external_assets([tmp])
+
+        self.assertEqual([line for _, line in hits], [2, 3])
+
+    def test_flags_cdn_stylesheets(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            page = Path(tmp) / "page.html"
+            page.write_text(
+                '<link rel="stylesheet" href="{% static \'css/app.css\' %}">\n'
+                "<link\n  rel='stylesheet'\n  href='https://cdn.jsdelivr.net/npm/@picocss/pico@2/css/pico.min.css'\n>\n"
+                '<link href="//fonts.example.com/f.css" rel="preload stylesheet">\n'
+                '<link rel="preconnect" href="https://fonts.example.com">\n'
+            )
+            hits = find_external_assets([tmp])
+
+        self.assertEqual([line for _, line in hits], [2, 6])
+
+
+class VendoredAssetCheckTests(SimpleTestCase):
+
+    def check(self, files, storage="django.contrib.staticfiles.storage.StaticFilesStorage"):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, body in files.items():
+                path = Path(tmp) / name
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(body)
+            storages = {"staticfiles": {"BACKEND": storage}}
+            with override_settings(STATICFILES_DIRS=[tmp], STORAGES=storages):
+                return [(message.id, message.msg) for message in check_vendored_asset_versions(None)]
+
+    def test_pinned_major_versions_pass(self):
+        files = {
+            "js/htmx.min.js": 'var htmx=function(){return{config:{},version:"1.9.12"}}();',
+            "css/pico.min.css": "@charset \"UTF-8\";/*!\n * Pico CSS \u2728 v2.0.6 (https://picocss.com)\n */",
+        }
+        self.assertEqual(self.check(files), [])
+
+    def test_other_major_versions_warn(self):
+        files = {
+            "js/htmx.min.js": 'var htmx=function(){return{config:{},version:"2.0.4"}}();',
+            "css/pico.min.css": "/*!\n * Pico CSS v1.5.10 (https://picocss.com)\n */",
+        }
+        self.assertEqual(self.check(files), [
+            ("core.W001", "static/js/htmx.min.js is version 2.0.4; the templates expect 1.9.x."),
+            ("core.W001", "static/css/pico.min.css is version 1.5.10; the templates expect 2.x."),
+        ])
+
+    def test_missing_files_are_errors_under_manifest_storage(self):
+        self.assertEqual([id for id, _ in self.check({})], ["core.W001", "core.W001"])
+        manifest = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+        self.assertEqual([id for id, _ in self.check({}, storage=manifest)], ["core.E002", "core.E002"])
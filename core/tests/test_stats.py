@@ -0,0 +1,137 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import jobs, stats, tasks
+from core.models import Category, Job, Logger, Quest, StatsSnapshot
+
+
+class StatsEngineTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("stats", password="pw")
+        errands = Category.objects.create(owner=self.user, name="Errands")
+        self.walk = Quest.objects.create(owner=self.user, title="Walk", category=errands)
+        self.shop = Quest.objects.create(owner=self.user, title="Shop", category=errands)
+        self.read = Quest.objects.create(owner=self.user, title="Read")
+
+        for quest, completed, payout in [
+            (self.walk, True, 5), (self.walk, False, None), (self.walk, True, 3),
+            (self.shop, True, 10),
+            (self.read, False, None), (self.read, False, None), (self.read, True, None),
+        ]:
+            Logger.objects.create(quest=quest, completed=completed, payout=payout)
+
+    def report(self):
+        now = timezone.now()
+        return stats.for_window(self.user, now - timedelta(days=1), now + timedelta(minutes=1))
+
+    def test_overall_matches_plain_aggregates(self):
+        overall = self.report().overall
+        self.assertEqual(overall.sessions, 7)
+        self.assertEqual(overall.completed, 4)
+        self.assertEqual(overall.payout, 18)
+        self.assertEqual(overall.avg_payout, 6)
+
+    def test_top_quests(self):
+        report = self.report()
+        self.assertEqual([q.title for q in report.top_quests(by="payout")], ["Shop", "Walk", "Read"])
+        self.assertEqual([q.title for q in report.top_quests(by="sessions")], ["Walk", "Read", "Shop"])
+
+    def test_by_category_keeps_uncategorized(self):
+        categories = {c.category_name: c for c in self.report().categories}
+        self.assertEqual(categories["Errands"].sessions, 4)
+        self.assertEqual(categories["Errands"].payout, 18)
+        self.assertIsNone(categories[None].payout)
+
+    def test_stats_page_is_one_aggregate_query(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(3):  # session, user, stats
+            response = self.client.get(reverse("stats"))
+        self.assertContains(response, "Walk")
+
+    def test_long_ranges_are_stored_and_refreshed_by_the_worker(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("stats"), {"range": "year"})  # first visit: computed inline
+        self.assertContains(response, "Walk")
+        self.assertEqual(response.context["total_sessions"], 7)
+        self.assertFalse(Job.objects.exists())
+
+        Logger.objects.create(quest=self.walk, completed=True, payout=2)
+        response = self.client.get(reverse("stats"), {"range": "year"})
+        self.assertEqual(response.context["total_sessions"], 7)  # the stored snapshot
+
+        StatsSnapshot.objects.update(computed_at=timezone.now() - timedelta(hours=1))
+        self.client.get(reverse("stats"), {"range": "year"})
+        self.client.get(reverse("stats"), {"range": "year"})
+        job = Job.objects.get()  # queued once
+        self.assertEqual(job.kwargs, {"user_id": self.user.pk, "range": "year"})
+
+        [claimed] = jobs.claim("w1", 10)
+        self.assertTrue(jobs.run(claimed))
+        response = self.client.get(reverse("stats"), {"range": "year"})
+        self.assertEqual(response.context["total_sessions"], 8)
+        self.assertEqual(response.context["total_payout"], 20)
+
+    def test_stale_snapshot_is_shown_while_it_refreshes(self):
+        stats.refresh(self.user, "all")
+        StatsSnapshot.objects.update(computed_at=timezone.now() - timedelta(hours=1))
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("stats"), {"range": "all"})
+        self.assertContains(response, "Walk")
+        self.assertTrue(Job.objects.filter(name="refresh_stats", status=Job.Status.QUEUED).exists())
+
+
+class ParallelWindowTests(TransactionTestCase):
+    """Month chunks run on other connections, so the rows must be committed."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("chunks", password="pw")
+        quests = [Quest.objects.create(owner=self.user, title=f"Q{i}") for i in range(3)]
+        now = timezone.now()
+        logs = [
+            Logger(owner=self.user, quest=quests[i % 3], completed=i % 2 == 0, payout=i % 7 or None)
+            for i in range(400)
+        ]
+        Logger.objects.bulk_create(logs)
+        # Spread over ~14 months, including both window edges
+        for i, log in enumerate(logs):
+            Logger.objects.filter(pk=log.pk).update(timestamp=now - timedelta(days=i % 420))
+        self.start, self.end = now - timedelta(days=419), now
+
+    def test_month_chunks_tile_the_window(self):
+        chunks = stats.month_chunks(self.start, self.end)
+        self.assertEqual(chunks[0][0], self.start)
+        self.assertEqual(chunks[-1][1], self.end)
+        for (_, a_end), (b_start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(a_end, b_start)
+            self.assertEqual(timezone.localtime(b_start).day, 1)
+
+    def test_parallel_matches_single_query(self):
+        with override_settings(STATS_WORKERS=1):
+            serial = stats.for_window(self.user, self.start, self.end)
+        with override_settings(STATS_WORKERS=4, STATS_PARALLEL_MIN_DAYS=31), \
+                mock.patch("core.stats._chunk_rows", wraps=stats._chunk_rows) as chunk_rows:
+            parallel = stats.for_window(self.user, self.start, self.end)
+        self.assertGreaterEqual(chunk_rows.call_count, 14)
+
+        self.assertEqual(serial.overall, parallel.overall)
+        self.assertEqual(serial.overall.sessions, 400)
+        key = lambda q: q.title
+        self.assertEqual(sorted(serial.quests, key=key), sorted(parallel.quests, key=key))
+
+    def test_refresh_job_aggregates_in_parallel(self):
+        jobs.enqueue(tasks.refresh_stats, user_id=self.user.pk, range="year")
+        [claimed] = jobs.claim("w1", 10)
+        with override_settings(STATS_WORKERS=4), \
+                mock.patch("core.stats._chunk_rows", wraps=stats._chunk_rows) as chunk_rows:
+            self.assertTrue(jobs.run(claimed))
+        self.assertGreaterEqual(chunk_rows.call_count, 12)
+
+        snapshot = StatsSnapshot.objects.get(owner=self.user, range="year")
+        serial = stats.for_window(self.user, snapshot.start, snapshot.computed_at)
+        self.assertEqual(stats.from_snapshot(snapshot).overall, serial.overall)
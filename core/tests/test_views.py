@@ -0,0 +1,298 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch, reverse
+
+from core.models import Category, Change, Logger, Quest
+
+
+class OwnershipTests(TestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.me = User.objects.create_user("me", password="pw")
+        self.other = User.objects.create_user("other", password="pw")
+        self.client.force_login(self.me)
+
+    def test_other_users_quest_is_a_404(self):
+        theirs = Quest.objects.create(owner=self.other, title="Theirs")
+        response = self.client.get(reverse("quest_detail", args=[theirs.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_lists_only_show_own_rows(self):
+        Quest.objects.create(owner=self.other, title="Theirs")
+        Quest.objects.create(owner=self.me, title="Mine")
+
+        response = self.client.get(reverse("quest_list"))
+        self.assertContains(response, "Mine")
+        self.assertNotContains(response, "Theirs")
+
+    def test_created_rows_belong_to_the_user(self):
+        self.client.post(reverse("quest_create"), {"title": "New"})
+        quest = Quest.objects.get(title="New")
+        self.assertEqual(quest.owner, self.me)
+
+        self.client.post(reverse("logger_start", args=[quest.pk]))
+        self.assertEqual(Logger.objects.get(quest=quest).owner, self.me)
+
+    def test_category_names_are_unique_per_user(self):
+        Category.objects.create(owner=self.other, name="Errands")
+        self.client.post(reverse("category_create"), {"name": "Errands"})
+        self.assertTrue(Category.objects.filter(owner=self.me, name="Errands").exists())
+
+
+class QuestDetailTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("detail", password="pw")
+        self.client.force_login(self.user)
+        self.quest = Quest.objects.create(owner=self.user, title="Walk")
+
+    def test_shell_does_not_touch_logs(self):
+        with self.assertNumQueries(3):  # session, user, quest
+            response = self.client.get(reverse("quest_detail", args=[self.quest.pk]))
+        self.assertContains(response, reverse("quest_rollups", args=[self.quest.pk]))
+        self.assertContains(response, 'hx-trigger="load"', count=2)
+
+    def test_history_pages_through_every_log(self):
+        logs = [Logger.objects.create(quest=self.quest) for _ in range(120)]
+        url = reverse("quest_history", args=[self.quest.pk])
+
+        seen, params = [], {"range": "all"}
+        while True:
+            response = self.client.get(url, params)
+            seen += [log.pk for log in response.context["logs"]]
+            cursor = response.context["next_cursor"]
+            if not cursor:
+                break
+            params["cursor"] = cursor
+
+        self.assertEqual(len(seen), 120)
+        self.assertEqual(set(seen), {log.pk for log in logs})
+
+    def test_recent_range_has_no_load_more(self):
+        for _ in range(25):
+            Logger.objects.create(quest=self.quest)
+        response = self.client.get(reverse("quest_history", args=[self.quest.pk]))
+        self.assertEqual(len(response.context["logs"]), 20)
+        self.assertNotContains(response, "Load more")
+
+    def test_fragments_are_scoped_to_owner(self):
+        other = get_user_model().objects.create_user("nosy", password="pw")
+        self.client.force_login(other)
+        for name in ("quest_rollups", "quest_history"):
+            response = self.client.get(reverse(name, args=[self.quest.pk]))
+            self.assertEqual(response.status_code, 404)
+
+
+class LoggerAutosaveTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("tabs", password="pw")
+        self.client.login(username="tabs", password="pw")
+        quest = Quest.objects.create(owner=self.user, title="Journal")
+        self.log = Logger.objects.create(quest=quest, notes="draft")
+        self.url = reverse("logger_autosave", args=[self.log.pk])
+
+    def autosave(self, field, value, base, version):
+        return self.client.post(self.url, {
+            "field": field, field: value, f"base_{field}": base, "version": version,
+        })
+
+    def test_saves_only_the_field_and_bumps_version(self):
+        response = self.autosave("notes", "draft, revised", "draft", 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'id="log-version" name="version" value="2"')
+        self.log.refresh_from_db()
+        self.assertEqual((self.log.notes, self.log.version), ("draft, revised", 2))
+        self.assertEqual(Change.objects.last().fields, ["notes"])
+
+    def test_unchanged_value_is_not_written(self):
+        self.autosave("notes", "draft", "draft", 1)
+        self.log.refresh_from_db()
+        self.assertEqual(self.log.version, 1)
+
+    def test_stale_version_conflicts_only_on_the_same_field(self):
+        self.autosave("notes", "from tab A", "draft", 1)  # tab A, now version 2
+
+        # Tab B still at version 1 edits payout: notes moved, payout didn't
+        response = self.autosave("payout", "7", "", 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "log-version")  # B hasn't seen A's notes
+
+        response = self.autosave("notes", "from tab B", "draft", 1)
+        self.assertEqual(response.status_code, 409)
+        self.assertContains(response, "from tab A", status_code=409)
+        self.log.refresh_from_db()
+        self.assertEqual((self.log.notes, self.log.payout), ("from tab A", 7))
+
+    def test_full_form_submit_with_stale_version_is_rejected(self):
+        self.autosave("notes", "from tab A", "draft", 1)
+        response = self.client.post(
+            reverse("logger_detail", args=[self.log.pk]),
+            {"notes": "from tab B", "payout": "", "version": 1},
+        )
+        self.assertEqual(response.status_code, 409)
+        self.log.refresh_from_db()
+        self.assertEqual(self.log.notes, "from tab A")
+
+    def test_invalid_value_is_a_400(self):
+        response = self.autosave("payout", "lots", "", 1)
+        self.assertEqual(response.status_code, 400)
+
+    def test_detail_page_wires_autosave(self):
+        response = self.client.get(reverse("logger_detail", args=[self.log.pk]))
+        self.assertContains(response, f'hx-post="{self.url}"')
+        self.assertContains(response, 'id="base-payout"')
+
+
+class NotesPreviewTests(TestCase):
+
+    def setUp(self):
+        self.me = get_user_model().objects.create_user("me", password="pw")
+        self.client.force_login(self.me)
+        self.long = "word " * 100
+        self.quest = Quest.objects.create(owner=self.me, title="Long", notes=self.long)
+        Logger.objects.create(quest=self.quest, notes="short\n\nnote")
+
+    def test_preview_is_stored_on_save(self):
+        self.assertTrue(self.quest.notes_truncated)
+        self.assertLessEqual(len(self.quest.notes_preview), 140)
+        self.assertEqual(Logger.objects.get().notes_preview, "short note")
+
+        self.quest.notes = "changed"
+        self.quest.save(update_fields=["notes"])
+        self.quest.refresh_from_db()
+        self.assertEqual(self.quest.notes_preview, "changed")
+
+    def test_lists_never_select_full_notes(self):
+        for name in ("quest_list", "log_list", "today", "category_list"):
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+            self.assertFalse(
+                [q["sql"] for q in ctx.captured_queries if '."notes"' in q["sql"]], name
+            )
+
+    def test_active_quest_cards_select_slim_columns(self):
+        Logger.objects.create(quest=self.quest, payout=4)
+        for name in ("active_quests", "active_quests_partial"):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse(name))
+            self.assertContains(response, "Last payout:")
+            quest_selects = [q["sql"] for q in ctx.captured_queries
+                             if q["sql"].startswith('SELECT "core_quest".')]
+            self.assertTrue(quest_selects, name)
+            for sql in quest_selects:
+                self.assertIn('"core_quest"."notes_preview"', sql)
+                self.assertNotIn('"core_quest"."notes",', sql)
+                self.assertNotIn('"core_quest"."payout_formula"', sql)
+
+    def test_full_notes_load_on_demand_for_the_owner_only(self):
+        url = reverse("notes_full", args=["quest", self.quest.pk])
+        self.assertContains(self.client.get(url), f"<p>{self.long.strip()}</p>", html=True)
+
+        other = get_user_model().objects.create_user("other", password="pw")
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(f"/notes/user/{self.quest.pk}/").status_code, 404)
+        with self.assertRaises(NoReverseMatch):
+            reverse("notes_full", args=["user", self.quest.pk])
+
+
+class LoggerStartTests(TestCase):
+
+    def setUp(self):
+        self.me = get_user_model().objects.create_user("me", password="pw")
+        self.client.force_login(self.me)
+        self.quest = Quest.objects.create(owner=self.me, title="Walk")
+        self.url = reverse("logger_start_htmx", args=[self.quest.pk])
+
+    def test_retry_with_the_same_key_returns_the_same_log(self):
+        self.client.post(self.url, headers={"Idempotency-Key": "k1"})
+        log = Logger.objects.get()
+        log.completed = True
+        log.save()
+
+        with self.assertNumQueries(1):  # the unique index answers it
+            Logger.objects.start(self.quest, "k1")
+        self.client.post(self.url, headers={"Idempotency-Key": "k1"})
+        self.assertEqual(Logger.objects.count(), 1)
+
+        self.client.post(self.url, headers={"Idempotency-Key": "k2"})
+        self.assertEqual(Logger.objects.count(), 2)
+
+    def test_a_key_reused_for_another_quest_is_a_conflict(self):
+        other = Quest.objects.create(owner=self.me, title="Read")
+        self.client.post(self.url, headers={"Idempotency-Key": "k1"})
+        response = self.client.post(reverse("logger_start_htmx", args=[other.pk]), headers={"Idempotency-Key": "k1"})
+        self.assertEqual(response.status_code, 409)
+        self.assertNotContains(response, "Walk", status_code=409)
+        response = self.client.post(reverse("logger_start", args=[other.pk]), {"key": "k1"})
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Logger.objects.filter(quest=other).exists())
+
+    def test_overlong_keys_are_rejected_not_truncated(self):
+        key = "k" * 64
+        self.client.post(self.url, headers={"Idempotency-Key": key})
+        response = self.client.post(self.url, headers={"Idempotency-Key": key + "x"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Logger.objects.count(), 1)
+
+    @override_settings(LOG_START_REUSE_SECONDS=30)
+    def test_double_tap_reuses_the_open_log(self):
+        first = self.client.get(reverse("logger_start", args=[self.quest.pk]))
+        second = self.client.get(reverse("logger_start", args=[self.quest.pk]))
+        self.assertEqual(first["Location"], second["Location"])
+        self.assertEqual(Logger.objects.count(), 1)
+
+    @override_settings(LOG_START_REUSE_SECONDS=0)
+    def test_without_key_or_window_every_start_logs(self):
+        self.client.post(self.url)
+        self.client.post(self.url)
+        self.assertEqual(Logger.objects.count(), 2)
+
+
+@mock.patch("core.views.QUEST_PAGE_SIZE", 3)
+class QuestListPaginationTests(TestCase):
+
+    def setUp(self):
+        self.me = get_user_model().objects.create_user("me", password="pw")
+        self.client.force_login(self.me)
+        self.category = Category.objects.create(owner=self.me, name="Chores")
+        # One batch, so updated_at ties and the id breaks them
+        Quest.objects.bulk_create(
+            Quest(owner=self.me, title=f"Q{i}", category=self.category, limited_mobility=i % 2 == 0,
+                  end_date="2026-01-01" if i < 3 else None)
+            for i in range(8)
+        )
+
+    def walk(self, url):
+        seen = []
+        while url:
+            response = self.client.get(url)
+            seen += [quest.title for quest in response.context["quests"]]
+            url = response.context["next_url"] and url.split("?")[0] + response.context["next_url"]
+        return seen
+
+    def test_pages_cover_every_quest_once_active_first(self):
+        seen = self.walk(reverse("quest_list"))
+        self.assertEqual(sorted(seen), sorted(f"Q{i}" for i in range(8)))
+        self.assertEqual({title for title in seen[:5]}, {f"Q{i}" for i in range(3, 8)})
+
+    def test_category_detail_pages_with_filters(self):
+        url = reverse("category_detail", args=[self.category.pk]) + "?status=active&mobility=limited"
+        self.assertEqual(sorted(self.walk(url)), ["Q4", "Q6"])
+
+    def test_list_order_uses_the_index(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN output is SQLite's")
+        plan = Quest.objects.for_user(self.me).in_list_order()[:3].explain()
+        self.assertIn("quest_list_order", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_bad_cursor_starts_over(self):
+        response = self.client.get(reverse("quest_list") + "?after=nonsense")
+        self.assertEqual(len(response.context["quests"]), 3)
@@ -1,15 +1,26 @@
-from django.urls import path, include
-from . import views
+from django.urls import path, include, register_converter
+from django.urls.converters import StringConverter
+from . import api, metrics, profiling, views
 from django.contrib import admin
 
 
+class NotesKindConverter(StringConverter):
+    """Only the models that have a full-notes view: category, quest, logger."""
+    regex = "|".join(views.NOTES_MODELS)
+
+
+register_converter(NotesKindConverter, "notes_kind")
+
 urlpatterns = [
     path("", views.home, name="home"),
    
         # Quests
     path("quests/", views.quest_list, name="quest_list"),
+    path("quests/bulk/", views.quest_bulk, name="quest_bulk"),
     path("quests/new/", views.quest_create, name="quest_create"),
     path("quests/<uuid:pk>/", views.quest_detail, name="quest_detail"),
+    path("quests/<uuid:pk>/rollups/", views.quest_rollups, name="quest_rollups"),
+    path("quests/<uuid:pk>/history/", views.quest_history, name="quest_history"),
     path("quests/<uuid:pk>/edit/", views.quest_edit, name="quest_edit"),
     path("quests/<uuid:pk>/delete/", views.quest_delete, name="quest_delete"),
     path("active/", views.active_quests_page, name="active_quests"),
@@ -26,6 +37,7 @@ urlpatterns = [
     path("logger/<uuid:pk>/toggle-completed/", views.logger_toggle_completed, name="logger_toggle_completed"),
     path("logger/<uuid:pk>/update-payout/", views.logger_update_payout, name="logger_update_payout"),
     path("logger/<uuid:pk>/roll_payout/", views.logger_roll_payout, name="logger_roll_payout"),
+    path("logger/<uuid:pk>/autosave/", views.logger_autosave, name="logger_autosave"),
     path("logger/<uuid:pk>/edit/", views.logger_edit, name="logger_edit"),
     path("logger/<uuid:pk>/delete/", views.logger_delete, name="logger_delete"),
 
@@ -39,6 +51,10 @@ urlpatterns = [
     path("categories/new/", views.category_create, name="category_create"),
     path("categories/<uuid:pk>/edit/", views.category_edit, name="category_edit"),
     path("categories/<uuid:pk>/delete/", views.category_delete, name="category_delete"),
+    path("categories/<uuid:pk>/merge/", views.category_merge, name="category_merge"),
+
+    # Full notes behind a list row's preview (htmx "more")
+    path("notes/<notes_kind:kind>/<uuid:pk>/", views.notes_full, name="notes_full"),
     
     #today Stats etc
     path("today/", views.today_page, name="today"),
@@ -46,6 +62,19 @@ urlpatterns = [
     # Django auth (login / logout)
     path("accounts/", include("django.contrib.auth.urls")),
     path("healthz/", views.healthz, name="healthz"),
+    path("metrics", metrics.metrics_view, name="metrics"),
+
+    # Stored request profiles (staff)
+    path("profiles/", profiling.profile_list, name="profile_list"),
+    path("profiles/<str:profile_id>/", profiling.profile_detail, name="profile_detail"),
+    path("profiles/<str:profile_id>/download/", profiling.profile_download, name="profile_download"),
+
+    # JSON API
+    path("api/changes", api.changes, name="api_changes"),
+    path("api/quests", api.quests, name="api_quests"),
+    path("api/logs", api.logs, name="api_logs"),
+    path("api/categories", api.categories, name="api_categories"),
+    path("api/ingest", api.ingest, name="api_ingest"),
 
 
 
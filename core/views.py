@@ -1,16 +1,20 @@
 # Standard library
+import base64
+import json
 import random
-from datetime import timedelta
+import uuid
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
 
 # Django core
+from django.conf import settings
 from django.contrib import messages
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
 from django.db import models
 from django.db.models import (
     Case,
     When,
-    Value,
-    IntegerField,
     Count,
     OuterRef,
     Subquery,
@@ -18,57 +22,181 @@ from django.db.models import (
 )
 from django.http import HttpResponse, HttpResponseBadRequest
 from django.shortcuts import render, get_object_or_404, redirect
+from django.template.defaultfilters import pluralize
+from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Max, Avg
+from django.db.models import Q, Max
 from django.utils.timezone import now
 # Local app
-from .models import Quest, Logger, Category
+from . import activity, api, bulk, counters, dice, jobs, stats, tasks
+from .models import (
+    Category,
+    IdempotencyKeyConflict,
+    InvalidIdempotencyKey,
+    Job,
+    Logger,
+    Quest,
+    StatsSnapshot,
+)
 from .forms import CategoryForm, QuestForm, LoggerForm
-from .utils import roll_exploding_d10
 
 
 @login_required
 def home(request):
-    total_quests = Quest.objects.count()
-    active_quests = Quest.objects.filter(end_date__isnull=True).count()
+    context = counters.dashboard(request.user)
+    context["week"] = stats.for_window(request.user, now() - timedelta(days=7), now()).overall
+    return render(request, "core/home.html", context)
 
-    today = now().date()
-    logs_today = Logger.objects.filter(timestamp__date=today).count()
+QUEST_FILTERS = ("category", "status", "mobility")
+QUEST_PAGE_SIZE = 50
 
-    context = {
-        "total_quests": total_quests,
-        "active_quests": active_quests,
-        "logs_today": logs_today,
-    }
-    return render(request, "core/home.html", context)
 
 @login_required
 def quest_list(request):
-    # Active first (end_date is NULL), then most recently updated
-    quests = (
-        Quest.objects.select_related("category")
-        .annotate(
-            is_ended=Case(
-                When(end_date__isnull=True, then=Value(0)),  # active
-                default=Value(1),  # ended
-                output_field=IntegerField(),
-            )
+    filters = {name: request.GET.get(name, "") for name in QUEST_FILTERS}
+    quests, next_cursor = _quest_page(request, _filtered_quests(request.user, **filters))
+
+    return render(request, "core/quest_list.html", {
+        "quests": quests,
+        "next_url": _next_page_url(filters, next_cursor),
+        "categories": Category.objects.for_user(request.user).only("id", "name").order_by("name"),
+        **filters,
+    })
+
+
+def _filtered_quests(user, category: str = "", status: str = "", mobility: str = ""):
+    """
+    The quest list filters: category (uuid or "none"), status
+    (active|ended) and mobility (limited|normal).
+    """
+    quests = Quest.objects.for_user(user)
+    if category == "none":
+        quests = quests.filter(category__isnull=True)
+    elif category:
+        try:
+            quests = quests.filter(category_id=uuid.UUID(category))
+        except ValueError:
+            quests = quests.none()
+    if status == "active":
+        quests = quests.active()
+    elif status == "ended":
+        quests = quests.ended()
+    if mobility in ("limited", "normal"):
+        quests = quests.by_mobility(mobility == "limited")
+    return quests
+
+
+def _quest_page(request, quests) -> tuple[list, str | None]:
+    """
+    One page of `quests` in list order, resuming after the `after` cursor;
+    returns the quests and the cursor of the next page (None on the last).
+    Each page is a range scan of a (…, is_ended, updated_at, id) index, so
+    page 200 costs what page 1 does.
+    """
+    quests = quests.listing().in_list_order()
+    cursor = _decode_quest_cursor(request.GET.get("after", ""))
+    if cursor:
+        quests = quests.after(*cursor)
+    page = list(quests[:QUEST_PAGE_SIZE + 1])
+    if len(page) <= QUEST_PAGE_SIZE:
+        return page, None
+    return page[:QUEST_PAGE_SIZE], _encode_quest_cursor(page[QUEST_PAGE_SIZE - 1])
+
+
+def _encode_quest_cursor(quest) -> str:
+    raw = json.dumps([quest.is_ended, quest.updated_at.isoformat(), str(quest.pk)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_quest_cursor(token: str):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        is_ended, updated_at, pk = json.loads(raw)
+        return bool(is_ended), datetime.fromisoformat(updated_at), uuid.UUID(pk)
+    except (ValueError, TypeError):
+        return None
+
+
+def _next_page_url(filters: dict, cursor: str | None) -> str | None:
+    if cursor is None:
+        return None
+    return "?" + urlencode({**{k: v for k, v in filters.items() if v}, "after": cursor})
+
+
+def _category_id(raw: str) -> uuid.UUID | None:
+    """A POSTed category id; None for "" (no category), ValueError if malformed."""
+    return uuid.UUID(raw) if raw else None
+
+
+@login_required
+@require_POST
+def quest_bulk(request):
+    """
+    End or re-categorize many quests in one request: the ticked ones, or
+    with all=1 every quest matching the list's current filters.
+    """
+    filters = {name: request.POST.get(name, "") for name in QUEST_FILTERS}
+    back = redirect(f"{reverse('quest_list')}?{urlencode(filters)}")
+
+    quests = _filtered_quests(request.user, **filters)
+    if request.POST.get("all") != "1":
+        ids = []
+        for raw in request.POST.getlist("quest"):
+            try:
+                ids.append(uuid.UUID(raw))
+            except ValueError:
+                pass
+        if not ids:
+            messages.error(request, "Select some quests first.")
+            return back
+        quests = quests.filter(pk__in=ids)
+
+    action = request.POST.get("action")
+    if action == "end":
+        count = bulk.end_quests(request.user, quests)
+        messages.success(request, f"Ended {count} quest{pluralize(count)}.")
+    elif action == "move":
+        try:
+            target = _category_id(request.POST.get("to", ""))
+        except ValueError:
+            return HttpResponseBadRequest("Invalid category.")
+        target = get_object_or_404(Category, owner=request.user, pk=target) if target else None
+        count = bulk.move_quests(request.user, quests, target)
+        messages.success(
+            request,
+            f"Moved {count} quest{pluralize(count)} to {target.name if target else 'no category'}.",
         )
-        .order_by("is_ended", "-updated_at")
-    )
+    else:
+        return HttpResponseBadRequest("Unknown action.")
+    return back
+
+HISTORY_RANGES = ("recent", "week", "all")
+HISTORY_PAGE_SIZE = 50
+RECENT_LIMIT = 20
+
+
+def _history_range(request) -> str:
+    range_key = request.GET.get("range", "recent")
+    return range_key if range_key in HISTORY_RANGES else "recent"
 
-    return render(request, "core/quest_list.html", {"quests": quests})
 
 @login_required
 def quest_detail(request, pk):
+    # Just the shell: rollups and history load as separate fragments, so the
+    # first byte doesn't wait on aggregates or on how long the history is.
     quest = get_object_or_404(
-        Quest.objects.select_related("category"),
+        Quest.objects.for_user(request.user).select_related("category"),
         pk=pk,
     )
+    return render(request, "core/quest_detail.html", {"quest": quest, "range": _history_range(request)})
+
+
+@login_required
+def quest_rollups(request, pk):
+    quest = get_object_or_404(Quest, owner=request.user, pk=pk)
 
-    # --- Rollups (all time) ---
     rollups = quest.logs.aggregate(
         total_sessions=Count("id"),
         total_completed=Count("id", filter=Q(completed=True)),
@@ -76,36 +204,65 @@ def quest_detail(request, pk):
         last_activity=Max("timestamp"),
     )
 
-    total_sessions = rollups["total_sessions"] or 0
-    total_completed = rollups["total_completed"] or 0
-    total_payout = rollups["total_payout"] or 0
-    last_activity = rollups["last_activity"]  # can be None
+    context = {
+        "quest": quest,
+        "total_sessions": rollups["total_sessions"] or 0,
+        "total_completed": rollups["total_completed"] or 0,
+        "total_payout": rollups["total_payout"] or 0,
+        "last_activity": rollups["last_activity"],  # can be None
+        "heatmap": activity.heatmap([quest.id]),
+    }
+    return render(request, "core/partials/_quest_rollups.html", context)
 
-    # --- History range selector ---
-    range_key = request.GET.get("range", "recent")  # recent | week | all
 
-    logs_qs = quest.logs.order_by("-timestamp")
+@login_required
+def quest_history(request, pk):
+    """One page of history rows, newest first, plus a "load more" link."""
+    quest = get_object_or_404(Quest, owner=request.user, pk=pk)
+    range_key = _history_range(request)
 
+    logs_qs = (
+        quest.logs.only("id", "quest_id", "timestamp", "completed", "payout", "notes_preview")
+        .order_by("-timestamp", "-id")
+    )
     if range_key == "week":
-        start = timezone.now() - timedelta(days=7)
-        logs_qs = logs_qs.filter(timestamp__gte=start)
-        logs = logs_qs[:100]
-    elif range_key == "all":
-        logs = logs_qs[:300]  # cap for MVP
+        logs_qs = logs_qs.filter(timestamp__gte=timezone.now() - timedelta(days=7))
+
+    if range_key == "recent":
+        logs, next_cursor = list(logs_qs[:RECENT_LIMIT]), None
     else:
-        range_key = "recent"
-        logs = logs_qs[:20]
+        cursor = request.GET.get("cursor", "")
+        if cursor:
+            position = api.decode_cursor(api.RESOURCES["logs"], cursor)
+            if position is None:
+                return HttpResponseBadRequest("Invalid cursor.")
+            logs_qs = logs_qs.filter(api.keyset_after(api.RESOURCES["logs"], *position))
+
+        logs = list(logs_qs[: HISTORY_PAGE_SIZE + 1])
+        next_cursor = None
+        if len(logs) > HISTORY_PAGE_SIZE:
+            logs = logs[:HISTORY_PAGE_SIZE]
+            next_cursor = api.encode_cursor(logs[-1].timestamp, logs[-1].id)
 
     context = {
         "quest": quest,
-        "total_sessions": total_sessions,
-        "total_completed": total_completed,
-        "total_payout": total_payout,
-        "last_activity": last_activity,
         "range": range_key,
         "logs": logs,
+        "next_cursor": next_cursor,
+        "first_page": not request.GET.get("cursor"),
     }
-    return render(request, "core/quest_detail.html", context)
+    return render(request, "core/partials/_quest_history.html", context)
+
+
+NOTES_MODELS = {"category": Category, "quest": Quest, "logger": Logger}
+
+
+@login_required
+def notes_full(request, kind, pk):
+    """Full notes for a list row whose preview was cut short (htmx "more")."""
+    model = NOTES_MODELS[kind]  # the URL converter only lets these through
+    notes_html = get_object_or_404(model.objects.for_user(request.user).values_list("notes_html", flat=True), pk=pk)
+    return render(request, "core/partials/_notes_full.html", {"notes_html": notes_html})
 
 
 @login_required
@@ -116,34 +273,18 @@ def log_list(request):
 
     qs = (
         Logger.objects
-        .select_related("quest", "quest__category")
+        .for_user(request.user)
+        .matching(completed, date_range, category_id)
+        .listing()
         .order_by("-timestamp")
     )
 
-    # Completed filter
-    if completed == "yes":
-        qs = qs.filter(completed=True)
-    elif completed == "no":
-        qs = qs.filter(completed=False)
-
-    # Date range quick filters
-    if date_range == "today":
-        start = now().date()
-        qs = qs.filter(timestamp__date=start)
-    elif date_range == "7d":
-        start_dt = now() - timedelta(days=7)
-        qs = qs.filter(timestamp__gte=start_dt)
-
-    # Category filter
-    if category_id:
-        qs = qs.filter(quest__category_id=category_id)
-
     # Pagination (recommended)
     paginator = Paginator(qs, 25)  # 25 logs per page
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
-    categories = Category.objects.order_by("name")
+    categories = Category.objects.for_user(request.user).only("id", "name").order_by("name")
 
     context = {
         "page_obj": page_obj,
@@ -157,40 +298,46 @@ def log_list(request):
 @login_required
 def category_list(request):
     categories = (
-        Category.objects
-        .annotate(quest_count=Count("quests"))
+        Category.objects.for_user(request.user)
+        .only("id", "name", "notes_preview", "quest_count", "active_quest_count")
         .order_by("name")
     )
     return render(request, "core/category_list.html", {"categories": categories})
 
 @login_required
 def category_detail(request, pk):
-    category = get_object_or_404(Category, pk=pk)
-
-    quests = (
-        Quest.objects.select_related("category")
-        .filter(category=category)
-        .annotate(
-            is_ended=Case(
-                When(end_date__isnull=True, then=Value(0)),
-                default=Value(1),
-                output_field=IntegerField(),
-            )
-        )
-        .order_by("is_ended", "-updated_at")
+    category = get_object_or_404(Category, owner=request.user, pk=pk)
+
+    filters = {name: request.GET.get(name, "") for name in ("status", "mobility")}
+    quests, next_cursor = _quest_page(
+        request, _filtered_quests(request.user, **filters).filter(category=category)
     )
 
+    # All-time rollups for the category and each of its quests, in one query
+    report = stats.compute(Logger.objects.for_user(request.user).filter(quest__category=category))
+    by_quest = {row.quest_id: row for row in report.quests}
+    for quest in quests:
+        quest.stats = by_quest.get(quest.id)
+
     return render(
         request,
         "core/category_detail.html",
-        {"category": category, "quests": quests},
+        {
+            "category": category,
+            "quests": quests,
+            "next_url": _next_page_url(filters, next_cursor),
+            **filters,
+            "totals": report.overall,
+            # The whole category's activity, not just this page's quests
+            "heatmap": activity.heatmap(Quest.objects.filter(category=category).values("id")),
+        },
     )
 
 @login_required
 def category_list(request):
     categories = (
-        Category.objects
-        .annotate(quest_count=Count("quests"))
+        Category.objects.for_user(request.user)
+        .only("id", "name", "notes_preview", "quest_count", "active_quest_count")
         .order_by("name")
     )
     return render(request, "core/category_list.html", {"categories": categories})
@@ -199,29 +346,29 @@ def category_list(request):
 @login_required
 def category_create(request):
     if request.method == "POST":
-        form = CategoryForm(request.POST)
+        form = CategoryForm(request.POST, owner=request.user)
         if form.is_valid():
             cat = form.save()
             messages.success(request, f"Created category: {cat.name}")
             return redirect("category_list")
     else:
-        form = CategoryForm()
+        form = CategoryForm(owner=request.user)
 
     return render(request, "core/category_form.html", {"form": form, "mode": "create"})
 
 
 @login_required
 def category_edit(request, pk):
-    category = get_object_or_404(Category, pk=pk)
+    category = get_object_or_404(Category, owner=request.user, pk=pk)
 
     if request.method == "POST":
-        form = CategoryForm(request.POST, instance=category)
+        form = CategoryForm(request.POST, instance=category, owner=request.user)
         if form.is_valid():
             cat = form.save()
             messages.success(request, f"Updated category: {cat.name}")
             return redirect("category_list")
     else:
-        form = CategoryForm(instance=category)
+        form = CategoryForm(instance=category, owner=request.user)
 
     return render(
         request,
@@ -232,45 +379,62 @@ def category_edit(request, pk):
 
 @login_required
 def category_delete(request, pk):
-    category = get_object_or_404(
-        Category.objects.annotate(quest_count=Count("quests")),
-        pk=pk
-    )
-
-    if category.quest_count > 0:
-        messages.error(request, "Can't delete a category that still has quests. Reassign those quests first.")
-        return redirect("category_list")
+    category = get_object_or_404(Category, owner=request.user, pk=pk)
 
     if request.method == "POST":
+        if category.quest_count > 0:
+            messages.error(request, "This category still has quests; move them somewhere first.")
+            return redirect("category_delete", pk=category.pk)
         name = category.name
         category.delete()
         messages.success(request, f"Deleted category: {name}")
         return redirect("category_list")
 
-    # tiny confirmation page (optional)
-    return render(request, "core/category_confirm_delete.html", {"category": category})
+    # Confirmation page; with quests left it offers to merge them elsewhere
+    others = Category.objects.for_user(request.user).exclude(pk=category.pk).order_by("name")
+    return render(request, "core/category_confirm_delete.html", {"category": category, "others": others})
+
+
+@login_required
+@require_POST
+def category_merge(request, pk):
+    """Move all of a category's quests into another (or none) and delete it."""
+    source = get_object_or_404(Category, owner=request.user, pk=pk)
+    try:
+        target = _category_id(request.POST.get("into", ""))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid category.")
+    target = get_object_or_404(Category.objects.for_user(request.user).exclude(pk=pk), pk=target) if target else None
+
+    moved = bulk.merge_categories(request.user, source, target)
+    messages.success(
+        request,
+        f"Moved {moved} quest{pluralize(moved)} to {target.name if target else 'no category'} "
+        f"and deleted {source.name}.",
+    )
+    return redirect("category_list")
 
 @login_required
 def quest_create(request):
     if request.method == "POST":
-        form = QuestForm(request.POST)
+        form = QuestForm(request.POST, owner=request.user)
         if form.is_valid():
             quest = form.save()
             return redirect("quest_detail", pk=quest.id)  # ✅ redirect to story page
     else:
-        form = QuestForm()
+        form = QuestForm(owner=request.user)
 
     return render(request, "core/quest_form.html", {"form": form, "mode": "create"})
 
 @login_required
 def quest_edit(request, pk):
-    quest = get_object_or_404(Quest, pk=pk)
+    quest = get_object_or_404(Quest, owner=request.user, pk=pk)
 
     is_ended = quest.end_date is not None
     allow_notes_only = is_ended  # lock history if ended
 
     if request.method == "POST":
-        form = QuestForm(request.POST, instance=quest, allow_notes_only=allow_notes_only)
+        form = QuestForm(request.POST, instance=quest, allow_notes_only=allow_notes_only, owner=request.user)
         if form.is_valid():
             updated = form.save(commit=False)
 
@@ -286,7 +450,7 @@ def quest_edit(request, pk):
             messages.success(request, "Quest updated.")
             return redirect("quest_detail", pk=quest.id)
     else:
-        form = QuestForm(instance=quest, allow_notes_only=allow_notes_only)
+        form = QuestForm(instance=quest, allow_notes_only=allow_notes_only, owner=request.user)
 
     lock_reason = None
     if is_ended:
@@ -304,14 +468,14 @@ def quest_edit(request, pk):
         },
     )
 
-@login_required
-def _active_quest_queryset(mode: str):
+def _active_quest_queryset(request, mode: str):
+    """Active quests for the picker cards: slim columns plus the latest log's time and payout."""
     last_ts = Logger.objects.filter(quest=OuterRef("pk")).order_by("-timestamp").values("timestamp")[:1]
     last_payout = Logger.objects.filter(quest=OuterRef("pk")).order_by("-timestamp").values("payout")[:1]
 
     qs = (
-        Quest.objects.active()
-        .select_related("category")
+        Quest.objects.for_user(request.user).active()
+        .listing()
         .annotate(last_logged=Subquery(last_ts), last_payout=Subquery(last_payout))
     )
 
@@ -320,63 +484,150 @@ def _active_quest_queryset(mode: str):
 
     return qs
 
-@login_required
-def active_quests_page(request):
-    mode = request.GET.get("mode", "normal").lower()
-    qs = _active_quest_queryset(mode)
-    total_count = qs.count()
-    quests = qs.order_by("-updated_at")[:3]
-    return render(request, "core/active_quests.html", {"mode": mode, "quests": quests, "total_count": total_count})
 
-@login_required
-def active_quests_partial(request):
-    mode = request.GET.get("mode", "normal").lower()
-    qs = _active_quest_queryset(mode)
-    total_count = qs.count()
-    quests = qs.order_by("-updated_at")[:3]
-    return render(request, "core/partials/_active_quest_cards.html", {"mode": mode, "quests": quests, "total_count": total_count})
+def _idempotency_key(request) -> str:
+    """The client's key for a start request: Idempotency-Key header, or a `key` parameter."""
+    return (request.headers.get("Idempotency-Key") or request.POST.get("key") or request.GET.get("key", "")).strip()
+
 
 @login_required
 def logger_start(request, quest_id):
-    quest = get_object_or_404(Quest, pk=quest_id)
+    quest = get_object_or_404(Quest, owner=request.user, pk=quest_id)
 
     if quest.end_date is not None:
         messages.error(request, "This quest has ended, so you can’t start a new log for it.")
         return redirect("quest_detail", pk=quest.id)
 
-    log = Logger.objects.create(quest=quest)
+    try:
+        log, _ = Logger.objects.start(quest, _idempotency_key(request))
+    except InvalidIdempotencyKey as exc:
+        return HttpResponseBadRequest(str(exc))
+    except IdempotencyKeyConflict as exc:
+        return HttpResponse(str(exc), status=409)
     return redirect("logger_detail", pk=log.id)
 
 
 @login_required
 def logger_detail(request, pk):
     log = get_object_or_404(
-        Logger.objects.select_related("quest", "quest__category"),
+        Logger.objects.for_user(request.user).select_related("quest", "quest__category"),
         pk=pk
     )
 
+    status = 200
     if request.method == "POST":
-        form = LoggerForm(request.POST, instance=log)
+        form = LoggerForm(request.POST, instance=log, autosave=True)
+        version = request.POST.get("version", "")
+        version = int(version) if version.isdigit() else log.version
         if form.is_valid():
-            form.save()
-            messages.success(request, "Saved")
+            # Only the fields that differ from the row as loaded, and only
+            # if nobody else saved since this page was rendered
+            if not form.changed_data or log.save_if_current(version, form.changed_data):
+                messages.success(request, "Saved")
+
+                # Decide where to go based on which button was clicked
+                if "save_back_today" in request.POST:
+                    return redirect("today")
 
-            # Decide where to go based on which button was clicked
-            if "save_back_today" in request.POST:
-                return redirect("today")
+                if "start_another" in request.POST:
+                    return redirect("today")
 
-            if "start_another" in request.POST:
-                return redirect("today")
+                return redirect("logger_detail", pk=log.id)  # PRG: stay
 
-            return redirect("logger_detail", pk=log.id)  # PRG: stay
+            form.add_error(
+                None,
+                "This log was changed in another tab since you opened it. "
+                "Your edits are below; save again to keep them.",
+            )
+            status = 409
     else:
-        form = LoggerForm(instance=log)
+        form = LoggerForm(instance=log, autosave=True)
+
+    return render(
+        request,
+        "core/logger_detail.html",
+        {"log": log, "form": form, "odds": _payout_odds(log.quest)},
+        status=status,
+    )
+
+
+AUTOSAVE_FIELDS = ("completed", "payout", "notes")
 
-    return render(request, "core/logger_detail.html", {"log": log, "form": form})
+
+@login_required
+@require_POST
+def logger_autosave(request, pk):
+    """
+    Save one field of a log as it's edited (debounced client-side).
+
+    The editor posts the new value, the value it last loaded (`base_<field>`)
+    and the log's `version`. Unchanged values aren't written. A stale version
+    is only a conflict if this field itself changed since the editor loaded
+    it; then the response is a 409 merge prompt instead of an overwrite.
+    """
+    log = get_object_or_404(Logger.objects.for_user(request.user), pk=pk)
+    name = request.POST.get("field")
+    if name not in AUTOSAVE_FIELDS:
+        return HttpResponseBadRequest("Unknown field.")
+
+    field = LoggerForm.base_fields[name]
+    try:
+        value = field.clean(request.POST.get(name))
+        base = field.clean(request.POST.get(f"base_{name}"))
+    except ValidationError as exc:
+        return render(
+            request,
+            "core/partials/_logger_autosave.html",
+            {"log": log, "error": " ".join(exc.messages)},
+            status=400,
+        )
+    version = request.POST.get("version", "")
+    version = int(version) if version.isdigit() else None
+    in_sync = version == log.version
+
+    current = getattr(log, name)
+    if value != current:
+        if not in_sync and base != current:
+            return _autosave_conflict(request, log, name, value)
+        setattr(log, name, value)
+        if not log.save_if_current(log.version, [name]):
+            # Lost a race with a save that landed after our read
+            log = Logger.objects.get(pk=log.pk)
+            return _autosave_conflict(request, log, name, value)
+
+    return render(request, "core/partials/_logger_autosave.html", {
+        "log": log,
+        "field": name,
+        "base": value,
+        # The editor's version only moves forward if it had seen every field
+        # at the old one; otherwise other fields still need checking
+        "version": log.version if in_sync else None,
+        "saved_at": timezone.now(),
+    })
+
+
+def _autosave_conflict(request, log, name, mine):
+    keep = {
+        "field": name,
+        name: "on" if mine is True else ("" if mine in (None, False) else str(mine)),
+        f"base_{name}": "" if getattr(log, name) is None else str(getattr(log, name)),
+    }
+    return render(
+        request,
+        "core/partials/_logger_autosave_conflict.html",
+        {
+            "log": log,
+            "label": LoggerForm.base_fields[name].label or name.capitalize(),
+            "mine": mine,
+            "theirs": getattr(log, name),
+            "keep_vals": json.dumps(keep),
+        },
+        status=409,
+    )
 
 @login_required
 def logger_start_htmx(request, quest_id):
-    quest = get_object_or_404(Quest.objects.select_related("category"), pk=quest_id)
+    quest = get_object_or_404(Quest.objects.for_user(request.user).select_related("category"), pk=quest_id)
 
     if quest.end_date is not None:
         return render(
@@ -386,7 +637,15 @@ def logger_start_htmx(request, quest_id):
             status=400,
         )
 
-    log = Logger.objects.create(quest=quest)
+    try:
+        log, _ = Logger.objects.start(quest, _idempotency_key(request))
+    except (InvalidIdempotencyKey, IdempotencyKeyConflict) as exc:
+        return render(
+            request,
+            "core/partials/_active_quest_start_error_card.html",
+            {"quest": quest, "error": str(exc)},
+            status=409 if isinstance(exc, IdempotencyKeyConflict) else 400,
+        )
     return render(
         request,
         "core/partials/_active_quest_started_card.html",
@@ -396,10 +655,7 @@ def logger_start_htmx(request, quest_id):
 @login_required
 def active_quests_page(request):
     mode = request.GET.get("mode", "normal").lower()
-
-    qs = Quest.objects.active().select_related("category")
-    if mode == "limited":
-        qs = qs.by_mobility(True)
+    qs = _active_quest_queryset(request, mode)
 
     total_count = qs.count()
     quests = qs.order_by("-updated_at")[:3]
@@ -414,10 +670,7 @@ def active_quests_page(request):
 @login_required
 def active_quests_partial(request):
     mode = request.GET.get("mode", "normal").lower()
-
-    qs = Quest.objects.active().select_related("category")
-    if mode == "limited":
-        qs = qs.by_mobility(True)
+    qs = _active_quest_queryset(request, mode)
 
     total_count = qs.count()
     quests = qs.order_by("-updated_at")[:3]
@@ -431,7 +684,7 @@ def active_quests_partial(request):
 @login_required
 @require_POST
 def logger_finish(request, pk):
-    log = get_object_or_404(Logger, pk=pk)
+    log = get_object_or_404(Logger, owner=request.user, pk=pk)
     if not log.completed:
         log.completed = True
         log.save(update_fields=["completed"])
@@ -442,7 +695,7 @@ def logger_finish(request, pk):
 @login_required
 @require_POST
 def logger_toggle_completed(request, pk):
-    log = get_object_or_404(Logger, pk=pk)
+    log = get_object_or_404(Logger, owner=request.user, pk=pk)
     log.completed = not log.completed
     log.save(update_fields=["completed"])
     return render(request, "core/partials/_logger_status_row.html", {"log": log})
@@ -450,7 +703,7 @@ def logger_toggle_completed(request, pk):
 @login_required
 @require_POST
 def logger_update_payout(request, pk):
-    log = get_object_or_404(Logger, pk=pk)
+    log = get_object_or_404(Logger, owner=request.user, pk=pk)
 
     raw = request.POST.get("payout", "").strip()
     if raw == "":
@@ -467,17 +720,25 @@ def logger_update_payout(request, pk):
     log.save(update_fields=["payout"])
     return render(request, "core/partials/_logger_payout_field.html", {"log": log})
 
+def _payout_odds(quest) -> dict | None:
+    """Expected value and spread of the quest's payout roll (memoized per formula)."""
+    try:
+        return dice.compile(quest.effective_payout_formula).summary()
+    except dice.DiceError:
+        return None
+
+
 @login_required
 @require_POST
 def logger_roll_payout(request, pk):
     log = get_object_or_404(
-        Logger.objects.select_related("quest", "quest__category"),
+        Logger.objects.for_user(request.user).select_related("quest", "quest__category"),
         pk=pk
     )
 
     # Guardrail: don't overwrite existing payout unless confirmed
     if log.payout is not None and request.POST.get("confirm") != "1":
-        form = LoggerForm(instance=log)
+        form = LoggerForm(instance=log, autosave=True)
         return render(
             request,
             "core/partials/_logger_payout_block.html",
@@ -486,18 +747,22 @@ def logger_roll_payout(request, pk):
                 "form": form,
                 "needs_confirm": True,
                 "confirm_message": "Replace existing payout with a roll?",
+                "odds": _payout_odds(log.quest),
             },
             status=409,
         )
 
-    result = roll_exploding_d10()
-    total = int(result["total"])
-    rolls = result["rolls"]
+    formula = log.quest.effective_payout_formula
+    try:
+        plan = dice.compile(formula)
+    except dice.DiceError:  # saved before validation existed; fall back
+        formula, plan = dice.DEFAULT_FORMULA, dice.compile(dice.DEFAULT_FORMULA)
+    total, rolls = plan.roll()
 
     log.payout = total
 
     # Optional: append roll line to notes (safe, non-destructive)
-    roll_line = f"Roll: {'+'.join(str(r) for r in rolls)} = {total}"
+    roll_line = f"Roll {formula}: [{', '.join(str(r) for r in rolls)}] = {total}"
     if log.notes:
         log.notes = log.notes.rstrip() + "\n" + roll_line
     else:
@@ -505,7 +770,7 @@ def logger_roll_payout(request, pk):
 
     log.save(update_fields=["payout", "notes"])
 
-    form = LoggerForm(instance=log)
+    form = LoggerForm(instance=log, autosave=True)
     return render(
         request,
         "core/partials/_logger_payout_block.html",
@@ -515,6 +780,7 @@ def logger_roll_payout(request, pk):
             "needs_confirm": False,
             "rolls": rolls,
             "total": total,
+            "odds": _payout_odds(log.quest),
         },
     )
 
@@ -525,7 +791,7 @@ def today_page(request):
     shuffle = request.GET.get("shuffle") == "1"
 
     # Active quests
-    qs = Quest.objects.active().select_related("category")
+    qs = Quest.objects.for_user(request.user).active().listing()
     if limited_only:
         qs = qs.filter(limited_mobility=True)
 
@@ -563,7 +829,8 @@ def today_page(request):
 
     today_logs_qs = (
         Logger.objects
-        .select_related("quest", "quest__category")
+        .for_user(request.user)
+        .listing()
         .filter(timestamp__gte=today_start, timestamp__lt=tomorrow_start)
         .order_by("-timestamp")
     )
@@ -586,114 +853,94 @@ def today_page(request):
     return render(request, "core/today.html", context)
 
 
-@login_required
-def stats_page(request):
-    now = timezone.now()
-    start = now - timedelta(days=7)
-
-    logs = (
-        Logger.objects
-        .select_related("quest", "quest__category")
-        .filter(timestamp__gte=start, timestamp__lte=now)
-    )
-
-    # Overall stats (last 7 days)
-    overall = logs.aggregate(
-        total_sessions=Count("id"),
-        completed_sessions=Count("id", filter=Q(completed=True)),
-        total_payout=Sum("payout"),
-        avg_payout=Avg("payout"),
-    )
-
-    total_sessions = overall["total_sessions"] or 0
-    completed_sessions = overall["completed_sessions"] or 0
-    total_payout = overall["total_payout"] or 0
-    avg_payout = overall["avg_payout"] or 0
-
-    completion_rate = (completed_sessions / total_sessions) if total_sessions else 0
-
-    # Top 5 quests by payout (last 7 days)
-    top_quests_by_payout = (
-        logs.values("quest__id", "quest__title", "quest__category__name")
-        .annotate(
-            payout=Sum("payout"),
-            sessions=Count("id"),
-            completed=Count("id", filter=Q(completed=True)),
-        )
-        .order_by("-payout", "-sessions")[:5]
-    )
-
-    # Top 5 quests by session count (last 7 days)
-    top_quests_by_sessions = (
-        logs.values("quest__id", "quest__title", "quest__category__name")
-        .annotate(
-            sessions=Count("id"),
-            payout=Sum("payout"),
-            completed=Count("id", filter=Q(completed=True)),
-        )
-        .order_by("-sessions", "-payout")[:5]
-    )
+def _queue_stats_refresh(user, window):
+    """Queue a `refresh_stats` job unless one for the same window is pending."""
+    kwargs = {"user_id": user.pk, "range": window}
+    pending = Job.objects.filter(
+        name=tasks.refresh_stats.task_name,
+        status__in=[Job.Status.QUEUED, Job.Status.RUNNING],
+    ).values_list("kwargs", flat=True)
+    if kwargs not in pending:
+        jobs.enqueue(tasks.refresh_stats, **kwargs)
 
-    # Optional: by category (last 7 days)
-    by_category = (
-        logs.values("quest__category__id", "quest__category__name")
-        .annotate(
-            sessions=Count("id"),
-            completed=Count("id", filter=Q(completed=True)),
-            payout=Sum("payout"),
-        )
-        .order_by("-payout", "-sessions")
-    )
 
+@login_required
+def stats_page(request):
+    window = request.GET.get("range", "7d")
+    if window not in stats.RANGES:
+        window = "7d"
     context = {
-        "start": start,
-        "end": now,
-        "total_sessions": total_sessions,
-        "completed_sessions": completed_sessions,
-        "total_payout": total_payout,
-        "avg_payout": avg_payout,
-        "completion_rate": completion_rate,
-        "top_quests_by_payout": top_quests_by_payout,
-        "top_quests_by_sessions": top_quests_by_sessions,
-        "by_category": by_category,
+        "range": window,
+        "range_label": stats.RANGES[window][0],
+        "ranges": [(key, label) for key, (label, _) in stats.RANGES.items()],
     }
+
+    if window in stats.QUEUED_RANGES:
+        # Long windows are kept fresh by the worker; a stale snapshot is still
+        # shown while the next one is computed. The first visit computes it
+        # here (month chunks in parallel), so the page works without a worker.
+        snapshot = StatsSnapshot.objects.filter(owner=request.user, range=window).first()
+        if snapshot is None:
+            snapshot = stats.refresh(request.user, window)
+        elif snapshot.computed_at < timezone.now() - timedelta(seconds=settings.STATS_SNAPSHOT_MAX_AGE):
+            _queue_stats_refresh(request.user, window)
+        report = stats.from_snapshot(snapshot)
+        context.update(start=snapshot.start, end=snapshot.computed_at, computed_at=snapshot.computed_at)
+    else:
+        now = timezone.now()
+        start = stats.window_start(request.user, window, now)
+        # One pass over the window feeds every table on the page
+        report = stats.for_window(request.user, start, now)
+        context.update(start=start, end=now)
+
+    overall = report.overall
+    context.update({
+        "total_sessions": overall.sessions,
+        "completed_sessions": overall.completed,
+        "total_payout": overall.payout or 0,
+        "avg_payout": overall.avg_payout or 0,
+        "completion_rate": overall.completion_rate,
+        "top_quests_by_payout": report.top_quests(by="payout"),
+        "top_quests_by_sessions": report.top_quests(by="sessions"),
+        "by_category": report.categories,
+    })
     return render(request, "core/stats.html", context)
 
 @login_required
 def quest_delete_confirm(request, pk):
-    quest = get_object_or_404(Quest, pk=pk)
+    quest = get_object_or_404(Quest, owner=request.user, pk=pk)
     return render(request, "core/quest_confirm_delete.html", {"quest": quest})
 
 @login_required
 @require_POST
 def quest_delete(request, pk):
-    quest = get_object_or_404(Quest, pk=pk)
+    quest = get_object_or_404(Quest, owner=request.user, pk=pk)
     quest.delete()
     return redirect("quest_list")
 
 @login_required
 def logger_delete_confirm(request, pk):
-    log = get_object_or_404(Logger, pk=pk)
+    log = get_object_or_404(Logger, owner=request.user, pk=pk)
     return render(request, "core/logger_confirm_delete.html", {"log": log})
 
 @login_required
 @require_POST
 def logger_delete(request, pk):
-    log = get_object_or_404(Logger, pk=pk)
+    log = get_object_or_404(Logger, owner=request.user, pk=pk)
     log.delete()
     return redirect("log_list")
 
 @login_required
 @require_POST
 def quest_delete(request, pk):
-    quest = get_object_or_404(Quest, pk=pk)
+    quest = get_object_or_404(Quest, owner=request.user, pk=pk)
     quest.delete()
     return redirect("quest_list")
 
 
 @login_required
 def logger_edit(request, pk):
-    log = get_object_or_404(Logger, pk=pk)
+    log = get_object_or_404(Logger, owner=request.user, pk=pk)
 
     if request.method == "POST":
         form = LoggerForm(request.POST, instance=log)
@@ -709,7 +956,7 @@ def logger_edit(request, pk):
 @login_required
 @require_POST
 def logger_delete(request, pk):
-    log = get_object_or_404(Logger, pk=pk)
+    log = get_object_or_404(Logger, owner=request.user, pk=pk)
     quest_id = log.quest_id  # your FK is named quest, so this works
     log.delete()
     return redirect("quest_detail", pk=quest_id)
@@ -0,0 +1,94 @@
+"""
+Gunicorn settings for `gunicorn questlog.wsgi` (picked up from the working
+directory automatically).
+
+The app is imported once in the master (`preload_app`), which then compiles
+every project template and builds the URL resolver before forking, so
+workers start with those caches already in memory. DB connections are never
+shared across the fork: the master closes its own before forking and each
+worker opens a fresh one in `post_fork`.
+"""
+import os
+import time
+
+_boot_started = time.monotonic()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+preload_app = True
+
+# Recycle workers now and then, staggered so they don't all restart at once
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+
+def _warm_templates() -> int:
+    from django.template.loader import get_template
+
+    from core.checks import template_dirs
+
+    count = 0
+    for base in template_dirs():
+        for path in base.rglob("*.html"):
+            get_template(path.relative_to(base).as_posix())
+            count += 1
+    return count
+
+
+def _warm_urls() -> int:
+    from django.urls import get_resolver
+
+    return len(get_resolver().reverse_dict)  # populates the resolver
+
+
+def on_starting(server):
+    # Per-worker metrics files from a previous run would be summed into
+    # this one's; remove them (only those: METRICS_DIR may be shared).
+    from core import metrics
+
+    metrics.clear()
+
+
+def when_ready(server):
+    from django.db import connections
+
+    started = time.monotonic()
+    templates = _warm_templates()
+    routes = _warm_urls()
+    connections.close_all()
+
+    server.log.info(
+        "Warm-up: %d templates, %d url names in %.0f ms; master ready %.2f s after boot",
+        templates,
+        routes,
+        (time.monotonic() - started) * 1000,
+        time.monotonic() - _boot_started,
+    )
+
+
+def pre_fork(server, worker):
+    from django.db import connections
+
+    connections.close_all()
+    worker.forked_at = time.monotonic()
+
+
+def post_fork(server, worker):
+    from django.db import DatabaseError, connection, connections
+
+    connections.close_all()
+    # Persistent connections (CONN_MAX_AGE != 0) can be opened now instead of
+    # on the first request; with CONN_MAX_AGE=0 Django would just close it.
+    if connection.settings_dict.get("CONN_MAX_AGE"):
+        try:
+            connection.ensure_connection()
+        except DatabaseError:
+            server.log.warning("Worker %s could not pre-connect to the database", worker.pid)
+
+
+def post_worker_init(worker):
+    worker.log.info(
+        "Worker %s ready %.0f ms after fork",
+        worker.pid,
+        (time.monotonic() - worker.forked_at) * 1000,
+    )
@@ -6,6 +6,7 @@ Generated by 'django-admin startproject' using Django 6.0.1.
 
 from pathlib import Path
 import os
+import tempfile
 from urllib.parse import urlparse
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -71,10 +72,12 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # Static files in production
+    "core.metrics.MetricsMiddleware",  # after WhiteNoise: static hits aren't views
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.profiling.ProfilingMiddleware",  # needs request.user
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -127,6 +130,9 @@ else:
             "NAME": BASE_DIR / "db.sqlite3",
         }
     }
+    if env_bool("SQLITE_WAL", True):
+        # Readers (e.g. the parallel stats chunks) don't wait on a writer
+        DATABASES["default"]["OPTIONS"] = {"init_command": "PRAGMA journal_mode=WAL;"}
 
 
 # --- Password validation ---
@@ -148,9 +154,22 @@ USE_TZ = True
 # --- Static files ---
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
-
-# Whitenoise storage: hashed filenames for long-term caching
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+STATICFILES_DIRS = [BASE_DIR / "static"]  # vendored htmx + app CSS/JS
+
+# Whitenoise storage: hashed filenames for long-term caching, gzip + brotli
+# copies written at collectstatic time, and "immutable" cache headers on the
+# hashed names. Dev (DEBUG) serves the plain files so no collectstatic run
+# is needed.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "whitenoise.storage.CompressedManifestStaticFilesStorage"
+        ),
+    },
+}
 
 
 # --- Minimal logging (console) ---
@@ -161,6 +180,47 @@ LOGGING = {
     "root": {"handlers": ["console"], "level": "INFO" if DEBUG else "WARNING"},
 }
 
+# --- Profiling (core/profiling.py) ---
+# Staff can always add ?__profile=1; this is the fraction of *all* requests
+# profiled in the background (0 = off).
+PROFILING_DIR = Path(os.getenv("PROFILING_DIR", BASE_DIR / "profiles"))
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_KEEP = int(os.getenv("PROFILING_KEEP", "200"))
+
+# --- Metrics (core/metrics.py) ---
+# Every worker writes its samples here; /metrics sums them. Must be shared by
+# all workers of one server and not by different servers.
+METRICS_DIR = Path(os.getenv("METRICS_DIR", Path(tempfile.gettempdir()) / "questlog-metrics"))
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")  # scrapers send "Authorization: Bearer <token>"
+
+# /metrics is open without a token; only acceptable on a dev box
+if not DEBUG and not METRICS_TOKEN:
+    raise RuntimeError("METRICS_TOKEN is required in production")
+
+# --- Stats (core/stats.py) ---
+# On SQLite, windows of at least STATS_PARALLEL_MIN_DAYS are aggregated one
+# month per thread on up to STATS_WORKERS threads (1 = never split).
+STATS_WORKERS = int(os.getenv("STATS_WORKERS", str(min(os.cpu_count() or 1, 8))))
+STATS_PARALLEL_MIN_DAYS = int(os.getenv("STATS_PARALLEL_MIN_DAYS", "62"))
+# The "year" and "all" ranges are stored: computed inline on the first visit,
+# then refreshed by `run_worker` once a stored result is older than this many
+# seconds when the page is viewed.
+STATS_SNAPSHOT_MAX_AGE = int(os.getenv("STATS_SNAPSHOT_MAX_AGE", "300"))
+
+# --- Log starts (Logger.objects.start) ---
+# A start within this many seconds of an open log of the same quest returns
+# that log instead of a new one (double taps, resubmits); 0 disables.
+LOG_START_REUSE_SECONDS = int(os.getenv("LOG_START_REUSE_SECONDS", "30"))
+
+# --- Ingestion (core/ingest.py) ---
+# Events posted to /api/ingest are written in one transaction per batch:
+# flushed INGEST_FLUSH_MS after the first queued event, or as soon as
+# INGEST_MAX_BATCH are waiting. 0 ms writes each request on its own.
+INGEST_FLUSH_MS = int(os.getenv("INGEST_FLUSH_MS", "20"))
+INGEST_MAX_BATCH = int(os.getenv("INGEST_MAX_BATCH", "500"))
+INGEST_ACK_TIMEOUT = float(os.getenv("INGEST_ACK_TIMEOUT", "10"))  # seconds a request waits for its commit
+
 LOGIN_URL = "/accounts/login/"
 LOGIN_REDIRECT_URL = "/today/"
 LOGOUT_REDIRECT_URL = "/accounts/login/"
@@ -0,0 +1,14 @@
+// Autocomplete list filters (core.admin.AutocompleteFilter): reload the
+// changelist with the picked value, keeping the other query parameters.
+window.addEventListener('load', () => {
+  django.jQuery(document).on('change', '.autocomplete-filter select', function () {
+    const params = new URLSearchParams(window.location.search);
+    params.delete('p');
+    if (this.value) {
+      params.set(this.name, this.value);
+    } else {
+      params.delete(this.name);
+    }
+    window.location.search = params.toString();
+  });
+});
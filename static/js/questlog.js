@@ -0,0 +1,27 @@
+// Send Django CSRF token with all HTMX requests (needed for hx-post)
+document.addEventListener('htmx:configRequest', (event) => {
+  const token = document.querySelector('meta[name="csrf-token"]')?.getAttribute('content');
+  if (token) event.detail.headers['X-CSRFToken'] = token;
+});
+
+// Requests from [data-idempotent] elements carry an Idempotency-Key, fixed
+// per element, so a retry or double tap is recognised server-side instead
+// of repeating the write. A re-rendered element gets a fresh key.
+document.addEventListener('htmx:configRequest', (event) => {
+  const elt = event.detail.elt;
+  if (!elt.hasAttribute('data-idempotent')) return;
+  if (!elt.dataset.idempotencyKey) {
+    elt.dataset.idempotencyKey = window.crypto?.randomUUID?.()
+      ?? `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+  }
+  event.detail.headers['Idempotency-Key'] = elt.dataset.idempotencyKey;
+});
+
+// 400 and 409 responses carry fragments meant to be shown (inline errors,
+// confirm and merge prompts); htmx skips swapping error statuses by default.
+document.addEventListener('htmx:beforeSwap', (event) => {
+  if ([400, 409].includes(event.detail.xhr.status)) {
+    event.detail.shouldSwap = true;
+    event.detail.isError = false;
+  }
+});
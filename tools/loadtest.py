@@ -0,0 +1,343 @@
+"""
+Load generator for the HTMX workflow (stdlib only: asyncio streams, no Django).
+
+Each virtual user logs in, then loops over the flow a person runs from the
+Active/Today pages:
+
+    GET  /today/
+    GET  /active/partial/?mode=normal        (pick a quest)
+    POST /logger/start-htmx/<quest>/         (start a log)
+    POST /logger/<log>/toggle-completed/
+    POST /logger/<log>/roll_payout/
+    GET  /stats/
+
+Examples:
+
+    python tools/loadtest.py --user demo --password pw --users 16 --duration 30
+    python tools/loadtest.py --user "load{n}" --password pw --ramp 1,2,4,8,16,32,64
+
+With `{n}` in --user every virtual user logs in as its own account
+(load0, load1, ...), which is closer to real traffic than everybody hammering
+the same rows; the accounts need at least one active quest each. --ramp runs
+one stage per concurrency level and reports the highest level that still
+meets --slo-ms (p95) with under 1% errors.
+"""
+import argparse
+import asyncio
+import random
+import re
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+START_URL_RE = re.compile(r"/logger/start-htmx/([0-9a-f-]{36})/")
+LOG_URL_RE = re.compile(r"/logger/([0-9a-f-]{36})/")
+CSRF_INPUT_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class HttpError(Exception):
+    pass
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict
+    body: bytes
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8", "replace")
+
+
+class Client:
+    """One keep-alive HTTP/1.1 connection with a cookie jar (a browser tab, roughly)."""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        if parts.scheme != "http":
+            raise SystemExit("Only plain http:// targets are supported.")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.cookies: dict[str, str] = {}
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, data: dict | None = None, headers: dict | None = None) -> Response:
+        try:
+            return await asyncio.wait_for(self._request(method, path, data, headers or {}), self.timeout)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as exc:
+            await self.close()
+            raise HttpError(type(exc).__name__) from exc
+
+    async def _request(self, method, path, data, headers) -> Response:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        body = urlencode(data).encode() if data is not None else b""
+        lines = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Connection: keep-alive",
+            "Accept-Encoding: identity",
+        ]
+        if self.cookies:
+            lines.append("Cookie: " + "; ".join(f"{k}={v}" for k, v in self.cookies.items()))
+        if data is not None:
+            lines.append("Content-Type: application/x-www-form-urlencoded")
+        if body or method != "GET":
+            lines.append(f"Content-Length: {len(body)}")
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise asyncio.IncompleteReadError(b"", None)
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if name == "set-cookie":
+                for key, morsel in SimpleCookie(value).items():
+                    self.cookies[key] = morsel.value
+            response_headers[name] = value
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            payload = bytearray()
+            while size := int((await self.reader.readline()).split(b";")[0], 16):
+                payload += await self.reader.readexactly(size)
+                await self.reader.readline()
+            await self.reader.readline()
+            payload = bytes(payload)
+        elif "content-length" in response_headers:
+            payload = await self.reader.readexactly(int(response_headers["content-length"]))
+        else:
+            payload = await self.reader.read()
+            await self.close()
+
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return Response(status, response_headers, payload)
+
+    def htmx_headers(self) -> dict:
+        return {"HX-Request": "true", "X-CSRFToken": self.cookies.get("csrftoken", "")}
+
+
+@dataclass
+class Stats:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Counter = field(default_factory=Counter)
+    flows: int = 0
+
+    def record(self, step: str, seconds: float):
+        self.latencies[step].append(seconds * 1000)
+
+    @property
+    def requests(self) -> int:
+        return sum(len(v) for v in self.latencies.values())
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class RateLimiter:
+    """Global cap on request starts per second (None = unlimited)."""
+
+    def __init__(self, rate: float | None):
+        self.interval = 1 / rate if rate else 0
+        self.next_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self.lock:
+            now = time.monotonic()
+            self.next_at = max(self.next_at + self.interval, now)
+            delay = self.next_at - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def classify(response: Response) -> str | None:
+    if response.status < 400 or response.status == 409:  # 409: payout confirm guard
+        return None
+    if b"database is locked" in response.body:
+        return "sqlite: database is locked"
+    return f"HTTP {response.status}"
+
+
+async def step(client, stats, limiter, name, method, path, **kwargs) -> Response | None:
+    await limiter.wait()
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, path, **kwargs)
+    except HttpError as exc:
+        stats.errors[f"{name}: {exc}"] += 1
+        return None
+    stats.record(name, time.perf_counter() - started)
+    error = classify(response)
+    if error:
+        stats.errors[f"{name}: {error}"] += 1
+        return None
+    return response
+
+
+async def login(client: Client, username: str, password: str) -> bool:
+    page = await client.request("GET", "/accounts/login/")
+    match = CSRF_INPUT_RE.search(page.text)
+    if not match:
+        return False
+    response = await client.request(
+        "POST",
+        "/accounts/login/",
+        data={"username": username, "password": password, "csrfmiddlewaretoken": match.group(1)},
+    )
+    return response.status in (301, 302, 303) and "sessionid" in client.cookies
+
+
+async def virtual_user(n: int, args, stats: Stats, limiter: RateLimiter, deadline: float):
+    client = Client(args.url, args.timeout)
+    username = args.user.format(n=n)
+    try:
+        if not await login(client, username, args.password):
+            stats.errors[f"login failed ({username})"] += 1
+            return
+
+        async def think():
+            if args.think_ms:
+                await asyncio.sleep(random.uniform(0.5, 1.5) * args.think_ms / 1000)
+
+        while time.monotonic() < deadline:
+            htmx = client.htmx_headers()
+            await step(client, stats, limiter, "today", "GET", "/today/")
+            await think()
+
+            cards = await step(client, stats, limiter, "active", "GET", "/active/partial/?mode=normal", headers=htmx)
+            quest_ids = START_URL_RE.findall(cards.text) if cards else []
+            if not quest_ids:
+                stats.errors["no active quest to start"] += 1
+                await asyncio.sleep(1)
+                continue
+            await think()
+
+            started = await step(
+                client, stats, limiter, "start", "POST",
+                f"/logger/start-htmx/{random.choice(quest_ids)}/", data={}, headers=htmx,
+            )
+            log_ids = LOG_URL_RE.findall(started.text) if started else []
+            if log_ids:
+                log_id = log_ids[0]
+                await think()
+                await step(client, stats, limiter, "toggle", "POST",
+                           f"/logger/{log_id}/toggle-completed/", data={}, headers=htmx)
+                await think()
+                await step(client, stats, limiter, "roll", "POST",
+                           f"/logger/{log_id}/roll_payout/", data={}, headers=htmx)
+            await think()
+
+            await step(client, stats, limiter, "stats", "GET", "/stats/")
+            stats.flows += 1
+            await think()
+    finally:
+        await client.close()
+
+
+async def run_stage(args, users: int) -> tuple[Stats, float]:
+    stats = Stats()
+    limiter = RateLimiter(args.rate)
+    started = time.monotonic()
+    deadline = started + args.duration
+    tasks = []
+    for n in range(users):
+        tasks.append(asyncio.create_task(virtual_user(n, args, stats, limiter, deadline)))
+        if args.spawn_ms:
+            await asyncio.sleep(args.spawn_ms / 1000)
+    await asyncio.gather(*tasks)
+    return stats, time.monotonic() - started
+
+
+def report(stats: Stats, elapsed: float, users: int):
+    print(f"\n== {users} concurrent user(s), {elapsed:.1f} s ==")
+    print(f"{'step':<8}{'count':>8}{'p50 ms':>10}{'p90 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    every = []
+    for name, values in stats.latencies.items():
+        every += values
+        print(f"{name:<8}{len(values):>8}" + "".join(
+            f"{percentile(values, p):>10.1f}" for p in (50, 90, 95, 99)
+        ) + f"{max(values):>10.1f}")
+    if every:
+        print(f"{'all':<8}{len(every):>8}" + "".join(
+            f"{percentile(every, p):>10.1f}" for p in (50, 90, 95, 99)
+        ) + f"{max(every):>10.1f}")
+    total = stats.requests + stats.error_count
+    print(f"throughput: {stats.requests / elapsed:.1f} req/s, {stats.flows / elapsed:.2f} flows/s"
+          f" · mean {statistics.fmean(every) if every else 0:.1f} ms")
+    print(f"errors: {stats.error_count} of {total} ({100 * stats.error_count / max(total, 1):.2f}%)")
+    for message, count in stats.errors.most_common():
+        print(f"  {count:>6}  {message}")
+
+
+def healthy(stats: Stats, slo_ms: float) -> bool:
+    every = [v for values in stats.latencies.values() for v in values]
+    total = stats.requests + stats.error_count
+    return bool(every) and percentile(every, 95) <= slo_ms and stats.error_count / max(total, 1) < 0.01
+
+
+async def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--user", required=True, help='Username; "{n}" is replaced by the virtual user number.')
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--users", type=int, default=8, help="Concurrent virtual users.")
+    parser.add_argument("--ramp", help="Comma-separated concurrency levels to step through, e.g. 1,2,4,8,16.")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per stage.")
+    parser.add_argument("--rate", type=float, help="Global cap on requests per second.")
+    parser.add_argument("--think-ms", type=float, default=0, help="Mean pause between steps.")
+    parser.add_argument("--spawn-ms", type=float, default=10, help="Delay between starting virtual users.")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--slo-ms", type=float, default=500, help="p95 target used by --ramp.")
+    args = parser.parse_args(argv)
+
+    levels = [int(level) for level in args.ramp.split(",")] if args.ramp else [args.users]
+    supported = 0
+    for users in levels:
+        stats, elapsed = await run_stage(args, users)
+        report(stats, elapsed, users)
+        if healthy(stats, args.slo_ms):
+            supported = users
+        elif args.ramp:
+            break
+
+    if args.ramp:
+        print(f"\nHighest level meeting p95 <= {args.slo_ms:.0f} ms with <1% errors: "
+              f"{supported or 'none'} concurrent user(s)")
+    return 0 if supported else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
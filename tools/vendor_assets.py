@@ -0,0 +1,47 @@
+"""
+Fetch the front-end libraries served from static/ (stdlib only, no Django).
+
+The versions are pinned to the ones the templates are written against:
+htmx 1.9 (2.x changed defaults such as selfRequestsOnly and DELETE
+parameters) and Pico 2 (questlog.css uses its --pico-* variables). Bump
+them here, re-run, and commit the files together with any template
+changes the new versions need. The core.W001/E002 checks flag a file that
+is missing or on another major version.
+
+    python tools/vendor_assets.py
+"""
+import hashlib
+import re
+import sys
+import urllib.request
+from pathlib import Path
+
+STATIC = Path(__file__).resolve().parent.parent / "static"
+
+ASSETS = {
+    "js/htmx.min.js": "https://cdn.jsdelivr.net/npm/htmx.org@1.9.12/dist/htmx.min.js",
+    "css/pico.min.css": "https://cdn.jsdelivr.net/npm/@picocss/pico@2.0.6/css/pico.min.css",
+}
+
+# ManifestStaticFilesStorage rewrites sourceMappingURL comments and fails if
+# the .map isn't there; the maps aren't vendored
+SOURCE_MAP_RE = re.compile(rb"\n?/[/*]# sourceMappingURL=\S+(?: \*/)?\s*$")
+
+
+def fetch(url: str) -> bytes:
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return response.read()
+
+
+def main() -> int:
+    for name, url in ASSETS.items():
+        body = SOURCE_MAP_RE.sub(b"\n", fetch(url))
+        path = STATIC / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+        print(f"{name}  {len(body):>7} bytes  sha256 {hashlib.sha256(body).hexdigest()}  <- {url}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())